@@ -11,14 +11,32 @@ Features:
 ============================================
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, g, has_app_context, Response, stream_with_context
+import csv
+import io
 import sqlite3
 from datetime import datetime, timedelta
 import os
-from flask_mail import Mail, Message
+import threading
+import time
+import json
+import math
+import base64
+import re
+import functools
+import hashlib
+from collections import OrderedDict, deque
+from flask_mail import Mail
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.message import Message as EmailPart
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+import numpy as np
+import attendance_analytics
+import school_calendar
+from report_exports import csv_chunks, xlsx_chunks, CSV_MIMETYPE, XLSX_MIMETYPE
 
 app = Flask(__name__)
 
@@ -42,137 +60,287 @@ mail = Mail(app)
 # Database configuration
 DATABASE = 'database.db'
 
+# ============================================
+# SMTP CONNECTION POOL
+# ============================================
+
+# SMTP session pool configuration
+SMTP_POOL_MAX_SESSIONS = 4
+SMTP_SESSION_MAX_IDLE_SECONDS = 60
+SMTP_SESSION_CHECK_AFTER_SECONDS = 10
+SMTP_SESSION_MAX_MESSAGES = 100
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions alive and reuses them across messages"""
+    
+    def __init__(self, max_sessions):
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self.max_sessions = max_sessions
+        self.sessions_opened = 0
+        self.reconnects = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+    
+    def _settings(self):
+        return (MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS, MAIL_USERNAME, MAIL_PASSWORD)
+    
+    def _connect(self):
+        server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT, timeout=30)
+        try:
+            if MAIL_USE_TLS:
+                server.starttls()
+            if MAIL_PASSWORD:
+                server.login(MAIL_USERNAME, MAIL_PASSWORD)
+        except Exception:
+            self._quit(server)
+            raise
+        
+        server.pool_settings = self._settings()
+        server.pool_messages_sent = 0
+        server.pool_last_used = time.time()
+        with self._lock:
+            self.sessions_opened += 1
+        return server
+    
+    def _quit(self, server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _is_usable(self, server):
+        if server.pool_settings != self._settings():
+            return False
+        if server.pool_messages_sent >= SMTP_SESSION_MAX_MESSAGES:
+            return False
+        idle_for = time.time() - server.pool_last_used
+        if idle_for > SMTP_SESSION_MAX_IDLE_SECONDS:
+            return False
+        if idle_for > SMTP_SESSION_CHECK_AFTER_SECONDS:
+            # The server may have dropped a session that sat idle for a while
+            try:
+                return server.noop()[0] == 250
+            except Exception:
+                return False
+        return True
+    
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    server = self._idle.pop() if self._idle else None
+                if server is None:
+                    return self._connect()
+                if self._is_usable(server):
+                    return server
+                self._quit(server)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def _release(self, server):
+        if server is not None:
+            server.pool_last_used = time.time()
+            with self._lock:
+                self._idle.append(server)
+        self._slots.release()
+    
+    def send_batch(self, messages):
+        """
+        Deliver messages over a pooled session, reconnecting if it drops
+        Returns: list of None (delivered) or the exception for each message
+        """
+        results = []
+        server = self._acquire()
+        
+        try:
+            for msg in messages:
+                for attempt in range(2):
+                    try:
+                        if server is None:
+                            server = self._connect()
+                            with self._lock:
+                                self.reconnects += 1
+                        server.send_message(msg)
+                        server.pool_messages_sent += 1
+                        results.append(None)
+                        break
+                    except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                        # Session dropped; reconnect once and retry this message
+                        if server is not None:
+                            server.close()
+                        server = None
+                        if attempt == 1:
+                            results.append(e)
+                            break
+                    except smtplib.SMTPException as e:
+                        # Per-message rejection; smtplib has already RSET the session
+                        results.append(e)
+                        break
+                    except OSError as e:
+                        # Timeout or connect failure; don't trust this session again
+                        if server is not None:
+                            server.close()
+                        server = None
+                        results.append(e)
+                        break
+        finally:
+            self._release(server)
+        
+        sent = sum(1 for r in results if r is None)
+        with self._lock:
+            self.messages_sent += sent
+            self.messages_failed += len(results) - sent
+        return results
+    
+    def send(self, msg):
+        """Deliver a single message, raising on failure"""
+        error = self.send_batch([msg])[0]
+        if error is not None:
+            raise error
+    
+    def close_all(self):
+        """Close every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            self._quit(server)
+    
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'max_sessions': self.max_sessions,
+                'idle_sessions': len(self._idle),
+                'sessions_opened': self.sessions_opened,
+                'reconnects': self.reconnects,
+                'messages_sent': self.messages_sent,
+                'messages_failed': self.messages_failed
+            }
+
+smtp_pool = SMTPConnectionPool(SMTP_POOL_MAX_SESSIONS)
+
+# ============================================
+# EMAIL TEMPLATES
+# ============================================
+
+class EmailTemplate:
+    """
+    A compiled .txt/.html template pair with the MIME part headers its messages share
+    The headers are worked out once; building a message only renders and attaches the bodies
+    """
+    
+    def __init__(self, text, html):
+        self.parts = [
+            (template, [(name, value) for name, value in MIMEText('', subtype, 'utf-8').items()
+                        if name != 'Content-Transfer-Encoding'])
+            for template, subtype in ((text, 'plain'), (html, 'html'))
+        ]
+    
+    def build(self, subject, sender, recipient, context):
+        """A multipart/alternative message with the rendered plain text and HTML bodies"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = sender
+        msg['To'] = recipient
+        
+        for template, headers in self.parts:
+            body = template.render(**context)
+            part = EmailPart()
+            for name, value in headers:
+                part.set_raw(name, value)
+            # Flask-Mail registers utf-8 without a body encoding, so bodies go out as 7/8bit;
+            # store the UTF-8 bytes the way set_payload(body, 'utf-8') would
+            part.set_raw('Content-Transfer-Encoding', '7bit' if body.isascii() else '8bit')
+            part.set_payload(body.encode('utf-8').decode('ascii', 'surrogateescape'))
+            msg.attach(part)
+        return msg
+
+class EmailTemplateRegistry:
+    """Compiles the email templates once and renders only per-recipient fields"""
+    
+    def __init__(self, folder):
+        self.env = Environment(
+            loader=FileSystemLoader(folder),
+            autoescape=select_autoescape(['html']),
+            trim_blocks=True,
+            auto_reload=False
+        )
+        self._templates = {}
+        self._pairs = {}
+    
+    def load(self):
+        """Compile every .html/.txt template in the folder and pair them by name"""
+        for name in self.env.list_templates(extensions=['html', 'txt']):
+            self._templates[name] = self.env.get_template(name)
+        for name in self._templates:
+            base, extension = os.path.splitext(name)
+            if extension == '.txt' and f'{base}.html' in self._templates:
+                self._pairs[base] = EmailTemplate(self._templates[name], self._templates[f'{base}.html'])
+        return self
+    
+    def render(self, name, **context):
+        return self._templates[name].render(**context)
+    
+    def pair(self, name):
+        """The EmailTemplate for name.txt/name.html"""
+        return self._pairs[name]
+
+email_templates = EmailTemplateRegistry(os.path.join(app.root_path, 'templates', 'email')).load()
+
+def build_email_message(template_name, subject, recipient, context):
+    """Build a plain text + HTML email from a compiled template pair"""
+    return email_templates.pair(template_name).build(subject, MAIL_DEFAULT_SENDER, recipient, context)
+
 # ============================================
 # EMAIL HELPER FUNCTIONS
 # ============================================
 
+def send_email_message(msg):
+    """Deliver a prepared email message over a pooled SMTP session"""
+    smtp_pool.send(msg)
+
+def build_absence_notification(student_name, roll_no, class_name, section, date, parent_email):
+    """Build the absence notification email for a parent"""
+    # Format the date
+    formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%d/%m/%Y')
+    
+    return build_email_message(
+        'absence',
+        '🔔 Absence Notification',
+        parent_email,
+        {
+            'student_name': student_name,
+            'roll_no': roll_no,
+            'class_name': class_name,
+            'section': section,
+            'formatted_date': formatted_date
+        }
+    )
+
+def build_absence_streak_alert(student_name, roll_no, class_name, section, streak, since, parent_email):
+    """Build the consecutive absence alert email for a parent"""
+    return build_email_message(
+        'absence_streak',
+        f'⚠️ Consecutive Absence Alert - {student_name}',
+        parent_email,
+        {
+            'student_name': student_name,
+            'roll_no': roll_no,
+            'class_name': class_name,
+            'section': section,
+            'streak': streak,
+            'formatted_since': datetime.strptime(since, '%Y-%m-%d').strftime('%d/%m/%Y')
+        }
+    )
+
 def send_absence_notification(student_name, roll_no, class_name, section, date, parent_email):
     """Send absence notification email to parent"""
     try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = '🔔 Absence Notification'
-        msg['From'] = MAIL_DEFAULT_SENDER
-        msg['To'] = parent_email
-        
-        # Format the date
-        formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%d/%m/%Y')
-        
-        # Create HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #5856D6;
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    border-radius: 5px 5px 0 0;
-                }}
-                .content {{
-                    background-color: #f9f9f9;
-                    padding: 30px;
-                    border: 1px solid #ddd;
-                }}
-                .details-box {{
-                    background-color: white;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 5px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                .details-title {{
-                    color: #5856D6;
-                    font-weight: bold;
-                    margin-bottom: 15px;
-                }}
-                .detail-row {{
-                    margin: 8px 0;
-                    color: #555;
-                }}
-                .footer {{
-                    color: #666;
-                    margin-top: 20px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h2>🔔 Absence Notification</h2>
-            </div>
-            <div class="content">
-                <p><strong>Dear Parent,</strong></p>
-                
-                <p>This is an automated notification from School Management System.</p>
-                
-                <p>Your child <strong>{student_name}</strong> (Roll No: <strong>{roll_no}</strong>, Class: <strong>{class_name}-{section}</strong>) has been marked <strong>absent</strong> on <strong>{formatted_date}</strong>.</p>
-                
-                <p>If this information is incorrect or if there are any concerns, please contact the school immediately.</p>
-                
-                <div class="details-box">
-                    <div class="details-title">Student Details:</div>
-                    <div class="detail-row">- Name: {student_name}</div>
-                    <div class="detail-row">- Roll No: {roll_no}</div>
-                    <div class="detail-row">- Class: {class_name}-{section}</div>
-                    <div class="detail-row">- Date: {formatted_date}</div>
-                </div>
-                
-                <p>Thank you for your attention.</p>
-                
-                <div class="footer">
-                    <p>Best regards,<br>
-                    <strong>School Management System</strong></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create plain text version
-        text_content = f"""
-        ABSENCE NOTIFICATION
-        
-        Dear Parent,
-        
-        This is an automated notification from School Management System.
-        
-        Your child {student_name} (Roll No: {roll_no}, Class: {class_name}-{section}) has been marked absent on {formatted_date}.
-        
-        If this information is incorrect or if there are any concerns, please contact the school immediately.
-        
-        Student Details:
-        - Name: {student_name}
-        - Roll No: {roll_no}
-        - Class: {class_name}-{section}
-        - Date: {formatted_date}
-        
-        Thank you for your attention.
-        
-        Best regards,
-        School Management System
-        """
-        
-        # Attach both versions
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email using SMTP
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            server.starttls()
-            server.login(MAIL_USERNAME, MAIL_PASSWORD)
-            server.send_message(msg)
+        msg = build_absence_notification(student_name, roll_no, class_name, section, date, parent_email)
+        send_email_message(msg)
         
         print(f"✅ Email sent successfully to {parent_email} for {student_name}")
         return True
@@ -183,154 +351,32 @@ def send_absence_notification(student_name, roll_no, class_name, section, date,
         traceback.print_exc()
         return False
 
+def build_low_attendance_alert(student_name, roll_no, class_name, section, total_classes, classes_attended, classes_absent, attendance_percentage, parent_email):
+    """Build the low attendance alert email for a parent"""
+    return build_email_message(
+        'low_attendance',
+        f'🚨 Low Attendance Alert - {student_name}',
+        parent_email,
+        {
+            'student_name': student_name,
+            'roll_no': roll_no,
+            'class_name': class_name,
+            'section': section,
+            'total_classes': total_classes,
+            'classes_attended': classes_attended,
+            'classes_absent': classes_absent,
+            'attendance_percentage': attendance_percentage
+        }
+    )
+
 def send_low_attendance_alert(student_name, roll_no, class_name, section, total_classes, classes_attended, classes_absent, attendance_percentage, parent_email):
     """Send low attendance alert email to parent"""
     try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f'🚨 Low Attendance Alert - {student_name}'
-        msg['From'] = MAIL_DEFAULT_SENDER
-        msg['To'] = parent_email
-        
-        # Create HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #5856D6;
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    border-radius: 5px 5px 0 0;
-                }}
-                .content {{
-                    background-color: #f9f9f9;
-                    padding: 30px;
-                    border: 1px solid #ddd;
-                }}
-                .summary-box {{
-                    background-color: #FFF9C4;
-                    border-left: 4px solid #FFA000;
-                    border-radius: 5px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                .summary-title {{
-                    color: #F57C00;
-                    font-weight: bold;
-                    font-size: 18px;
-                    margin-bottom: 15px;
-                }}
-                .summary-item {{
-                    margin: 8px 0;
-                    color: #555;
-                }}
-                .important-notice {{
-                    background-color: #FFEBEE;
-                    border-left: 4px solid #D32F2F;
-                    border-radius: 5px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                .notice-title {{
-                    color: #C62828;
-                    font-weight: bold;
-                    font-size: 16px;
-                    margin-bottom: 10px;
-                }}
-                .notice-text {{
-                    color: #555;
-                    line-height: 1.8;
-                }}
-                .footer {{
-                    color: #666;
-                    margin-top: 20px;
-                }}
-                .highlight {{
-                    font-weight: bold;
-                    color: #D32F2F;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h2>🚨 Low Attendance Alert</h2>
-            </div>
-            <div class="content">
-                <p><strong>Dear Parent,</strong></p>
-                
-                <p>This is an important attendance update for your child, <strong>{student_name}</strong> (Roll No: <strong>{roll_no}</strong>, Class: <strong>{class_name}-{section}</strong>).</p>
-                
-                <div class="summary-box">
-                    <div class="summary-title">Summary:</div>
-                    <div class="summary-item">• Total classes held: <strong>{total_classes}</strong></div>
-                    <div class="summary-item">• Classes attended: <strong>{classes_attended}</strong></div>
-                    <div class="summary-item">• Classes absent: <strong>{classes_absent}</strong></div>
-                    <div class="summary-item">• Attendance %: <span class="highlight">{attendance_percentage}%</span></div>
-                </div>
-                
-                <div class="important-notice">
-                    <div class="notice-title">Important Notice:</div>
-                    <div class="notice-text">
-                        Your child's attendance is below the required threshold. Please ensure your child attends school regularly to avoid academic consequences. If there are valid reasons (medical or approved leave), notify the school office to mark the absence as excused.
-                    </div>
-                </div>
-                
-                <p>If you have any questions or concerns, please contact the school office immediately.</p>
-                
-                <div class="footer">
-                    <p>Best regards,<br>
-                    <strong>School Management System</strong></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create plain text version
-        text_content = f"""
-        LOW ATTENDANCE ALERT
-        
-        Dear Parent,
-        
-        This is an important attendance update for your child, {student_name} (Roll No: {roll_no}, Class: {class_name}-{section}).
-        
-        Summary:
-        • Total classes held: {total_classes}
-        • Classes attended: {classes_attended}
-        • Classes absent: {classes_absent}
-        • Attendance %: {attendance_percentage}%
-        
-        Important Notice:
-        Your child's attendance is below the required threshold. Please ensure your child attends school regularly to avoid academic consequences. If there are valid reasons (medical or approved leave), notify the school office to mark the absence as excused.
-        
-        If you have any questions or concerns, please contact the school office immediately.
-        
-        Best regards,
-        School Management System
-        """
-        
-        # Attach both versions
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email using SMTP
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            server.starttls()
-            server.login(MAIL_USERNAME, MAIL_PASSWORD)
-            server.send_message(msg)
+        msg = build_low_attendance_alert(
+            student_name, roll_no, class_name, section, total_classes,
+            classes_attended, classes_absent, attendance_percentage, parent_email
+        )
+        send_email_message(msg)
         
         print(f"✅ Low attendance alert sent successfully to {parent_email} for {student_name}")
         return True
@@ -341,33 +387,448 @@ def send_low_attendance_alert(student_name, roll_no, class_name, section, total_
         traceback.print_exc()
         return False
 
-def log_alert(student_id, alert_type, date, parent_email, message, status):
-    """Log alert to database"""
-    try:
-        conn = get_db_connection()
-        conn.execute(
-            '''INSERT INTO alert_logs (student_id, alert_type, date, parent_email, message, status)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (student_id, alert_type, date, parent_email, message, status)
-        )
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        print(f"Error logging alert: {e}")
-        if 'conn' in locals():
-            conn.close()
-        return False
-
 # ============================================
 # DATABASE HELPER FUNCTIONS
 # ============================================
 
+# Connection pool configuration
+DB_POOL_MAX_CONNECTIONS = 16
+
+# Applied once when a pooled connection is opened
+DB_CONNECTION_PRAGMAS = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -20000',      # ~20 MB page cache
+    'PRAGMA mmap_size = 268435456',    # 256 MB memory-mapped I/O
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000',
+]
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection whose close() hands it back to the pool"""
+    
+    pool = None
+    database_path = None
+    checked_out = False
+    request_bound = False
+    
+    def close(self):
+        # Request-bound connections are released by the app context teardown
+        if self.request_bound:
+            return
+        self.pool.release(self)
+    
+    def close_for_real(self):
+        super().close()
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections with usage metrics"""
+    
+    def __init__(self, max_connections):
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.max_connections = max_connections
+        self.opens = 0
+        self.hits = 0
+        self.request_reuses = 0
+        self.acquires = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+    
+    def _open(self, database):
+        conn = sqlite3.connect(database, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        for pragma in DB_CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        conn.database_path = database
+        return conn
+    
+    def acquire(self, database):
+        """Check out a connection for the given database file"""
+        started = time.perf_counter()
+        self._slots.acquire()
+        
+        conn = None
+        stale = []
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if candidate.database_path == database:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        
+        # Connections left over from a different DATABASE path are discarded
+        for candidate in stale:
+            candidate.close_for_real()
+        
+        hit = conn is not None
+        if not hit:
+            try:
+                conn = self._open(database)
+            except Exception:
+                self._slots.release()
+                raise
+        
+        conn.checked_out = True
+        waited = time.perf_counter() - started
+        
+        with self._lock:
+            self.acquires += 1
+            if hit:
+                self.hits += 1
+            else:
+                self.opens += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+        
+        return conn
+    
+    def release(self, conn):
+        """Return a connection to the pool, discarding uncommitted work"""
+        if not conn.checked_out:
+            return
+        
+        if conn.in_transaction:
+            conn.rollback()
+        
+        conn.checked_out = False
+        conn.request_bound = False
+        with self._lock:
+            self._idle.append(conn)
+        self._slots.release()
+    
+    def record_request_reuse(self):
+        with self._lock:
+            self.request_reuses += 1
+    
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'max_connections': self.max_connections,
+                'idle': len(self._idle),
+                'acquires': self.acquires,
+                'opens': self.opens,
+                'hits': self.hits,
+                'request_reuses': self.request_reuses,
+                'hit_rate': round(self.hits / self.acquires * 100, 1) if self.acquires else 0,
+                'total_wait_ms': round(self.wait_time * 1000, 3),
+                'avg_wait_ms': round(self.wait_time / self.acquires * 1000, 3) if self.acquires else 0,
+                'max_wait_ms': round(self.max_wait_time * 1000, 3)
+            }
+
+db_pool = ConnectionPool(DB_POOL_MAX_CONNECTIONS)
+
 def get_db_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
-    return conn
+    """
+    Return a pooled database connection
+    Inside a request the same connection is shared until the app context ends
+    """
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is not None:
+            db_pool.record_request_reuse()
+            return conn
+        
+        conn = db_pool.acquire(DATABASE)
+        conn.request_bound = True
+        g._db_conn = conn
+        return conn
+    
+    return db_pool.acquire(DATABASE)
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    """Return the request's connection to the pool"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+# Current definition of alert_logs (kept in sync with schema.sql)
+ALERT_LOGS_TABLE_SQL = '''CREATE TABLE alert_logs (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    alert_type TEXT NOT NULL CHECK(alert_type IN ('absence', 'low_attendance', 'absence_streak')),
+    date DATE NOT NULL,
+    parent_email TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL CHECK(status IN ('queued', 'sent', 'failed', 'rate_limited')),
+    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+)'''
+
+def migrate_alert_logs_table(conn):
+    """Rebuild alert_logs when its CHECK constraints are out of date"""
+    existing = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'alert_logs'"
+    ).fetchone()
+    
+    if not existing:
+        conn.execute(ALERT_LOGS_TABLE_SQL)
+        return
+    
+    if ''.join(existing[0].split()) == ''.join(ALERT_LOGS_TABLE_SQL.split()):
+        return
+    
+    # SQLite cannot alter CHECK constraints, so copy into a fresh table
+    old_columns = [row[1] for row in conn.execute('PRAGMA table_info(alert_logs)')]
+    conn.execute(ALERT_LOGS_TABLE_SQL.replace('CREATE TABLE alert_logs', 'CREATE TABLE alert_logs_new', 1))
+    new_columns = [row[1] for row in conn.execute('PRAGMA table_info(alert_logs_new)')]
+    columns = ', '.join(c for c in old_columns if c in new_columns)
+    conn.execute(f'INSERT INTO alert_logs_new ({columns}) SELECT {columns} FROM alert_logs')
+    conn.execute('DROP TABLE alert_logs')
+    conn.execute('ALTER TABLE alert_logs_new RENAME TO alert_logs')
+
+def migrate_attendance_rollup(conn):
+    """Create and backfill student_monthly_attendance on older databases"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'student_monthly_attendance'"
+    ).fetchone()
+    if exists:
+        return
+    
+    conn.execute('''CREATE TABLE student_monthly_attendance (
+        student_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        present INTEGER NOT NULL DEFAULT 0,
+        absent INTEGER NOT NULL DEFAULT 0,
+        late INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (student_id, month),
+        FOREIGN KEY (student_id) REFERENCES students(student_id)
+    ) WITHOUT ROWID''')
+    rebuild_attendance_rollup(conn)
+
+def migrate_attendance_summary(conn):
+    """Create and backfill class_daily_attendance (and one attendance row per date) on older databases"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'class_daily_attendance'"
+    ).fetchone()
+    if exists:
+        return
+    
+    conn.execute('''CREATE TABLE class_daily_attendance (
+        date DATE NOT NULL,
+        class TEXT NOT NULL,
+        present INTEGER NOT NULL DEFAULT 0,
+        absent INTEGER NOT NULL DEFAULT 0,
+        late INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (date, class)
+    ) WITHOUT ROWID''')
+    # Older sample data inserted some dates twice; keep the latest row for each
+    conn.execute(
+        'DELETE FROM attendance WHERE attendance_id NOT IN (SELECT MAX(attendance_id) FROM attendance GROUP BY date)'
+    )
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date)')
+    rebuild_attendance_summary(conn)
+
+def migrate_absence_streaks(conn):
+    """Create and backfill student_absence_streaks on older databases"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'student_absence_streaks'"
+    ).fetchone()
+    if exists:
+        return
+    
+    conn.execute('''CREATE TABLE student_absence_streaks (
+        student_id INTEGER PRIMARY KEY,
+        last_date DATE NOT NULL,
+        current_streak INTEGER NOT NULL DEFAULT 0,
+        streak_start DATE,
+        FOREIGN KEY (student_id) REFERENCES students(student_id)
+    )''')
+    conn.execute('''CREATE INDEX idx_absence_streaks_current
+        ON student_absence_streaks (current_streak, student_id)''')
+    rebuild_absence_streaks(conn)
+
+def migrate_school_calendar(conn):
+    """Add holiday kinds and school_terms, then build the school_days index on older databases"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(school_holidays)')]
+    if 'kind' not in columns:
+        conn.execute("""ALTER TABLE school_holidays ADD COLUMN
+            kind TEXT NOT NULL DEFAULT 'holiday' CHECK(kind IN ('holiday', 'half_day'))""")
+    
+    conn.execute('''CREATE TABLE IF NOT EXISTS school_terms (
+        term_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        CHECK(start_date <= end_date)
+    )''')
+    
+    conn.execute('''CREATE TABLE IF NOT EXISTS school_days (
+        date DATE PRIMARY KEY,
+        ordinal INTEGER NOT NULL,
+        term_id INTEGER,
+        half_day INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+    
+    # New databases get an empty index from schema.sql
+    if not conn.execute('SELECT 1 FROM school_days LIMIT 1').fetchone():
+        school_calendar.rebuild_school_days(conn)
+
+# Current definition of the fees ledger and balance summaries (kept in sync with schema.sql)
+FEE_LEDGER_SCHEMA_SQL = [
+    '''CREATE TABLE fee_payments (
+        payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fee_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        amount REAL NOT NULL CHECK(amount > 0),
+        method TEXT NOT NULL DEFAULT 'cash',
+        reference TEXT,
+        received_by TEXT,
+        paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (fee_id) REFERENCES fees(fee_id),
+        FOREIGN KEY (student_id) REFERENCES students(student_id)
+    )''',
+    '''CREATE INDEX idx_fee_payments_fee ON fee_payments (fee_id, payment_id)''',
+    '''CREATE TRIGGER fee_payments_no_update BEFORE UPDATE ON fee_payments BEGIN
+           SELECT RAISE(ABORT, 'fee_payments is append-only');
+       END''',
+    '''CREATE TRIGGER fee_payments_no_delete BEFORE DELETE ON fee_payments BEGIN
+           SELECT RAISE(ABORT, 'fee_payments is append-only');
+       END''',
+    '''CREATE TABLE student_fee_balances (
+        student_id INTEGER PRIMARY KEY,
+        total_amount REAL NOT NULL DEFAULT 0,
+        paid_amount REAL NOT NULL DEFAULT 0,
+        pending_amount REAL NOT NULL DEFAULT 0,
+        open_fees INTEGER NOT NULL DEFAULT 0,
+        overdue_fees INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (student_id) REFERENCES students(student_id)
+    )''',
+    '''CREATE TABLE class_fee_balances (
+        class TEXT PRIMARY KEY,
+        total_amount REAL NOT NULL DEFAULT 0,
+        paid_amount REAL NOT NULL DEFAULT 0,
+        pending_amount REAL NOT NULL DEFAULT 0,
+        open_fees INTEGER NOT NULL DEFAULT 0,
+        overdue_fees INTEGER NOT NULL DEFAULT 0
+    )''',
+]
+
+def migrate_fee_ledger(conn):
+    """
+    Create the fee_payments ledger and the fee balance summaries on older databases
+    Amounts already paid become one 'opening_balance' payment per fee so the ledger adds up
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fee_payments'"
+    ).fetchone()
+    if exists:
+        return
+    
+    for statement in FEE_LEDGER_SCHEMA_SQL:
+        conn.execute(statement)
+    conn.execute(FEE_OPENING_BALANCE_SQL)
+    rebuild_fee_balances(conn)
+
+# Rank name and roll_no matches above email and parent_email matches
+STUDENT_SEARCH_RANK_SQL = '''INSERT INTO students_fts (students_fts, rank)
+    VALUES ('rank', 'bm25(10.0, 10.0, 2.0, 1.0)')'''
+
+def migrate_student_search_index(conn):
+    """Create and populate students_fts on older databases"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'"
+    ).fetchone()
+    if exists:
+        return
+    
+    conn.execute('''CREATE VIRTUAL TABLE students_fts USING fts5(
+        name,
+        roll_no,
+        email,
+        parent_email,
+        content = 'students',
+        content_rowid = 'student_id',
+        prefix = '2 3'
+    )''')
+    conn.execute(STUDENT_SEARCH_RANK_SQL)
+    conn.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+
+# Idempotent schema upgrades applied to existing database.db files on startup
+# (new databases get the same objects from schema.sql)
+DATABASE_MIGRATIONS = [
+    '''CREATE INDEX IF NOT EXISTS idx_daily_attendance_date_student
+       ON daily_attendance (date, student_id, status)''',
+    '''CREATE INDEX IF NOT EXISTS idx_daily_attendance_student_date
+       ON daily_attendance (student_id, date, status)''',
+    '''CREATE INDEX IF NOT EXISTS idx_teacher_attendance_date
+       ON teacher_attendance (date, teacher_id, status)''',
+    migrate_alert_logs_table,
+    '''CREATE TABLE IF NOT EXISTS email_outbox (
+        outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        log_id INTEGER,
+        alert_type TEXT NOT NULL,
+        recipient TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'sending', 'sent', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        next_attempt_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        sent_at REAL,
+        FOREIGN KEY (log_id) REFERENCES alert_logs(log_id)
+    )''',
+    '''CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next
+       ON email_outbox (status, next_attempt_at)''',
+    migrate_attendance_rollup,
+    '''CREATE INDEX IF NOT EXISTS idx_students_class_section_roll
+       ON students (class, section, roll_no)''',
+    migrate_student_search_index,
+    migrate_attendance_summary,
+    migrate_absence_streaks,
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+           INSERT INTO students_fts (rowid, name, roll_no, email, parent_email)
+           VALUES (new.student_id, new.name, new.roll_no, new.email, new.parent_email);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+           INSERT INTO students_fts (students_fts, rowid, name, roll_no, email, parent_email)
+           VALUES ('delete', old.student_id, old.name, old.roll_no, old.email, old.parent_email);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name, roll_no, email, parent_email ON students BEGIN
+           INSERT INTO students_fts (students_fts, rowid, name, roll_no, email, parent_email)
+           VALUES ('delete', old.student_id, old.name, old.roll_no, old.email, old.parent_email);
+           INSERT INTO students_fts (rowid, name, roll_no, email, parent_email)
+           VALUES (new.student_id, new.name, new.roll_no, new.email, new.parent_email);
+       END''',
+    '''CREATE INDEX IF NOT EXISTS idx_alert_logs_dedup
+       ON alert_logs (student_id, alert_type, date, status)''',
+    '''CREATE INDEX IF NOT EXISTS idx_alert_logs_recipient
+       ON alert_logs (parent_email, sent_at)''',
+    '''CREATE INDEX IF NOT EXISTS idx_alert_logs_sent_at
+       ON alert_logs (sent_at)''',
+    '''CREATE TABLE IF NOT EXISTS school_holidays (
+        date DATE PRIMARY KEY,
+        name TEXT NOT NULL
+    )''',
+    migrate_school_calendar,
+    migrate_fee_ledger,
+    '''CREATE INDEX IF NOT EXISTS idx_fees_status_due
+       ON fees (status, due_date)''',
+    '''CREATE INDEX IF NOT EXISTS idx_fees_student_due
+       ON fees (student_id, due_date)''',
+    '''CREATE TABLE IF NOT EXISTS fee_status_sweeps (
+        sweep_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        as_of_date DATE NOT NULL,
+        swept_at REAL NOT NULL,
+        fees_updated INTEGER NOT NULL,
+        fee_ids TEXT NOT NULL
+    )''',
+]
+
+def migrate_database(conn):
+    """Apply pending schema migrations to an open connection"""
+    for step in DATABASE_MIGRATIONS:
+        if callable(step):
+            step(conn)
+        else:
+            conn.execute(step)
+    conn.commit()
 
 def init_database():
     """Initialize database with schema and sample data"""
@@ -384,6 +845,1164 @@ def init_database():
         print("✅ Database created successfully!")
     else:
         print("✅ Database already exists")
+    
+    # Bring older databases up to date (indexes, new tables)
+    conn = sqlite3.connect(DATABASE)
+    migrate_database(conn)
+    conn.close()
+
+# ============================================
+# EMAIL OUTBOX
+# ============================================
+
+# Outbox worker configuration
+EMAIL_WORKER_COUNT = 2
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_BASE_SECONDS = 30
+EMAIL_BATCH_SIZE = 20
+EMAIL_POLL_INTERVAL = 5.0
+
+# alert_type -> function building the MIME message from the stored payload
+EMAIL_BUILDERS = {
+    'absence': build_absence_notification,
+    'low_attendance': build_low_attendance_alert,
+    'absence_streak': build_absence_streak_alert,
+}
+
+def enqueue_email(conn, student_id, alert_type, date, recipient, message, payload):
+    """
+    Queue an alert email for background delivery
+    Writes a 'queued' alert_logs row plus the outbox row; the caller commits
+    """
+    cursor = conn.execute(
+        '''INSERT INTO alert_logs (student_id, alert_type, date, parent_email, message, status)
+           VALUES (?, ?, ?, ?, ?, 'queued')''',
+        (student_id, alert_type, date, recipient, message)
+    )
+    now = time.time()
+    conn.execute(
+        '''INSERT INTO email_outbox (log_id, alert_type, recipient, payload, next_attempt_at, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (cursor.lastrowid, alert_type, recipient, json.dumps(payload), now, now)
+    )
+    return cursor.lastrowid
+
+class EmailOutboxWorkers:
+    """Background threads that drain email_outbox with retry and backoff"""
+    
+    def __init__(self, worker_count):
+        self.worker_count = worker_count
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = False
+    
+    def start(self):
+        """Start the worker threads (no-op if already running)"""
+        with self._lock:
+            if any(t.is_alive() for t in self._threads):
+                return
+            self._stopping = False
+            self._recover_interrupted()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'email-outbox-{i}', daemon=True)
+                for i in range(self.worker_count)
+            ]
+            for thread in self._threads:
+                thread.start()
+    
+    def stop(self, timeout=5):
+        """Stop the worker threads after their current delivery"""
+        self._stopping = True
+        self.notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+    
+    def notify(self):
+        """Wake idle workers after new rows were committed"""
+        with self._wakeup:
+            self._wakeup.notify_all()
+    
+    def is_running(self):
+        return any(t.is_alive() for t in self._threads)
+    
+    def _recover_interrupted(self):
+        # Rows left in 'sending' by a previous process never finished
+        conn = db_pool.acquire(DATABASE)
+        try:
+            conn.execute("UPDATE email_outbox SET status = 'queued' WHERE status = 'sending'")
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _run(self):
+        while not self._stopping:
+            try:
+                processed = self.process_batch()
+            except Exception as e:
+                print(f"❌ Email outbox worker error: {e}")
+                processed = False
+            
+            if not processed:
+                with self._wakeup:
+                    self._wakeup.wait(self._idle_wait())
+    
+    def _idle_wait(self):
+        # Sleep until the next retry is due, but never longer than the poll interval
+        conn = db_pool.acquire(DATABASE)
+        try:
+            next_due = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM email_outbox WHERE status = 'queued'"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        
+        if next_due is None:
+            return EMAIL_POLL_INTERVAL
+        return min(EMAIL_POLL_INTERVAL, max(next_due - time.time(), 0.01))
+    
+    def _claim(self, conn):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                '''SELECT outbox_id, log_id, alert_type, recipient, payload, attempts
+                   FROM email_outbox
+                   WHERE status = 'queued' AND next_attempt_at <= ?
+                   ORDER BY next_attempt_at
+                   LIMIT ?''',
+                (time.time(), EMAIL_BATCH_SIZE)
+            ).fetchall()
+            conn.executemany(
+                '''UPDATE email_outbox
+                   SET status = 'sending', attempts = attempts + 1
+                   WHERE outbox_id = ?''',
+                [(row['outbox_id'],) for row in rows]
+            )
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def process_batch(self):
+        """Deliver a batch of due outbox rows; returns False when nothing was due"""
+        conn = db_pool.acquire(DATABASE)
+        try:
+            rows = self._claim(conn)
+            if not rows:
+                return False
+            
+            # Build every message first, then send them over one pooled session
+            messages = []
+            pending = []
+            for row in rows:
+                try:
+                    builder = EMAIL_BUILDERS[row['alert_type']]
+                    messages.append(builder(parent_email=row['recipient'], **json.loads(row['payload'])))
+                    pending.append(row)
+                except Exception as e:
+                    self._record_failure(conn, row, e)
+            
+            if messages:
+                try:
+                    results = smtp_pool.send_batch(messages)
+                except Exception as e:
+                    # Could not even open a session; every message failed
+                    results = [e] * len(messages)
+                
+                for row, error in zip(pending, results):
+                    if error is None:
+                        self._record_success(conn, row)
+                    else:
+                        self._record_failure(conn, row, error)
+            
+            conn.commit()
+            record_data_change('alert_logs')
+            return True
+        finally:
+            conn.close()
+    
+    def _record_success(self, conn, row):
+        conn.execute(
+            '''UPDATE email_outbox
+               SET status = 'sent', sent_at = ?, last_error = NULL
+               WHERE outbox_id = ?''',
+            (time.time(), row['outbox_id'])
+        )
+        conn.execute(
+            '''UPDATE alert_logs SET status = 'sent', sent_at = CURRENT_TIMESTAMP
+               WHERE log_id = ?''',
+            (row['log_id'],)
+        )
+        print(f"✅ Email sent successfully to {row['recipient']} ({row['alert_type']})")
+    
+    def _record_failure(self, conn, row, error):
+        attempts = row['attempts'] + 1
+        if attempts >= EMAIL_MAX_ATTEMPTS:
+            conn.execute(
+                '''UPDATE email_outbox SET status = 'failed', last_error = ?
+                   WHERE outbox_id = ?''',
+                (str(error), row['outbox_id'])
+            )
+            conn.execute(
+                "UPDATE alert_logs SET status = 'failed' WHERE log_id = ?",
+                (row['log_id'],)
+            )
+            print(f"❌ Giving up on email to {row['recipient']} after {attempts} attempts: {error}")
+        else:
+            # Exponential backoff: base, 2x base, 4x base, ...
+            delay = EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+            conn.execute(
+                '''UPDATE email_outbox
+                   SET status = 'queued', last_error = ?, next_attempt_at = ?
+                   WHERE outbox_id = ?''',
+                (str(error), time.time() + delay, row['outbox_id'])
+            )
+            print(f"⚠️  Email to {row['recipient']} failed (attempt {attempts}), retrying in {delay}s: {error}")
+
+email_outbox = EmailOutboxWorkers(EMAIL_WORKER_COUNT)
+
+def get_outbox_status(conn):
+    """Queue depth and delivery latency for the email outbox"""
+    counts = {'queued': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+    for row in conn.execute('SELECT status, COUNT(*) as count FROM email_outbox GROUP BY status'):
+        counts[row['status']] = row['count']
+    
+    oldest = conn.execute(
+        "SELECT MIN(created_at) as created_at FROM email_outbox WHERE status IN ('queued', 'sending')"
+    ).fetchone()['created_at']
+    
+    latency = conn.execute(
+        '''SELECT AVG(sent_at - created_at) as avg_latency,
+                  MAX(sent_at - created_at) as max_latency,
+                  COUNT(*) as samples
+           FROM (SELECT sent_at, created_at FROM email_outbox
+                 WHERE status = 'sent'
+                 ORDER BY outbox_id DESC
+                 LIMIT 100)'''
+    ).fetchone()
+    
+    return {
+        'queue_depth': counts['queued'] + counts['sending'],
+        'counts': counts,
+        'oldest_pending_age_seconds': round(time.time() - oldest, 1) if oldest else 0,
+        'avg_delivery_latency_seconds': round(latency['avg_latency'] or 0, 3),
+        'max_delivery_latency_seconds': round(latency['max_latency'] or 0, 3),
+        'latency_samples': latency['samples'],
+        'workers_running': email_outbox.is_running(),
+        'smtp_pool': smtp_pool.get_metrics()
+    }
+
+# ============================================
+# ALERT DISPATCH (DEDUPLICATION + RATE LIMITS)
+# ============================================
+
+# At most this many routine alerts per parent address within the window (failed and
+# suppressed ones don't count); escalations such as streak and low attendance alerts
+# are never held back by it
+ALERT_RATE_LIMIT_PER_RECIPIENT = 5
+ALERT_RATE_LIMIT_WINDOW_HOURS = 24
+ALERT_RATE_LIMITED_TYPES = ('absence',)
+
+def fetch_alert_keys(conn, keys):
+    """
+    Which (student_id, alert_type, date) keys already have a queued or sent alert
+    (failed and rate limited ones may be sent again)
+    One indexed lookup per chunk of students via idx_alert_logs_dedup
+    """
+    alert_types = sorted({alert_type for _, alert_type, _ in keys})
+    dates = sorted({date for _, _, date in keys})
+    found = set()
+    for chunk in chunked(sorted({student_id for student_id, _, _ in keys}), SQL_IN_CHUNK_SIZE):
+        found.update(tuple(row) for row in conn.execute(
+            f'''SELECT student_id, alert_type, date FROM alert_logs
+                WHERE student_id IN ({placeholders(len(chunk))})
+                  AND alert_type IN ({placeholders(len(alert_types))})
+                  AND status IN ('queued', 'sent')
+                  AND date IN ({placeholders(len(dates))})''',
+            chunk + alert_types + dates
+        ))
+    return found & set(keys)
+
+def count_recent_alerts(conn, recipients):
+    """Rate limited alerts per recipient inside the window (idx_alert_logs_recipient)"""
+    counts = {}
+    window = f'-{ALERT_RATE_LIMIT_WINDOW_HOURS} hours'
+    for chunk in chunked(sorted(recipients), SQL_IN_CHUNK_SIZE):
+        for recipient, count in conn.execute(
+            f'''SELECT parent_email, COUNT(*) FROM alert_logs
+                WHERE parent_email IN ({placeholders(len(chunk))})
+                  AND sent_at >= datetime('now', ?)
+                  AND alert_type IN ({placeholders(len(ALERT_RATE_LIMITED_TYPES))})
+                  AND status IN ('queued', 'sent')
+                GROUP BY parent_email''',
+            chunk + [window] + list(ALERT_RATE_LIMITED_TYPES)
+        ):
+            counts[recipient] = count
+    return counts
+
+def dispatch_alerts(conn, alerts):
+    """
+    Queue alert emails in one pass, skipping alerts already queued or sent for the
+    same (student, type, date/period) and routine alerts to recipients at their rate
+    limit (those are logged as 'rate_limited' so the teacher can see them)
+    alerts: list of dicts with student_id, alert_type, date, recipient, message, payload
+    The caller commits
+    Returns: one outcome per alert, in order: 'queued', 'duplicate' or 'rate_limited'
+    """
+    if not alerts:
+        return []
+    
+    sent_keys = fetch_alert_keys(conn, [(a['student_id'], a['alert_type'], a['date']) for a in alerts])
+    recent = count_recent_alerts(conn, {a['recipient'] for a in alerts})
+    
+    outcomes = []
+    for alert in alerts:
+        key = (alert['student_id'], alert['alert_type'], alert['date'])
+        if key in sent_keys:
+            outcomes.append('duplicate')
+            continue
+        limited = alert['alert_type'] in ALERT_RATE_LIMITED_TYPES
+        if limited and recent.get(alert['recipient'], 0) >= ALERT_RATE_LIMIT_PER_RECIPIENT:
+            conn.execute(
+                '''INSERT INTO alert_logs (student_id, alert_type, date, parent_email, message, status)
+                   VALUES (?, ?, ?, ?, ?, 'rate_limited')''',
+                (alert['student_id'], alert['alert_type'], alert['date'], alert['recipient'], alert['message'])
+            )
+            outcomes.append('rate_limited')
+            continue
+        
+        enqueue_email(conn, alert['student_id'], alert['alert_type'], alert['date'],
+                      alert['recipient'], alert['message'], alert['payload'])
+        sent_keys.add(key)
+        if limited:
+            recent[alert['recipient']] = recent.get(alert['recipient'], 0) + 1
+        outcomes.append('queued')
+    return outcomes
+
+# ============================================
+# ATTENDANCE REPORT ENGINE
+# ============================================
+
+MONTHLY_ATTENDANCE_QUERY = '''SELECT
+        s.student_id,
+        s.roll_no,
+        s.name,
+        s.class,
+        s.section,
+        COALESCE(r.total, 0) as total_days,
+        COALESCE(r.present, 0) as present,
+        COALESCE(r.absent, 0) as absent,
+        COALESCE(r.late, 0) as late
+       FROM students s
+       LEFT JOIN student_monthly_attendance r
+            ON r.student_id = s.student_id
+           AND r.month = ?
+       WHERE 1=1'''
+
+def month_date_range(month):
+    """
+    Convert a YYYY-MM month into a half-open [start, end) date range
+    Lets month filters use the daily_attendance date indexes instead of strftime()
+    Raises ValueError unless month is YYYY-MM
+    """
+    try:
+        if not re.fullmatch(r'\d{4}-\d{2}', month):
+            raise ValueError
+        start = datetime.strptime(month, '%Y-%m')
+    except (TypeError, ValueError):
+        raise ValueError('month must be in YYYY-MM format')
+    if start.month == 12:
+        end = datetime(start.year + 1, 1, 1)
+    else:
+        end = datetime(start.year, start.month + 1, 1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+def build_monthly_attendance_query(month, class_name='', section=''):
+    """Build the monthly attendance query (reads the rollup) and its parameters"""
+    query = MONTHLY_ATTENDANCE_QUERY
+    params = [month]
+
+    if class_name:
+        query += ' AND s.class = ?'
+        params.append(class_name)
+
+    if section:
+        query += ' AND s.section = ?'
+        params.append(section)
+
+    query += ' ORDER BY s.student_id'
+    return query, params
+
+def compute_monthly_attendance(conn, month, class_name='', section=''):
+    """
+    Read present/absent/late counts for every student from the monthly rollup
+    Returns: list of per-student dicts (ordered by student_id)
+    """
+    query, params = build_monthly_attendance_query(month, class_name, section)
+
+    students_data = []
+    for row in conn.execute(query, params):
+        total_days = row['total_days']
+        present = row['present']
+
+        students_data.append({
+            'student_id': row['student_id'],
+            'roll_no': row['roll_no'],
+            'name': row['name'],
+            'class': row['class'],
+            'section': row['section'],
+            'total_days': total_days,
+            'present': present,
+            'absent': row['absent'],
+            'late': row['late'],
+            'percentage': round((present / total_days) * 100, 1) if total_days > 0 else 0
+        })
+
+    return students_data
+
+def overall_attendance_percentage(students_data):
+    """Overall present percentage across all attendance records in a report"""
+    total_present = sum(s['present'] for s in students_data)
+    total_records = sum(s['total_days'] for s in students_data)
+
+    if total_records > 0:
+        return round((total_present / total_records) * 100, 2)
+    return 0
+
+# ============================================
+# MONTHLY ATTENDANCE ROLLUP
+# ============================================
+
+ATTENDANCE_STATUSES = ('present', 'absent', 'late')
+
+def apply_attendance_changes(conn, changes):
+    """
+    Apply daily_attendance writes to student_monthly_attendance, the daily summaries
+    and the absence streaks incrementally
+    changes: iterable of (student_id, date, old_status or None, new_status)
+    The caller commits, so the rollup moves in the same transaction
+    Returns: absence streaks that crossed an alert threshold (see apply_absence_streak_changes)
+    """
+    changes = [change for change in changes if change[2] != change[3]]
+    
+    deltas = {}
+    for student_id, date, old_status, new_status in changes:
+        add_status_delta(deltas, (student_id, date[:7]), old_status, new_status)
+    
+    conn.executemany(
+        '''INSERT INTO student_monthly_attendance (student_id, month, present, absent, late, total)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(student_id, month) DO UPDATE SET
+               present = present + excluded.present,
+               absent = absent + excluded.absent,
+               late = late + excluded.late,
+               total = total + excluded.total''',
+        [(student_id, month, d['present'], d['absent'], d['late'], d['total'])
+         for (student_id, month), d in deltas.items()]
+    )
+    
+    apply_attendance_summary_changes(conn, changes)
+    return apply_absence_streak_changes(conn, changes)
+
+def add_status_delta(deltas, key, old_status, new_status):
+    """Accumulate one status change into deltas[key] (counts per status plus total)"""
+    delta = deltas.setdefault(key, dict.fromkeys(ATTENDANCE_STATUSES + ('total',), 0))
+    if old_status:
+        delta[old_status] -= 1
+        delta['total'] -= 1
+    if new_status:
+        delta[new_status] += 1
+        delta['total'] += 1
+
+def rebuild_attendance_rollup(conn, month=None):
+    """
+    Recompute the monthly rollup from daily_attendance (all history or one month)
+    Returns: number of rollup rows written
+    """
+    query = '''INSERT INTO student_monthly_attendance (student_id, month, present, absent, late, total)
+               SELECT student_id,
+                      substr(date, 1, 7),
+                      COUNT(CASE WHEN status = 'present' THEN 1 END),
+                      COUNT(CASE WHEN status = 'absent' THEN 1 END),
+                      COUNT(CASE WHEN status = 'late' THEN 1 END),
+                      COUNT(*)
+               FROM daily_attendance'''
+    
+    if month:
+        start, end = month_date_range(month)
+        conn.execute('DELETE FROM student_monthly_attendance WHERE month = ?', (month,))
+        cursor = conn.execute(query + ' WHERE date >= ? AND date < ? GROUP BY student_id, substr(date, 1, 7)', (start, end))
+    else:
+        conn.execute('DELETE FROM student_monthly_attendance')
+        cursor = conn.execute(query + ' GROUP BY student_id, substr(date, 1, 7)')
+    
+    conn.commit()
+    return cursor.rowcount
+
+# ============================================
+# DAILY ATTENDANCE SUMMARY
+# ============================================
+
+# Recompute the school-wide attendance row of one date from its per-class rows
+SCHOOL_ATTENDANCE_UPSERT_SQL = '''INSERT INTO attendance (date, total_students, present_students, absent_students, attendance_percentage)
+    SELECT date, SUM(total), SUM(present), SUM(absent), ROUND(SUM(present) * 100.0 / MAX(SUM(total), 1), 1)
+    FROM class_daily_attendance
+    WHERE date = ?
+    GROUP BY date
+    ON CONFLICT(date) DO UPDATE SET
+        total_students = excluded.total_students,
+        present_students = excluded.present_students,
+        absent_students = excluded.absent_students,
+        attendance_percentage = excluded.attendance_percentage'''
+
+def apply_attendance_summary_changes(conn, changes):
+    """
+    Move class_daily_attendance counts by the given status changes, then refresh
+    the attendance row of every touched date (dashboards read that row by date)
+    changes: list of (student_id, date, old_status or None, new_status)
+    """
+    deltas = {}
+    for student_id, date, old_status, new_status in changes:
+        add_status_delta(deltas, (student_id, date), old_status, new_status)
+    
+    conn.executemany(
+        '''INSERT INTO class_daily_attendance (date, class, present, absent, late, total)
+           SELECT ?, class, ?, ?, ?, ? FROM students WHERE student_id = ?
+           ON CONFLICT(date, class) DO UPDATE SET
+               present = present + excluded.present,
+               absent = absent + excluded.absent,
+               late = late + excluded.late,
+               total = total + excluded.total''',
+        [(date, d['present'], d['absent'], d['late'], d['total'], student_id)
+         for (student_id, date), d in deltas.items()]
+    )
+    
+    conn.executemany(SCHOOL_ATTENDANCE_UPSERT_SQL, [(date,) for date in sorted({date for _, date in deltas})])
+
+def rebuild_attendance_summary(conn, date=None):
+    """
+    Recompute class_daily_attendance and the matching attendance rows from daily_attendance
+    (all history or one date); dates without daily records keep their attendance row
+    Returns: number of per-class rows written
+    """
+    query = '''INSERT INTO class_daily_attendance (date, class, present, absent, late, total)
+               SELECT d.date,
+                      s.class,
+                      COUNT(CASE WHEN d.status = 'present' THEN 1 END),
+                      COUNT(CASE WHEN d.status = 'absent' THEN 1 END),
+                      COUNT(CASE WHEN d.status = 'late' THEN 1 END),
+                      COUNT(*)
+               FROM daily_attendance d
+               JOIN students s ON s.student_id = d.student_id'''
+    
+    if date:
+        conn.execute('DELETE FROM class_daily_attendance WHERE date = ?', (date,))
+        rows = conn.execute(query + ' WHERE d.date = ? GROUP BY d.date, s.class', (date,)).rowcount
+        dates = [date]
+    else:
+        conn.execute('DELETE FROM class_daily_attendance')
+        rows = conn.execute(query + ' GROUP BY d.date, s.class').rowcount
+        dates = [row[0] for row in conn.execute('SELECT DISTINCT date FROM class_daily_attendance')]
+    
+    conn.executemany(SCHOOL_ATTENDANCE_UPSERT_SQL, [(d,) for d in dates])
+    conn.commit()
+    return rows
+
+# ============================================
+# CONSECUTIVE ABSENCE STREAKS
+# ============================================
+
+# Alert parents when a streak of consecutive absences reaches each of these lengths
+ABSENCE_STREAK_ALERT_THRESHOLDS = (3, 5, 10)
+
+def fetch_absence_streaks(conn, student_ids):
+    """Current streak state keyed by student_id (chunked IN lookups)"""
+    streaks = {}
+    for chunk in chunked(sorted(set(student_ids)), SQL_IN_CHUNK_SIZE):
+        for row in conn.execute(
+            f'''SELECT student_id, last_date, current_streak, streak_start
+                FROM student_absence_streaks
+                WHERE student_id IN ({placeholders(len(chunk))})''',
+            chunk
+        ):
+            streaks[row['student_id']] = (row['last_date'], row['current_streak'], row['streak_start'])
+    return streaks
+
+def recount_absence_streak(conn, student_id):
+    """
+    Recount one student's trailing absences from daily_attendance, newest first
+    Reads only the streak plus one record through idx_daily_attendance_student_date
+    Returns: (last_date, current_streak, streak_start) or None without records
+    """
+    last_date, streak, streak_start = None, 0, None
+    for date, status in conn.execute(
+        'SELECT date, status FROM daily_attendance WHERE student_id = ? ORDER BY date DESC',
+        (student_id,)
+    ):
+        last_date = last_date or date
+        if status != 'absent':
+            break
+        streak += 1
+        streak_start = date
+    return (last_date, streak, streak_start) if last_date else None
+
+def apply_absence_streak_changes(conn, changes):
+    """
+    Fold daily_attendance writes into student_absence_streaks
+    A record newer than a student's last_date updates the streak in O(1); a
+    correction of an earlier date recounts that student's trailing absences
+    changes: list of (student_id, date, old_status or None, new_status), already written
+    Returns: list of (student_id, streak, streak_start, threshold) for every alert
+             threshold the write pushed a streak up to
+    """
+    by_student = {}
+    for student_id, date, _, new_status in changes:
+        by_student.setdefault(student_id, []).append((date, new_status))
+    
+    states = fetch_absence_streaks(conn, by_student)
+    updates = []
+    crossed = []
+    for student_id, records in by_student.items():
+        before = states.get(student_id)
+        state = before
+        for date, status in sorted(records):
+            if state is not None and date <= state[0]:
+                state = recount_absence_streak(conn, student_id)
+                break
+            streak, streak_start = (state[1], state[2]) if state else (0, None)
+            if status == 'absent':
+                state = (date, streak + 1, streak_start or date)
+            else:
+                state = (date, 0, None)
+        
+        if state is None or state == before:
+            continue
+        updates.append((student_id,) + state)
+        
+        previous_streak = before[1] if before else 0
+        for threshold in ABSENCE_STREAK_ALERT_THRESHOLDS:
+            if previous_streak < threshold <= state[1]:
+                crossed.append((student_id, state[1], state[2], threshold))
+    
+    conn.executemany(
+        '''INSERT INTO student_absence_streaks (student_id, last_date, current_streak, streak_start)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT(student_id) DO UPDATE SET
+               last_date = excluded.last_date,
+               current_streak = excluded.current_streak,
+               streak_start = excluded.streak_start''',
+        updates
+    )
+    return crossed
+
+def rebuild_absence_streaks(conn):
+    """
+    Recompute every student's streak from daily_attendance
+    The trailing streak is every record after the student's last non-absent one
+    Returns: number of students with attendance records
+    """
+    conn.execute('DELETE FROM student_absence_streaks')
+    cursor = conn.execute(
+        '''INSERT INTO student_absence_streaks (student_id, last_date, current_streak, streak_start)
+           SELECT d.student_id,
+                  MAX(d.date),
+                  COUNT(CASE WHEN d.date > COALESCE(b.last_attended, '') THEN 1 END),
+                  MIN(CASE WHEN d.date > COALESCE(b.last_attended, '') THEN d.date END)
+           FROM daily_attendance d
+           LEFT JOIN (SELECT student_id, MAX(date) AS last_attended
+                      FROM daily_attendance
+                      WHERE status != 'absent'
+                      GROUP BY student_id) b ON b.student_id = d.student_id
+           GROUP BY d.student_id'''
+    )
+    conn.commit()
+    return cursor.rowcount
+
+def enqueue_absence_streak_alerts(conn, crossed):
+    """
+    Queue one parent email per student whose streak crossed an alert threshold
+    (one per threshold: the dedup key is the day the streak reached it, so the
+    3-, 5- and 10-day alerts of one streak are each sent once)
+    Returns: number of emails queued
+    """
+    # Several thresholds crossed by one write (e.g. a back-dated correction) send one email
+    longest = {}
+    for student_id, streak, streak_start, threshold in crossed:
+        longest[student_id] = (streak, streak_start, threshold)
+    
+    students = fetch_students_by_id(conn, list(longest))
+    alerts = []
+    for student_id, (streak, streak_start, threshold) in longest.items():
+        student = students.get(student_id)
+        if not student or not student['parent_email']:
+            continue
+        # The streak's threshold-th record (idx_daily_attendance_student_date)
+        reached_on = conn.execute(
+            '''SELECT date FROM daily_attendance
+               WHERE student_id = ? AND date >= ?
+               ORDER BY date LIMIT 1 OFFSET ?''',
+            (student_id, streak_start, threshold - 1)
+        ).fetchone()['date']
+        alerts.append({
+            'student_id': student_id,
+            'alert_type': 'absence_streak',
+            'date': reached_on,
+            'recipient': student['parent_email'],
+            'message': f"{student['name']} has been absent {streak} consecutive days since {streak_start}",
+            'payload': {
+                'student_name': student['name'],
+                'roll_no': student['roll_no'],
+                'class_name': student['class'],
+                'section': student['section'],
+                'streak': streak,
+                'since': streak_start
+            }
+        })
+    return dispatch_alerts(conn, alerts).count('queued')
+
+# ============================================
+# BULK ATTENDANCE WRITES
+# ============================================
+
+# Map UI status labels to the daily_attendance CHECK constraint (lowercase)
+STUDENT_STATUS_MAP = {
+    'Present': 'present',
+    'Absent': 'absent',
+    'Late': 'late',
+    'On Leave': 'absent'  # Map "On Leave" to absent
+}
+
+TEACHER_ATTENDANCE_STATUSES = ('present', 'absent', 'leave', 'not_marked')
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+SQL_IN_CHUNK_SIZE = 500
+
+def chunked(items, size=SQL_IN_CHUNK_SIZE):
+    """Yield successive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def placeholders(count):
+    """Return '?, ?, ...' for an IN (...) list of `count` parameters"""
+    return ', '.join('?' * count)
+
+def parse_attendance_records(records, owner_field, parse_status):
+    """
+    Validate a whole attendance payload before anything is written
+    parse_status: maps a record to (status, extra column values) or raises ValueError
+    Returns: (rows, errors) - rows is {(owner_id, date): (status, *extra)},
+             later duplicates of the same owner/date win
+    """
+    rows = {}
+    errors = []
+    
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append(f'Record {index}: expected an object')
+            continue
+        
+        try:
+            owner_id = int(record.get(owner_field))
+        except (TypeError, ValueError):
+            errors.append(f'Record {index}: invalid or missing {owner_field}')
+            continue
+        
+        date = record.get('date')
+        try:
+            datetime.strptime(date or '', '%Y-%m-%d')
+        except (TypeError, ValueError):
+            errors.append(f'Record {index}: invalid or missing date (expected YYYY-MM-DD)')
+            continue
+        
+        try:
+            rows[(owner_id, date)] = parse_status(record)
+        except ValueError as e:
+            errors.append(f'Record {index}: {e}')
+    
+    return rows, errors
+
+def parse_student_attendance_status(record):
+    """Unknown or missing student statuses default to present"""
+    return (STUDENT_STATUS_MAP.get(record.get('status', 'Present'), 'present'),)
+
+def parse_teacher_attendance_status(record):
+    """Teacher statuses must already match the teacher_attendance CHECK constraint"""
+    status = record.get('status')
+    if status not in TEACHER_ATTENDANCE_STATUSES:
+        raise ValueError(f'invalid status {status!r}')
+    return (status, record.get('remarks', '') or '')
+
+def fetch_attendance_statuses(conn, table, owner_column, keys):
+    """
+    Look up the current status for many (owner_id, date) keys at once
+    Returns: {(owner_id, date): status} for keys that already have a row
+    """
+    owners = sorted({owner_id for owner_id, _ in keys})
+    dates = sorted({date for _, date in keys})
+    statuses = {}
+    
+    for owner_chunk in chunked(owners):
+        for date_chunk in chunked(dates):
+            cursor = conn.execute(
+                f'''SELECT {owner_column}, date, status FROM {table}
+                    WHERE date IN ({placeholders(len(date_chunk))})
+                      AND {owner_column} IN ({placeholders(len(owner_chunk))})''',
+                date_chunk + owner_chunk
+            )
+            for owner_id, date, status in cursor:
+                if (owner_id, date) in keys:
+                    statuses[(owner_id, date)] = status
+    
+    return statuses
+
+def bulk_upsert_attendance(conn, table, owner_column, rows, value_columns, touch_columns=()):
+    """
+    Write attendance rows keyed by UNIQUE(owner_column, date) in one executemany
+    rows: {(owner_id, date): tuple of values for value_columns}
+    touch_columns: columns reset to CURRENT_TIMESTAMP when an existing row is updated
+    The caller commits
+    """
+    columns = ', '.join((owner_column, 'date') + tuple(value_columns))
+    assignments = [f'{column} = excluded.{column}' for column in value_columns]
+    assignments += [f'{column} = CURRENT_TIMESTAMP' for column in touch_columns]
+    
+    conn.executemany(
+        f'''INSERT INTO {table} ({columns})
+            VALUES ({placeholders(2 + len(value_columns))})
+            ON CONFLICT({owner_column}, date) DO UPDATE SET {', '.join(assignments)}''',
+        [(owner_id, date) + tuple(values) for (owner_id, date), values in rows.items()]
+    )
+
+def save_student_attendance(conn, rows):
+    """
+    Upsert parsed student attendance and keep the rollups and absence streaks in step
+    Opens a BEGIN IMMEDIATE transaction (the caller commits), so a concurrent save of the
+    same day waits instead of applying its delta against the same previous statuses
+    Returns: (list of (student_id, date) now marked absent, absence streaks that crossed an alert threshold)
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    previous = fetch_attendance_statuses(conn, 'daily_attendance', 'student_id', rows)
+    bulk_upsert_attendance(conn, 'daily_attendance', 'student_id', rows, ('status',))
+    
+    crossed = apply_attendance_changes(conn, [
+        (student_id, date, previous.get((student_id, date)), status)
+        for (student_id, date), (status,) in rows.items()
+    ])
+    
+    return [key for key, (status,) in rows.items() if status == 'absent'], crossed
+
+def fetch_students_by_id(conn, student_ids):
+    """Return {student_id: row} for the given ids using chunked IN (...) lookups"""
+    student_ids = sorted(set(student_ids))
+    students = {}
+    for chunk in chunked(student_ids):
+        for row in conn.execute(
+            f'''SELECT student_id, name, roll_no, class, section, parent_email
+                FROM students
+                WHERE student_id IN ({placeholders(len(chunk))})''',
+            chunk
+        ):
+            students[row['student_id']] = row
+    return students
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+# Dashboard endpoints are polled from every open tab; cache their JSON briefly
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL_SECONDS = 30
+
+class ResponseCache:
+    """
+    In-process TTL + LRU cache for read-only JSON responses
+    Entries are tagged with the data they read (e.g. 'fees'); writes invalidate by tag
+    Concurrent misses for one key wait for a single computation
+    """
+    
+    def __init__(self, max_entries):
+        self._entries = OrderedDict()  # key -> (expires_at, tags, status, body)
+        self._loading = {}             # key -> Event while one request computes it
+        self._tag_versions = {}        # tag -> bumped on every invalidation
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def get_or_compute(self, key, tags, ttl, compute):
+        """
+        Return the cached (status, body) for key, or call compute() to fill it
+        compute: returns (status, body); only 200 responses are stored
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[2], entry[3]
+                
+                loading = self._loading.get(key)
+                if loading is None:
+                    self.misses += 1
+                    loading = self._loading[key] = threading.Event()
+                    versions = [self._tag_versions.get(tag, 0) for tag in tags]
+                    break
+                self.waits += 1
+            
+            # Another request is already computing this key
+            loading.wait(timeout=ttl)
+        
+        try:
+            status, body = compute()
+            with self._lock:
+                # Skip storing a result that a write invalidated while it was computed
+                current = [self._tag_versions.get(tag, 0) for tag in tags]
+                if status == 200 and current == versions:
+                    self._entries[key] = (time.monotonic() + ttl, tags, status, body)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            return status, body
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+    
+    def invalidate(self, *tags):
+        """Drop every entry that read any of the given tags"""
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            stale = [key for key, entry in self._entries.items() if not entry[1].isdisjoint(tags)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+    
+    def versions(self, tags):
+        """Current version counter of each tag (bumped by every invalidate())"""
+        with self._lock:
+            return [self._tag_versions.get(tag, 0) for tag in tags]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                'max_entries': self.max_entries,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'hit_rate': round((self.hits + self.waits) / lookups * 100, 1) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES)
+
+def cached_response(*tags, ttl=RESPONSE_CACHE_TTL_SECONDS):
+    """
+    Cache a read-only JSON view keyed by database, date, path and query parameters
+    tags: data the view reads; writes pass the same names to record_data_change()
+    """
+    tags = frozenset(tags)
+    
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Views that report "today" must not outlive the day they were computed on
+            key = (DATABASE, datetime.now().strftime('%Y-%m-%d'), request.path,
+                   tuple(sorted(request.args.items(multi=True))))
+            
+            def compute():
+                response = app.make_response(view(*args, **kwargs))
+                return response.status_code, response.get_data()
+            
+            status, body = response_cache.get_or_compute(key, tags, ttl, compute)
+            return app.response_class(body, status=status, mimetype='application/json')
+        return wrapper
+    return decorator
+
+# Version counters restart at zero with the process, so ETags also carry a per-process epoch
+ETAG_EPOCH = base64.urlsafe_b64encode(os.urandom(6)).decode()
+
+def conditional_get(*tags):
+    """
+    Give a read-only JSON view a strong ETag built from the versions of the data it reads
+    A matching If-None-Match returns 304 without running the view (or touching the database)
+    """
+    tags = tuple(sorted(tags))
+    
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Read versions before the view runs so a concurrent write can only make the ETag older
+            state = [ETAG_EPOCH, DATABASE, request.full_path, datetime.now().strftime('%Y-%m-%d'),
+                     response_cache.versions(tags)]
+            etag = hashlib.sha1(json.dumps(state).encode()).hexdigest()
+            
+            if etag in request.if_none_match:
+                response = app.response_class(status=304)
+            else:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+# ============================================
+# DASHBOARD CHANGE FEED (SERVER-SENT EVENTS)
+# ============================================
+
+DASHBOARD_STREAM_HEARTBEAT_SECONDS = 15
+DASHBOARD_STREAM_RETRY_MS = 5000
+CHANGE_FEED_HISTORY = 256
+
+class ChangeFeed:
+    """
+    One server-side feed of data changes that every dashboard stream waits on
+    Each change gets a sequence number; subscribers ask for everything after the last one they saw
+    """
+    
+    def __init__(self, history):
+        self._changes = deque(maxlen=history)  # (seq, tags)
+        self._condition = threading.Condition()
+        self.seq = 0
+        self.published = 0
+        self.subscribers = 0
+    
+    def publish(self, tags):
+        with self._condition:
+            self.seq += 1
+            self.published += 1
+            self._changes.append((self.seq, frozenset(tags)))
+            self._condition.notify_all()
+    
+    def wait(self, after_seq, timeout):
+        """
+        Block until there are changes after after_seq (or timeout)
+        Returns: (latest seq, set of changed tags, or None if history no longer reaches back)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.seq > after_seq, timeout=timeout)
+            if self.seq == after_seq:
+                return after_seq, set()
+            if not self._changes or self._changes[0][0] > after_seq + 1:
+                return self.seq, None
+            tags = set()
+            for seq, changed in self._changes:
+                if seq > after_seq:
+                    tags |= changed
+            return self.seq, tags
+    
+    def subscribe(self, delta):
+        with self._condition:
+            self.subscribers += delta
+    
+    def get_metrics(self):
+        with self._condition:
+            return {
+                'seq': self.seq,
+                'published': self.published,
+                'subscribers': self.subscribers
+            }
+
+change_feed = ChangeFeed(CHANGE_FEED_HISTORY)
+
+def record_data_change(*tags):
+    """Call after committing a write: invalidates cached responses and notifies dashboard streams"""
+    response_cache.invalidate(*tags)
+    change_feed.publish(tags)
+
+class DashboardSnapshots:
+    """Latest payload of each dashboard event, computed once per data version for all streams"""
+    
+    def __init__(self):
+        self._payloads = {}  # (stream, event) -> (version, payload)
+        self._lock = threading.Lock()
+        self.computations = 0
+    
+    def get(self, stream, event, view, tags):
+        version = [DATABASE, datetime.now().strftime('%Y-%m-%d'), response_cache.versions(tags)]
+        with self._lock:
+            cached = self._payloads.get((stream, event))
+            if cached and cached[0] == version:
+                return cached[1]
+            
+            # Run the undecorated view in its own app context so its pooled
+            # connection is returned straight away instead of held by the stream
+            with app.app_context():
+                response = app.make_response(getattr(view, '__wrapped__', view)())
+                payload = response.get_json()
+            
+            self._payloads[(stream, event)] = (version, payload)
+            self.computations += 1
+            return payload
+
+dashboard_snapshots = DashboardSnapshots()
+
+def format_sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+def dashboard_event_stream(stream, events):
+    """
+    Yield SSE messages: the full payload of every event first, then only the
+    top-level keys that changed whenever the feed reports a relevant write
+    events: list of (event name, view, tags the view reads)
+    """
+    change_feed.subscribe(1)
+    try:
+        seq = change_feed.seq
+        last_sent = {}
+        yield f'retry: {DASHBOARD_STREAM_RETRY_MS}\n\n'
+        
+        for event, view, tags in events:
+            last_sent[event] = dashboard_snapshots.get(stream, event, view, tags)
+            yield format_sse(event, last_sent[event])
+        
+        while True:
+            seq, changed = change_feed.wait(seq, DASHBOARD_STREAM_HEARTBEAT_SECONDS)
+            if changed is not None and not changed:
+                # Idle: a comment line keeps proxies from closing the stream (no queries)
+                yield ': keepalive\n\n'
+                continue
+            
+            for event, view, tags in events:
+                if changed is not None and changed.isdisjoint(tags):
+                    continue
+                payload = dashboard_snapshots.get(stream, event, view, tags)
+                delta = {key: value for key, value in payload.items() if last_sent[event].get(key) != value}
+                last_sent[event] = payload
+                if delta:
+                    yield format_sse(event, delta)
+    finally:
+        change_feed.subscribe(-1)
 
 # ============================================
 # ROUTE: MAIN DASHBOARD
@@ -510,21 +2129,14 @@ def get_teacher_stats():
             'SELECT COUNT(*) FROM students'
         ).fetchone()[0]
         
-        # Calculate today's attendance percentage
+        # Today's attendance percentage from the daily summary row
         today = datetime.now().strftime('%Y-%m-%d')
         attendance_stats = conn.execute(
-            '''SELECT 
-                COUNT(CASE WHEN status = 'present' THEN 1 END) as present,
-                COUNT(*) as total
-               FROM daily_attendance
-               WHERE date = ?''',
+            'SELECT attendance_percentage FROM attendance WHERE date = ?',
             (today,)
         ).fetchone()
         
-        if attendance_stats['total'] > 0:
-            attendance_percentage = round((attendance_stats['present'] / attendance_stats['total']) * 100, 1)
-        else:
-            attendance_percentage = 0
+        attendance_percentage = attendance_stats['attendance_percentage'] if attendance_stats else 0
         
         # Get pending assignments (mock data - can be replaced with actual assignments table)
         pending_assignments = 5  # TODO: Replace with actual query when assignments table is created
@@ -559,67 +2171,74 @@ def get_teacher_stats():
 # API ROUTE: TEACHER CLASSES DATA
 # ============================================
 
+# Average percentage bands, highest first (same bands as the dashboard performance chart)
+GRADE_BANDS = ((90, 'A+'), (85, 'A'), (75, 'B+'), (65, 'B'), (0, 'C'))
+
+TEACHER_CLASSES_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+def grade_for_percentage(percentage):
+    """Letter grade for an average percentage, or None when there are no results"""
+    if percentage is None:
+        return None
+    return next(grade for floor, grade in GRADE_BANDS if percentage >= floor)
+
 @app.route('/api/teacher/classes')
+@cached_response('students', 'exams', 'attendance', 'performance', ttl=TEACHER_CLASSES_CACHE_TTL_SECONDS)
 def get_teacher_classes():
     """
     Get all classes assigned to the teacher
+    One grouped query: roster size, today's attendance, average result and examined subjects per class
     Returns: JSON with classes data
     """
     conn = get_db_connection()
     
     try:
-        # Get unique classes from students table grouped by class
+        today = datetime.now().strftime('%Y-%m-%d')
         classes_data = conn.execute(
-            '''SELECT 
-                class as class_name,
-                COUNT(*) as total_students
-               FROM students
-               GROUP BY class
-               ORDER BY class'''
+            '''WITH roster AS (
+                   SELECT class, COUNT(*) AS total_students
+                   FROM students
+                   GROUP BY class
+               ),
+               marked_today AS (
+                   SELECT class, present, total
+                   FROM class_daily_attendance
+                   WHERE date = ?
+               ),
+               results AS (
+                   SELECT class, AVG(percentage) AS avg_percentage
+                   FROM performance
+                   GROUP BY class
+               ),
+               subjects AS (
+                   SELECT class, GROUP_CONCAT(subject, ', ') AS subject
+                   FROM (SELECT DISTINCT class, subject FROM exams ORDER BY class, subject)
+                   GROUP BY class
+               )
+               SELECT r.class AS class_name, r.total_students,
+                      m.present, m.total AS marked, p.avg_percentage, e.subject
+               FROM roster r
+               LEFT JOIN marked_today m ON m.class = r.class
+               LEFT JOIN results p ON p.class = r.class
+               LEFT JOIN subjects e ON e.class = r.class
+               ORDER BY r.class''',
+            (today,)
         ).fetchall()
         
         classes_list = []
-        
         for class_row in classes_data:
-            class_name = class_row['class_name']
-            total_students = class_row['total_students']
-            
-            # Calculate attendance rate for this class (simplified)
-            today = datetime.now().strftime('%Y-%m-%d')
-            try:
-                attendance_stats = conn.execute(
-                    '''SELECT 
-                        COUNT(CASE WHEN a.status = 'Present' THEN 1 END) as present,
-                        COUNT(*) as total
-                       FROM attendance a
-                       JOIN students s ON a.student_id = s.student_id
-                       WHERE s.class = ? AND a.date = ?''',
-                    (class_name, today)
-                ).fetchone()
-                
-                if attendance_stats and attendance_stats['total'] > 0:
-                    attendance_rate = round((attendance_stats['present'] / attendance_stats['total']) * 100)
-                else:
-                    attendance_rate = 0
-            except:
+            if class_row['marked']:
+                attendance_rate = round((class_row['present'] / class_row['marked']) * 100)
+            else:
                 attendance_rate = 0
             
-            # Get subject from teachers table (match first word of class with grade)
-            try:
-                subject_data = conn.execute(
-                    'SELECT subject FROM teachers LIMIT 1'
-                ).fetchone()
-                subject = subject_data['subject'] if subject_data else 'General'
-            except:
-                subject = 'General'
-            
             classes_list.append({
-                'class_name': class_name,
-                'subject': subject,
-                'total_students': total_students,
+                'class_name': class_row['class_name'],
+                'subject': class_row['subject'] or 'General',
+                'total_students': class_row['total_students'],
                 'attendance_rate': attendance_rate,
-                'avg_grade': 'B+',  # TODO: Calculate from grades table when available
-                'schedule': 'Mon, Wed, Fri - 9:00 AM'  # TODO: Get from schedule table
+                'avg_grade': grade_for_percentage(class_row['avg_percentage']),
+                'schedule': None  # No timetable table yet; the UI shows "Schedule TBA"
             })
         
         return jsonify({
@@ -639,6 +2258,183 @@ def get_teacher_classes():
     finally:
         conn.close()
 
+# ============================================
+# STUDENT LISTS (KEYSET PAGINATION)
+# ============================================
+
+STUDENT_PAGE_SIZE = 100
+STUDENT_PAGE_SIZE_MAX = 500
+
+# Student lists are ordered by (class, section, roll_no); roll_no is unique,
+# so the last row's key is enough to resume from (served by idx_students_class_section_roll)
+STUDENT_KEYSET_COLUMNS = ('class', 'section', 'roll_no')
+
+def encode_page_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode()
+
+def decode_page_cursor(cursor, key_types=(str,) * len(STUDENT_KEYSET_COLUMNS)):
+    """
+    Decode a cursor from encode_page_cursor; raises ValueError when malformed
+    key_types: expected type of each sort key value (student lists sort on three strings)
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError('Invalid cursor')
+    
+    if (not isinstance(values, list) or len(values) != len(key_types)
+            or not all(isinstance(value, key_type) for value, key_type in zip(values, key_types))):
+        raise ValueError('Invalid cursor')
+    return values
+
+def parse_page_args(args, page_size=STUDENT_PAGE_SIZE, page_size_max=STUDENT_PAGE_SIZE_MAX,
+                    key_types=(str,) * len(STUDENT_KEYSET_COLUMNS)):
+    """
+    Read the limit/cursor query parameters (limit is capped at page_size_max)
+    Returns: (limit, sort key to resume after or None); raises ValueError on bad input
+    """
+    try:
+        limit = int(args.get('limit', page_size))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    
+    cursor = args.get('cursor', '')
+    return min(limit, page_size_max), decode_page_cursor(cursor, key_types) if cursor else None
+
+def parse_fields_arg(args, available):
+    """
+    Read the fields= projection (comma separated); defaults to every available field
+    Raises ValueError for unknown field names
+    """
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    if not fields:
+        return list(available)
+    
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+STUDENT_TYPEAHEAD_LIMIT = 10
+STUDENT_TYPEAHEAD_LIMIT_MAX = 50
+
+def build_student_search_query(search):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix
+    Returns: MATCH expression, or '' when the text has no searchable words
+    """
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', search))
+
+def build_student_search_clause(search):
+    """
+    WHERE clause (on students s) matching the search text through students_fts
+    A purely numeric search also matches the student_id exactly
+    Returns: (clause, params), or (None, []) when there is nothing to search for
+    """
+    match = build_student_search_query(search)
+    if not match:
+        return None, []
+    
+    clause = 's.student_id IN (SELECT rowid FROM students_fts WHERE students_fts MATCH ?)'
+    if search.isdigit():
+        return f'(s.student_id = ? OR {clause})', [int(search), match]
+    return clause, [match]
+
+def build_student_filters(args, include_search=True):
+    """Shared search/class/section/status filters as WHERE clauses on students s"""
+    clauses = []
+    params = []
+    
+    if include_search:
+        search_clause, search_params = build_student_search_clause(args.get('search', '').strip())
+        if search_clause:
+            clauses.append(search_clause)
+            params.extend(search_params)
+    
+    for column in ('class', 'section', 'status'):
+        value = args.get(column, '').strip()
+        if value:
+            clauses.append(f's.{column} = ?')
+            params.append(value)
+    
+    return clauses, params
+
+def fetch_student_page(conn, field_sql, fields, clauses, params, limit, after, joins=''):
+    """
+    Fetch one keyset page of students ordered by (class, section, roll_no)
+    field_sql: {field name: SQL expression} the fields= projection picks from
+    Returns: (list of dicts holding only `fields`, cursor for the next page or None)
+    """
+    clauses = list(clauses)
+    params = list(params)
+    
+    if after:
+        clauses.append('(s.class, s.section, s.roll_no) > (?, ?, ?)')
+        params.extend(after)
+    
+    columns = [f'{field_sql[field]} AS "{field}"' for field in fields]
+    columns += [f's.{column} AS "_key_{column}"' for column in STUDENT_KEYSET_COLUMNS]
+    
+    query = f'''SELECT {', '.join(columns)}
+                FROM students s {joins}
+                WHERE {' AND '.join(clauses) or '1=1'}
+                ORDER BY s.class, s.section, s.roll_no
+                LIMIT ?'''
+    params.append(limit + 1)
+    
+    rows = conn.execute(query, params).fetchall()
+    
+    # One extra row tells us whether another page exists
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor(
+            rows[-1][f'_key_{column}'] for column in STUDENT_KEYSET_COLUMNS
+        )
+    
+    return [{field: row[field] for field in fields} for row in rows], next_cursor
+
+def count_student_rows(conn, clauses, params):
+    """Number of students matching the list filters across every page"""
+    where = ' AND '.join(clauses) or '1=1'
+    return conn.execute(f'SELECT COUNT(*) FROM students s WHERE {where}', params).fetchone()[0]
+
+def search_students_ranked(conn, field_sql, fields, search, clauses, params, limit):
+    """
+    Typeahead search: the best `limit` matches ranked by bm25 (best first)
+    clauses/params: extra filters on students s (class, section, status)
+    Returns: list of dicts holding only `fields`
+    """
+    match = build_student_search_query(search)
+    if not match:
+        return []
+    
+    columns = ', '.join(f'{field_sql[field]} AS "{field}"' for field in fields)
+    
+    # rank is bm25 with the column weights stored in students_fts (lower is better)
+    matches = '''SELECT rowid AS student_id, 0 AS exact, rank AS score
+                 FROM students_fts WHERE students_fts MATCH ?'''
+    match_params = [match]
+    
+    # An exact student_id hit always ranks first
+    if search.isdigit():
+        matches += ' UNION ALL SELECT ?, 1, 0'
+        match_params.append(int(search))
+    
+    query = f'''SELECT {columns}
+                FROM ({matches}) m
+                JOIN students s ON s.student_id = m.student_id
+                WHERE {' AND '.join(clauses) or '1=1'}
+                GROUP BY s.student_id
+                ORDER BY MAX(m.exact) DESC, MIN(m.score)
+                LIMIT ?'''
+    rows = conn.execute(query, match_params + list(params) + [limit]).fetchall()
+    
+    return [{field: row[field] for field in fields} for row in rows]
+
 # ============================================
 # API ROUTE: GET STUDENTS FOR ATTENDANCE
 # ============================================
@@ -689,58 +2485,56 @@ def get_teacher_students():
             'students': []
         }), 500
 
+STUDENT_DETAIL_FIELDS = {
+    'student_id': 's.student_id',
+    'roll_no': 's.roll_no',
+    'name': 's.name',
+    'class': 's.class',
+    'section': 's.section',
+    'email': 's.email',
+    'enrollment_date': 's.enrollment_date',
+    'status': 's.status',
+    'parent_email': 's.parent_email'
+}
+
 @app.route('/api/teacher/students/all')
 def get_all_students():
-    """Get all students with detailed information for students page"""
-    search = request.args.get('search', '').strip()
-    class_filter = request.args.get('class', '').strip()
-    section_filter = request.args.get('section', '').strip()
-    
-    conn = get_db_connection()
+    """
+    Get one page of students with detailed information for the students page
+    Query params: search, class, section, status, fields, limit, cursor
+    mode=typeahead returns the top `limit` search matches ranked by relevance instead
+    total counts every matching student, not just this page
+    """
+    if request.args.get('mode') == 'typeahead':
+        return search_students_typeahead()
     
     try:
-        query = '''SELECT student_id, roll_no, name, class, section, email, 
-                         enrollment_date, status, parent_email
-                   FROM students
-                   WHERE 1=1'''
-        params = []
-        
-        # Apply filters
-        if search:
-            query += ''' AND (name LIKE ? OR roll_no LIKE ? OR student_id LIKE ?)'''
-            search_param = f'%{search}%'
-            params.extend([search_param, search_param, search_param])
-        
-        if class_filter:
-            query += ''' AND class = ?'''
-            params.append(class_filter)
-        
-        if section_filter:
-            query += ''' AND section = ?'''
-            params.append(section_filter)
-        
-        query += ''' ORDER BY class, section, roll_no'''
-        
-        students = conn.execute(query, params).fetchall()
-        
-        students_list = [{
-            'student_id': s['student_id'],
-            'roll_no': s['roll_no'],
-            'name': s['name'],
-            'class': s['class'],
-            'section': s['section'],
-            'email': s['email'],
-            'enrollment_date': s['enrollment_date'],
-            'status': s['status'],
-            'parent_email': s['parent_email']
-        } for s in students]
+        limit, after = parse_page_args(request.args)
+        fields = parse_fields_arg(request.args, STUDENT_DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'students': []
+        }), 400
+    
+    conn = get_db_connection()
+    
+    try:
+        clauses, params = build_student_filters(request.args)
+        students_list, next_cursor = fetch_student_page(
+            conn, STUDENT_DETAIL_FIELDS, fields, clauses, params, limit, after
+        )
+        total = count_student_rows(conn, clauses, params)
         
         conn.close()
         
         return jsonify({
             'success': True,
             'students': students_list,
-            'total': len(students_list)
+            'count': len(students_list),
+            'total': total,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -748,17 +2542,44 @@ def get_all_students():
         return jsonify({
             'success': False,
             'error': str(e),
-            'students': [],
-            'total': 0
+            'students': []
         }), 500
 
+def search_students_typeahead():
+    """Ranked, size-limited student search for typeahead inputs"""
+    try:
+        limit = int(request.args.get('limit', STUDENT_TYPEAHEAD_LIMIT))
+        if limit < 1:
+            raise ValueError('limit must be at least 1')
+        fields = parse_fields_arg(request.args, STUDENT_DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'students': []
+        }), 400
+    
+    conn = get_db_connection()
+    clauses, params = build_student_filters(request.args, include_search=False)
+    students_list = search_students_ranked(
+        conn, STUDENT_DETAIL_FIELDS, fields, request.args.get('search', '').strip(),
+        clauses, params, min(limit, STUDENT_TYPEAHEAD_LIMIT_MAX)
+    )
+    conn.close()
+    
+    return jsonify({
+        'success': True,
+        'students': students_list,
+        'count': len(students_list)
+    })
+
 # ============================================
 # API ROUTE: SAVE ATTENDANCE
 # ============================================
 
 @app.route('/api/teacher/attendance/save', methods=['POST'])
 def save_attendance():
-    """Save attendance records and send email notifications for absent students"""
+    """Save attendance records and queue email notifications for absent students"""
     try:
         data = request.json
         
@@ -776,116 +2597,83 @@ def save_attendance():
                 'error': 'No attendance records provided'
             }), 400
         
+        # Validate the whole payload before writing anything
+        rows, errors = parse_attendance_records(
+            attendance_records, 'student_id', parse_student_attendance_status
+        )
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid attendance records',
+                'details': errors
+            }), 400
+        
         conn = get_db_connection()
         
-        # Track absent students for email notifications
+        # One upsert for every record (rollups and streaks move in the same transaction)
+        absent_keys, crossed_streaks = save_student_attendance(conn, rows)
+        
+        # Track absent students for email notifications (one lookup for all absentees)
+        students = fetch_students_by_id(conn, [student_id for student_id, _ in absent_keys])
         absent_students = []
+        for student_id, date in absent_keys:
+            student_info = students.get(student_id)
+            if student_info and student_info['parent_email']:
+                absent_students.append({
+                    'student_id': student_info['student_id'],
+                    'name': student_info['name'],
+                    'roll_no': student_info['roll_no'],
+                    'class': student_info['class'],
+                    'section': student_info['section'],
+                    'parent_email': student_info['parent_email'],
+                    'date': date
+                })
         
-        for record in attendance_records:
-            # Validate required fields
-            if not record.get('student_id') or not record.get('date'):
-                continue
-            
-            # Check if attendance already exists in daily_attendance table
-            existing = conn.execute(
-                '''SELECT id FROM daily_attendance
-                   WHERE student_id = ? AND date = ?''',
-                (record['student_id'], record['date'])
-            ).fetchone()
-            
-            # Map status to match database constraint (lowercase)
-            status_map = {
-                'Present': 'present',
-                'Absent': 'absent',
-                'Late': 'late',
-                'On Leave': 'absent'  # Map "On Leave" to absent
+        # Streak alerts are escalations and bypass the per-parent rate limit
+        streak_alerts = enqueue_absence_streak_alerts(conn, crossed_streaks)
+        
+        # Queue email notifications to parents of absent students (re-saving a day
+        # doesn't mail them again); the outbox workers deliver after the response
+        outcomes = dispatch_alerts(conn, [{
+            'student_id': student['student_id'],
+            'alert_type': 'absence',
+            'date': student['date'],
+            'recipient': student['parent_email'],
+            'message': f"Absence notification for {student['name']} on {student['date']}",
+            'payload': {
+                'student_name': student['name'],
+                'roll_no': student['roll_no'],
+                'class_name': student['class'],
+                'section': student['section'],
+                'date': student['date']
             }
-            db_status = status_map.get(record.get('status', 'Present'), 'present')
-            
-            if existing:
-                # Update existing record
-                conn.execute(
-                    '''UPDATE daily_attendance
-                       SET status = ?
-                       WHERE student_id = ? AND date = ?''',
-                    (db_status, record['student_id'], record['date'])
-                )
-            else:
-                # Insert new record
-                conn.execute(
-                    '''INSERT INTO daily_attendance (student_id, date, status)
-                       VALUES (?, ?, ?)''',
-                    (record['student_id'], record['date'], db_status)
-                )
-            
-            # If student is absent, get their details for email notification
-            if db_status == 'absent':
-                student_info = conn.execute(
-                    '''SELECT student_id, name, roll_no, class, section, parent_email
-                       FROM students
-                       WHERE student_id = ?''',
-                    (record['student_id'],)
-                ).fetchone()
-                
-                if student_info and student_info['parent_email']:
-                    absent_students.append({
-                        'student_id': student_info['student_id'],
-                        'name': student_info['name'],
-                        'roll_no': student_info['roll_no'],
-                        'class': student_info['class'],
-                        'section': student_info['section'],
-                        'parent_email': student_info['parent_email'],
-                        'date': record['date']
-                    })
+        } for student in absent_students])
+        absence_alerts = outcomes.count('queued')
+        rate_limited = outcomes.count('rate_limited')
         
         conn.commit()
+        record_data_change('attendance', 'alert_logs')
         conn.close()
         
-        # Send email notifications to parents of absent students
-        emails_sent = 0
-        emails_failed = 0
-        
-        for student in absent_students:
-            try:
-                success = send_absence_notification(
-                    student['name'],
-                    student['roll_no'],
-                    student['class'],
-                    student['section'],
-                    student['date'],
-                    student['parent_email']
-                )
-                
-                # Log the alert
-                message = f"Absence notification for {student['name']} on {student['date']}"
-                log_alert(
-                    student['student_id'],
-                    'absence',
-                    student['date'],
-                    student['parent_email'],
-                    message,
-                    'sent' if success else 'failed'
-                )
-                
-                if success:
-                    emails_sent += 1
-                else:
-                    emails_failed += 1
-            except Exception as email_error:
-                print(f"Failed to send email for {student['name']}: {email_error}")
-                emails_failed += 1
+        emails_queued = absence_alerts + streak_alerts
+        if emails_queued > 0:
+            email_outbox.start()
+            email_outbox.notify()
         
         message = f'Attendance saved successfully for {len(attendance_records)} students'
-        if emails_sent > 0:
-            message += f'. {emails_sent} absence notification(s) sent to parents'
-        if emails_failed > 0:
-            message += f'. {emails_failed} email(s) failed to send'
+        if absence_alerts:
+            message += f'. {absence_alerts} absence notification(s) queued for parents'
+        if streak_alerts:
+            message += f'. {streak_alerts} consecutive absence alert(s) queued'
+        if rate_limited:
+            message += f'. {rate_limited} absence notification(s) held back by the daily limit per parent'
         
         return jsonify({
             'success': True,
             'message': message,
-            'emails_sent': emails_sent,
-            'emails_failed': emails_failed
+            'emails_queued': emails_queued,
+            'emails_rate_limited': rate_limited,
+            'streak_alerts': streak_alerts
         })
         
     except Exception as e:
@@ -975,75 +2763,36 @@ def get_daily_attendance():
 
 @app.route('/api/teacher/attendance/monthly')
 def get_monthly_attendance():
-    """Get monthly attendance report"""
+    """
+    Get monthly attendance report
+    working_days counts the month's school days up to today; unmarked_days is the shortfall per student
+    """
     month = request.args.get('month')  # Format: YYYY-MM
     class_name = request.args.get('class', '')
     section = request.args.get('section', '')
     
+    try:
+        working_days = month_working_days(month)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     conn = get_db_connection()
     
     try:
-        # Get all students
-        query = 'SELECT student_id, name, class, section FROM students WHERE 1=1'
-        params = []
-        
-        if class_name:
-            query += ' AND class = ?'
-            params.append(class_name)
-        
-        if section:
-            query += ' AND section = ?'
-            params.append(section)
-        
-        students = conn.execute(query, params).fetchall()
-        
-        # Calculate attendance for each student
-        students_data = []
-        total_present = 0
-        total_records = 0
-        
-        for student in students:
-            # Get attendance for the month from daily_attendance
-            attendance = conn.execute(
-                '''SELECT status FROM daily_attendance
-                   WHERE student_id = ? AND strftime('%Y-%m', date) = ?''',
-                (student['student_id'], month)
-            ).fetchall()
-            
-            total_days = len(attendance)
-            present = sum(1 for a in attendance if a['status'] == 'present')
-            absent = sum(1 for a in attendance if a['status'] == 'absent')
-            
-            if total_days > 0:
-                percentage = round((present / total_days) * 100, 1)
-            else:
-                percentage = 0
-            
-            students_data.append({
-                'student_id': student['student_id'],
-                'name': student['name'],
-                'class': student['class'],
-                'section': student['section'],
-                'total_days': total_days,
-                'present': present,
-                'absent': absent,
-                'percentage': percentage
-            })
-            
-            total_present += present
-            total_records += total_days
-        
-        # Calculate overall percentage
-        if total_records > 0:
-            overall_percentage = round((total_present / total_records) * 100, 2)
-        else:
-            overall_percentage = 0
+        students_data = compute_monthly_attendance(conn, month, class_name, section)
         
         conn.close()
         
+        for student in students_data:
+            student['unmarked_days'] = max(working_days - student['total_days'], 0)
+        
         return jsonify({
             'success': True,
-            'overall_percentage': overall_percentage,
+            'working_days': working_days,
+            'overall_percentage': overall_attendance_percentage(students_data),
             'students': students_data
         })
         
@@ -1056,68 +2805,59 @@ def get_monthly_attendance():
             'success': False,
             'error': str(e)
         }), 500
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
 
 # ============================================
 # API ROUTE: LOW ATTENDANCE ALERT
 # ============================================
 
+def find_low_attendance_students(conn, month, threshold, class_name='', section=''):
+    """
+    Students whose attendance in month is below threshold, read from the monthly rollup
+    (the same counts as the monthly report); absence streaks over school days are added
+    from the attendance matrix
+    """
+    students = [
+        student for student in compute_monthly_attendance(conn, month, class_name, section)
+        if student['total_days'] > 0 and student['percentage'] < threshold
+    ]
+    if not students:
+        return students
+    
+    start, end = month_date_range(month)
+    matrix = attendance_analytics.load_student_matrix(conn, start, end, class_name, section)
+    calendar = get_school_calendar(conn, *report_date_range({'month': month}))
+    matrix = matrix.select_days(calendar.is_school_days(matrix.dates))
+    longest_streaks, current_streaks = matrix.absence_streaks()
+    rows = {student_id: i for i, student_id in enumerate(matrix.owner_ids.tolist())}
+    
+    for student in students:
+        i = rows.get(student['student_id'])
+        student['longest_absence_streak'] = int(longest_streaks[i]) if i is not None else 0
+        student['current_absence_streak'] = int(current_streaks[i]) if i is not None else 0
+    return students
+
 @app.route('/api/teacher/attendance/low')
 def get_low_attendance():
-    """Get students with low attendance"""
-    month = request.args.get('month')
-    threshold = float(request.args.get('threshold', 75))
+    """
+    Get students with low attendance for a month
+    Counts come from the monthly rollup; absence streaks from the vectorized attendance matrix
+    """
+    month = request.args.get('month') or datetime.now().strftime('%Y-%m')
     class_name = request.args.get('class', '')
     section = request.args.get('section', '')
+    try:
+        report_date_range({'month': month})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        threshold = float(request.args.get('threshold', 75))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'threshold must be a number'}), 400
     
     conn = get_db_connection()
     
     try:
-        query = 'SELECT student_id, roll_no, name, class, section FROM students WHERE 1=1'
-        params = []
-        
-        if class_name:
-            query += ' AND class = ?'
-            params.append(class_name)
-        
-        if section:
-            query += ' AND section = ?'
-            params.append(section)
-        
-        students = conn.execute(query, params).fetchall()
-        
-        low_attendance_students = []
-        
-        for student in students:
-            # Get attendance for the month from daily_attendance
-            attendance = conn.execute(
-                '''SELECT status FROM daily_attendance
-                   WHERE student_id = ? AND strftime('%Y-%m', date) = ?''',
-                (student['student_id'], month)
-            ).fetchall()
-            
-            total_days = len(attendance)
-            present = sum(1 for a in attendance if a['status'] == 'present')
-            absent = total_days - present
-            
-            if total_days > 0:
-                percentage = round((present / total_days) * 100, 1)
-                
-                if percentage < threshold:
-                    low_attendance_students.append({
-                        'student_id': student['student_id'],
-                        'roll_no': student['roll_no'],
-                        'name': student['name'],
-                        'class': student['class'],
-                        'section': student['section'],
-                        'total_days': total_days,
-                        'present': present,
-                        'absent': absent,
-                        'percentage': percentage
-                    })
+        low_attendance_students = find_low_attendance_students(conn, month, threshold, class_name, section)
         
         conn.close()
         
@@ -1136,127 +2876,196 @@ def get_low_attendance():
             'error': str(e)
         }), 500
 
+# ============================================
+# API ROUTE: CONSECUTIVE ABSENCE STREAKS
+# ============================================
+
+@app.route('/api/teacher/attendance/streaks')
+def get_absence_streaks():
+    """
+    List students whose current run of consecutive absences is at least min_streak
+    Reads the maintained streak state (indexed), longest streaks first
+    """
+    try:
+        min_streak = int(request.args.get('min_streak', min(ABSENCE_STREAK_ALERT_THRESHOLDS)))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'min_streak must be an integer'}), 400
+    class_name = request.args.get('class', '')
+    section = request.args.get('section', '')
+    
+    query = '''SELECT s.student_id, s.roll_no, s.name, s.class, s.section, s.parent_email,
+                      a.current_streak, a.streak_start, a.last_date
+               FROM student_absence_streaks a
+               JOIN students s ON s.student_id = a.student_id
+               WHERE a.current_streak >= ?'''
+    params = [max(min_streak, 1)]
+    if class_name:
+        query += ' AND s.class = ?'
+        params.append(class_name)
+    if section:
+        query += ' AND s.section = ?'
+        params.append(section)
+    query += ' ORDER BY a.current_streak DESC, s.student_id'
+    
+    conn = get_db_connection()
+    try:
+        students = [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+    
+    return jsonify({
+        'success': True,
+        'min_streak': min_streak,
+        'students': students
+    })
+
 # ============================================
 # API ROUTE: SEND LOW ATTENDANCE ALERTS
 # ============================================
 
+# Why an alert was not queued, as shown to the teacher
+ALERT_SKIP_MESSAGES = {
+    'duplicate': 'Parent already notified for this month'
+}
+
 @app.route('/api/teacher/attendance/low/notify', methods=['POST'])
 def send_low_attendance_notifications():
-    """Send low attendance alert emails to parents"""
+    """
+    Queue low attendance alert emails to parents (at most one per student per month)
+    Body: {"month": "YYYY-MM", "students": [...]} for the listed students, or
+          {"month": ..., "all_below": threshold, "class": ..., "section": ...} to
+          notify every student below the threshold in one pass
+    """
     try:
         data = request.json
         
-        if not data or 'students' not in data:
+        if not data or ('students' not in data and 'all_below' not in data):
             return jsonify({
                 'success': False,
                 'error': 'No student data provided'
             }), 400
         
-        students = data.get('students', [])
+        month = data.get('month') or datetime.now().strftime('%Y-%m')
+        try:
+            report_date_range({'month': month})
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if 'all_below' in data:
+            try:
+                threshold = float(data['all_below'])
+            except (TypeError, ValueError):
+                return jsonify({
+                    'success': False,
+                    'error': 'all_below must be a number'
+                }), 400
+        else:
+            students = data['students']
+            if not isinstance(students, list) or not all(
+                isinstance(s, dict) and type(s.get('student_id')) is int for s in students
+            ):
+                return jsonify({
+                    'success': False,
+                    'error': 'students must be a list of objects with an integer student_id'
+                }), 400
+        
+        conn = get_db_connection()
+        
+        if 'all_below' in data:
+            students = find_low_attendance_students(
+                conn, month, threshold, data.get('class', ''), data.get('section', '')
+            )
         
         if not students:
+            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'No students to notify'
             }), 400
         
-        conn = get_db_connection()
+        details = fetch_students_by_id(conn, [s.get('student_id') for s in students])
         
-        emails_sent = 0
         emails_failed = 0
         results = []
-        
+        alerts = []
         for student_data in students:
-            try:
-                student_id = student_data.get('student_id')
-                
-                # Get student details including parent email and roll_no
-                student = conn.execute(
-                    '''SELECT name, roll_no, class, section, parent_email
-                       FROM students
-                       WHERE student_id = ?''',
-                    (student_id,)
-                ).fetchone()
-                
-                if not student:
-                    results.append({
-                        'student_id': student_id,
-                        'status': 'failed',
-                        'message': 'Student not found'
-                    })
-                    emails_failed += 1
-                    continue
-                
-                if not student['parent_email']:
-                    results.append({
-                        'student_id': student_id,
-                        'name': student['name'],
-                        'status': 'failed',
-                        'message': 'No parent email on file'
-                    })
-                    emails_failed += 1
-                    continue
-                
-                # Send low attendance alert
-                success = send_low_attendance_alert(
-                    student['name'],
-                    student['roll_no'],
-                    student['class'],
-                    student['section'],
-                    student_data.get('total_days', 0),
-                    student_data.get('present', 0),
-                    student_data.get('absent', 0),
-                    student_data.get('percentage', 0),
-                    student['parent_email']
-                )
-                
-                # Log the alert
-                message = f"Low attendance alert: {student_data.get('percentage', 0)}% attendance"
-                log_alert(
-                    student_id,
-                    'low_attendance',
-                    datetime.now().strftime('%Y-%m-%d'),
-                    student['parent_email'],
-                    message,
-                    'sent' if success else 'failed'
-                )
-                
-                if success:
-                    results.append({
-                        'student_id': student_id,
-                        'name': student['name'],
-                        'status': 'sent',
-                        'email': student['parent_email']
-                    })
-                    emails_sent += 1
-                else:
-                    results.append({
-                        'student_id': student_id,
-                        'name': student['name'],
-                        'status': 'failed',
-                        'message': 'Email delivery failed'
-                    })
-                    emails_failed += 1
-                    
-            except Exception as e:
-                print(f"Error processing student {student_data.get('student_id')}: {e}")
+            student_id = student_data.get('student_id')
+            student = details.get(student_id)
+            
+            if not student:
                 results.append({
-                    'student_id': student_data.get('student_id'),
+                    'student_id': student_id,
                     'status': 'failed',
-                    'message': str(e)
+                    'message': 'Student not found'
                 })
                 emails_failed += 1
+                continue
+            
+            if not student['parent_email']:
+                results.append({
+                    'student_id': student_id,
+                    'name': student['name'],
+                    'status': 'failed',
+                    'message': 'No parent email on file'
+                })
+                emails_failed += 1
+                continue
+            
+            alerts.append({
+                'student_id': student_id,
+                'alert_type': 'low_attendance',
+                # One low attendance alert per student per month
+                'date': f'{month}-01',
+                'recipient': student['parent_email'],
+                'message': f"Low attendance alert: {student_data.get('percentage', 0)}% attendance",
+                'payload': {
+                    'student_name': student['name'],
+                    'roll_no': student['roll_no'],
+                    'class_name': student['class'],
+                    'section': student['section'],
+                    'total_classes': student_data.get('total_days', 0),
+                    'classes_attended': student_data.get('present', 0),
+                    'classes_absent': student_data.get('absent', 0),
+                    'attendance_percentage': student_data.get('percentage', 0)
+                }
+            })
         
+        outcomes = dispatch_alerts(conn, alerts)
+        for alert, outcome in zip(alerts, outcomes):
+            result = {
+                'student_id': alert['student_id'],
+                'name': alert['payload']['student_name'],
+                'status': outcome,
+                'email': alert['recipient']
+            }
+            if outcome in ALERT_SKIP_MESSAGES:
+                result['message'] = ALERT_SKIP_MESSAGES[outcome]
+            results.append(result)
+        emails_queued = outcomes.count('queued')
+        emails_skipped = len(outcomes) - emails_queued
+        
+        conn.commit()
         conn.close()
+        record_data_change('alert_logs')
+        
+        if emails_queued > 0:
+            email_outbox.start()
+            email_outbox.notify()
         
-        message = f'Processed {len(students)} students: {emails_sent} alerts sent'
+        message = f'Processed {len(students)} students: {emails_queued} alerts queued'
+        if emails_skipped > 0:
+            message += f', {emails_skipped} skipped (already notified this month)'
         if emails_failed > 0:
             message += f', {emails_failed} failed'
         
         return jsonify({
             'success': True,
             'message': message,
-            'emails_sent': emails_sent,
+            'emails_queued': emails_queued,
+            'emails_skipped': emails_skipped,
             'emails_failed': emails_failed,
             'results': results
         })
@@ -1273,100 +3082,684 @@ def send_low_attendance_notifications():
         }), 500
 
 # ============================================
-# API ROUTE: ALERT LOGS
+# API ROUTE: EMAIL OUTBOX STATUS
+# ============================================
+
+@app.route('/api/teacher/email-outbox')
+def get_email_outbox_status():
+    """
+    Get email outbox queue depth and delivery latency
+    Returns: JSON with outbox counters
+    """
+    conn = get_db_connection()
+    
+    try:
+        status = get_outbox_status(conn)
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'outbox': status
+        })
+        
+    except Exception as e:
+        conn.close()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# ============================================
+# API ROUTE: ALERT LOGS
+# ============================================
+
+ALERT_LOG_PAGE_SIZE = 50
+ALERT_LOG_PAGE_SIZE_MAX = 500
+ALERT_LOG_STATUSES = ('queued', 'sent', 'failed', 'rate_limited')
+ALERT_LOG_TYPES = tuple(EMAIL_BUILDERS)
+
+def build_alert_log_filters(args):
+    """
+    alert_type/status/class/from/to filters as WHERE clauses on alert_logs al and students s
+    from/to (YYYY-MM-DD) bound sent_at inclusively; raises ValueError on bad input
+    """
+    clauses = []
+    params = []
+    
+    alert_type = args.get('alert_type', '')
+    if alert_type:
+        if alert_type not in ALERT_LOG_TYPES:
+            raise ValueError(f'Unknown alert_type: {alert_type}')
+        clauses.append('al.alert_type = ?')
+        params.append(alert_type)
+    
+    status = args.get('status', '').lower()
+    if status:
+        if status not in ALERT_LOG_STATUSES:
+            raise ValueError(f'Unknown status: {status}')
+        clauses.append('al.status = ?')
+        params.append(status)
+    
+    class_name = args.get('class', '')
+    if class_name:
+        clauses.append('s.class = ?')
+        params.append(class_name)
+    
+    for arg, clause in (('from', "al.sent_at >= ?"), ('to', "al.sent_at < date(?, '+1 day')")):
+        value = args.get(arg, '')
+        if value:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError(f'{arg} must be a YYYY-MM-DD date')
+            clauses.append(clause)
+            params.append(value)
+    
+    return clauses, params
+
+@app.route('/api/teacher/alert-logs')
+def get_alert_logs():
+    """
+    Get parent alert logs, newest first (by log_id), one keyset page at a time
+    Query params: alert_type, status, class, from, to (YYYY-MM-DD), limit, cursor
+    Dates come back as ISO strings; the client formats them
+    Returns: JSON with logs, count and next_cursor (null on the last page)
+    """
+    try:
+        limit, after = parse_page_args(request.args, ALERT_LOG_PAGE_SIZE, ALERT_LOG_PAGE_SIZE_MAX, (int,))
+        clauses, params = build_alert_log_filters(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if after:
+        # log_id is unique and never changes, unlike sent_at (rewritten on delivery and
+        # shared by alerts queued in the same second), so pages resume exactly where they left off
+        clauses.append('al.log_id < ?')
+        params.extend(after)
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            f'''SELECT
+                al.log_id,
+                al.alert_type,
+                al.date,
+                strftime('%Y-%m-%dT%H:%M:%SZ', al.sent_at) AS sent_at,
+                al.parent_email,
+                al.message,
+                al.status,
+                s.student_id,
+                s.name AS student_name,
+                s.roll_no,
+                s.class,
+                s.section
+               FROM alert_logs al
+               JOIN students s ON al.student_id = s.student_id
+               {where}
+               ORDER BY al.log_id DESC
+               LIMIT ?''',
+            params + [limit + 1]
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor([rows[-1]['log_id']])
+    
+    logs = [dict(row) for row in rows]
+    
+    return jsonify({
+        'success': True,
+        'logs': logs,
+        'count': len(logs),
+        'next_cursor': next_cursor
+    })
+
+# ============================================
+# FEES LEDGER
+# ============================================
+
+FEE_BALANCE_COLUMNS = ('total_amount', 'paid_amount', 'pending_amount', 'open_fees', 'overdue_fees')
+
+# Ledger rows can never be corrected, so their text fields are checked before insert
+FEE_PAYMENT_TEXT_MAX_LENGTH = 100
+
+# One opening payment per fee for amounts paid before the ledger existed
+FEE_OPENING_BALANCE_SQL = '''INSERT INTO fee_payments (fee_id, student_id, amount, method, paid_at)
+    SELECT fee_id, student_id, paid_amount, 'opening_balance', NULL
+    FROM fees
+    WHERE paid_amount > 0
+    ORDER BY fee_id'''
+
+def add_fee_delta(deltas, student_id, fee, sign):
+    """Add (sign=1) or remove (sign=-1) one fee row's contribution to a student's balance delta"""
+    delta = deltas.setdefault(student_id, [0] * len(FEE_BALANCE_COLUMNS))
+    contribution = (fee['total_amount'], fee['paid_amount'], fee['pending_amount'],
+                    fee['status'] != 'paid', fee['status'] == 'overdue')
+    for i, value in enumerate(contribution):
+        delta[i] += sign * value
+
+def apply_fee_balance_changes(conn, changes):
+    """
+    Move student_fee_balances and class_fee_balances by a batch of fee row changes
+    changes: list of (student_id, old fee or None, new fee or None); a fee is a mapping
+             with total_amount, paid_amount, pending_amount and status
+    Must run in the same transaction as the fee writes
+    """
+    deltas = {}
+    for student_id, old_fee, new_fee in changes:
+        if old_fee is not None:
+            add_fee_delta(deltas, student_id, old_fee, -1)
+        if new_fee is not None:
+            add_fee_delta(deltas, student_id, new_fee, 1)
+    
+    rows = [(student_id, *delta) for student_id, delta in deltas.items()]
+    conn.executemany(
+        '''INSERT INTO student_fee_balances (student_id, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(student_id) DO UPDATE SET
+               total_amount = total_amount + excluded.total_amount,
+               paid_amount = paid_amount + excluded.paid_amount,
+               pending_amount = pending_amount + excluded.pending_amount,
+               open_fees = open_fees + excluded.open_fees,
+               overdue_fees = overdue_fees + excluded.overdue_fees''',
+        rows
+    )
+    conn.executemany(
+        '''INSERT INTO class_fee_balances (class, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+           SELECT class, ?, ?, ?, ?, ? FROM students WHERE student_id = ?
+           ON CONFLICT(class) DO UPDATE SET
+               total_amount = total_amount + excluded.total_amount,
+               paid_amount = paid_amount + excluded.paid_amount,
+               pending_amount = pending_amount + excluded.pending_amount,
+               open_fees = open_fees + excluded.open_fees,
+               overdue_fees = overdue_fees + excluded.overdue_fees''',
+        [(*delta, student_id) for student_id, *delta in rows]
+    )
+
+def rebuild_fee_balances(conn):
+    """
+    Recompute student_fee_balances and class_fee_balances from fees
+    Returns: number of students with fees
+    """
+    aggregates = '''SUM(f.total_amount), SUM(f.paid_amount), SUM(f.pending_amount),
+                    COUNT(CASE WHEN f.status != 'paid' THEN 1 END),
+                    COUNT(CASE WHEN f.status = 'overdue' THEN 1 END)'''
+    
+    conn.execute('DELETE FROM student_fee_balances')
+    conn.execute('DELETE FROM class_fee_balances')
+    rows = conn.execute(
+        f'''INSERT INTO student_fee_balances (student_id, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+            SELECT f.student_id, {aggregates} FROM fees f GROUP BY f.student_id'''
+    ).rowcount
+    conn.execute(
+        f'''INSERT INTO class_fee_balances (class, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+            SELECT s.class, {aggregates}
+            FROM fees f
+            JOIN students s ON s.student_id = f.student_id
+            GROUP BY s.class'''
+    )
+    conn.commit()
+    return rows
+
+def count_open_fees(conn):
+    """Fees still pending or overdue, from the per-class balance summary"""
+    return conn.execute('SELECT COALESCE(SUM(open_fees), 0) FROM class_fee_balances').fetchone()[0]
+
+def fee_status(pending_amount, due_date, today=None):
+    """Status of a fee with this much left to pay"""
+    if pending_amount <= 0:
+        return 'paid'
+    if due_date < (today or datetime.now().strftime('%Y-%m-%d')):
+        return 'overdue'
+    return 'pending'
+
+def record_fee_payment(conn, fee_id, amount, method='cash', reference=None, received_by=None):
+    """
+    Append a payment to fee_payments and move the fee row and balance summaries with it
+    Runs in a BEGIN IMMEDIATE transaction, so two desks paying the same fee are serialized
+    and neither can pay more than is pending
+    Returns: (payment_id, updated fee dict) or None if the fee does not exist; raises ValueError
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        fee = conn.execute(
+            '''SELECT fee_id, student_id, total_amount, paid_amount, pending_amount, due_date, status
+               FROM fees WHERE fee_id = ?''',
+            (fee_id,)
+        ).fetchone()
+        if fee is None:
+            conn.rollback()
+            return None
+        
+        if amount > fee['pending_amount']:
+            raise ValueError(f'Payment amount (${amount}) exceeds pending amount (${fee["pending_amount"]})')
+        
+        updated = dict(fee)
+        updated['paid_amount'] = round(fee['paid_amount'] + amount, 2)
+        updated['pending_amount'] = round(fee['total_amount'] - updated['paid_amount'], 2)
+        updated['status'] = fee_status(updated['pending_amount'], fee['due_date'])
+        
+        conn.execute(
+            '''UPDATE fees
+               SET paid_amount = ?, pending_amount = ?, status = ?
+               WHERE fee_id = ?''',
+            (updated['paid_amount'], updated['pending_amount'], updated['status'], fee_id)
+        )
+        payment_id = conn.execute(
+            '''INSERT INTO fee_payments (fee_id, student_id, amount, method, reference, received_by)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (fee_id, fee['student_id'], amount, method, reference, received_by)
+        ).lastrowid
+        apply_fee_balance_changes(conn, [(fee['student_id'], fee, updated)])
+        
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return payment_id, updated
+
+# ============================================
+# FEE STATUS SWEEP (DAILY BACKGROUND JOB)
 # ============================================
 
-@app.route('/api/teacher/alert-logs')
-def get_alert_logs():
-    """Get parent alert logs from database"""
+# Local time of day the overdue sweep runs
+FEE_SWEEP_TIME = (0, 5)
+
+def sweep_overdue_fees(conn, today=None):
+    """
+    Mark every pending fee whose due date has passed as overdue with one bulk UPDATE
+    (served by idx_fees_status_due), move the balance summaries, and record the sweep
+    Returns: list of fee_ids that became overdue
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
     
+    conn.execute('BEGIN IMMEDIATE')
     try:
-        conn = get_db_connection()
-        
-        # Get alert logs with student information
-        logs = conn.execute(
-            '''SELECT 
-                al.log_id,
-                al.alert_type,
-                al.date,
-                al.parent_email,
-                al.message,
-                al.status,
-                al.sent_at,
-                s.student_id,
-                s.roll_no,
-                s.name,
-                s.class,
-                s.section
-               FROM alert_logs al
-               JOIN students s ON al.student_id = s.student_id
-               ORDER BY al.sent_at DESC
-               LIMIT 100'''
+        # Same predicate as the UPDATE; nothing else can write in between
+        fees = conn.execute(
+            '''SELECT fee_id, student_id, total_amount, paid_amount, pending_amount, status
+               FROM fees
+               WHERE status = 'pending' AND due_date < ?''',
+            (today,)
         ).fetchall()
+        conn.execute(
+            "UPDATE fees SET status = 'overdue' WHERE status = 'pending' AND due_date < ?",
+            (today,)
+        )
+        apply_fee_balance_changes(conn, [
+            (fee['student_id'], fee, {**dict(fee), 'status': 'overdue'}) for fee in fees
+        ])
         
+        fee_ids = [fee['fee_id'] for fee in fees]
+        conn.execute(
+            '''INSERT INTO fee_status_sweeps (as_of_date, swept_at, fees_updated, fee_ids)
+               VALUES (?, ?, ?, ?)''',
+            (today, time.time(), len(fee_ids), json.dumps(fee_ids))
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    if fee_ids:
+        record_data_change('fees')
+    return fee_ids
+
+def run_fee_status_sweep():
+    conn = db_pool.acquire(DATABASE)
+    try:
+        fee_ids = sweep_overdue_fees(conn)
+    finally:
         conn.close()
-        
-        # Format logs for display
-        formatted_logs = []
-        for log in logs:
-            # Format date
+    print(f"✅ Fee status sweep: {len(fee_ids)} fee(s) now overdue")
+
+class DailyJob:
+    """Background thread that runs a job on start and then once a day at a fixed local time"""
+    
+    def __init__(self, name, job, at=(0, 0)):
+        self.name = name
+        self.job = job
+        self.at = at
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Start the job thread (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+    
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.now()
+        next_run = now.replace(hour=self.at[0], minute=self.at[1], second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+    
+    def _run(self):
+        # Run once at startup to catch up on days the process was down
+        while True:
             try:
-                log_date = datetime.strptime(log['date'], '%Y-%m-%d').strftime('%m/%d/%Y')
-            except:
-                log_date = log['date']
-            
-            # Format sent_at timestamp
+                self.job()
+            except Exception as e:
+                print(f"❌ {self.name} error: {e}")
+            if self._stop.wait(self.seconds_until_next_run()):
+                return
+
+fee_status_sweeper = DailyJob('fee-status-sweeper', run_fee_status_sweep, FEE_SWEEP_TIME)
+
+# ============================================
+# BULK FEE GENERATION AND PAYMENT IMPORT
+# ============================================
+
+# Method recorded on ledger entries from bank payment files
+IMPORT_PAYMENT_METHOD = 'bank_transfer'
+
+# At most this many per-row errors are returned (error_count has the full number)
+IMPORT_ERROR_LIMIT = 1000
+
+def generate_fees(conn, schedule, due_date, dry_run=False):
+    """
+    Raise one fee for every active student of each class in schedule ({class: amount})
+    Students who already have a fee due on due_date are skipped, so a retried request
+    does not bill anyone twice. Runs as one BEGIN IMMEDIATE transaction (rolled back on dry_run).
+    Returns: {class: number of fees created}
+    """
+    status = fee_status(1, due_date)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        created = {}
+        for class_name, amount in schedule.items():
+            students = [row['student_id'] for row in conn.execute(
+                '''SELECT s.student_id
+                   FROM students s
+                   WHERE s.class = ? AND s.status = 'active'
+                     AND NOT EXISTS (SELECT 1 FROM fees f
+                                     WHERE f.student_id = s.student_id AND f.due_date = ?)''',
+                (class_name, due_date)
+            )]
+            conn.executemany(
+                '''INSERT INTO fees (student_id, total_amount, paid_amount, pending_amount, due_date, status)
+                   VALUES (?, ?, 0, ?, ?, ?)''',
+                [(student_id, amount, amount, due_date, status) for student_id in students]
+            )
+            fee = {'total_amount': amount, 'paid_amount': 0, 'pending_amount': amount, 'status': status}
+            apply_fee_balance_changes(conn, [(student_id, None, fee) for student_id in students])
+            created[class_name] = len(students)
+        
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return created
+
+def load_open_fees(conn):
+    """Unpaid fees per student, oldest due date first"""
+    open_fees = {}
+    for row in conn.execute(
+        '''SELECT fee_id, student_id, total_amount, paid_amount, pending_amount, due_date, status
+           FROM fees
+           WHERE status != 'paid'
+           ORDER BY student_id, due_date, fee_id'''
+    ):
+        open_fees.setdefault(row['student_id'], []).append(dict(row))
+    return open_fees
+
+def parse_payment_row(record, roll_numbers):
+    """
+    Validate one payment file row
+    Returns: (student_id, fee_id or None, amount, reference); raises ValueError
+    """
+    roll_no = (record.get('roll_no') or '').strip()
+    student_id = (record.get('student_id') or '').strip()
+    if roll_no:
+        if roll_no not in roll_numbers:
+            raise ValueError(f'unknown roll_no {roll_no!r}')
+        student = roll_numbers[roll_no]
+        if student_id and student_id != str(student):
+            raise ValueError(f'roll_no {roll_no!r} does not belong to student_id {student_id}')
+    elif student_id.isdigit():
+        student = int(student_id)
+    else:
+        raise ValueError('missing roll_no or student_id')
+    
+    fee_id = (record.get('fee_id') or '').strip()
+    if fee_id and not fee_id.isdigit():
+        raise ValueError(f'invalid fee_id {fee_id!r}')
+    
+    try:
+        amount = round(float(record.get('amount') or ''), 2)
+    except ValueError:
+        raise ValueError(f'invalid amount {record.get("amount")!r}')
+    if not (math.isfinite(amount) and amount > 0):
+        raise ValueError('amount must be greater than 0')
+    
+    return student, int(fee_id) if fee_id else None, amount, (record.get('reference') or '').strip() or None
+
+def allocate_payment(fees, fee_id, amount):
+    """
+    Split a payment over a student's open fees (just fee_id if given, else oldest due first)
+    Returns: [(fee, amount)]; raises ValueError if it exceeds what is pending
+    """
+    if fee_id is not None:
+        fees = [fee for fee in fees if fee['fee_id'] == fee_id]
+        if not fees:
+            raise ValueError(f'fee {fee_id} is not an open fee of this student')
+    
+    pending = round(sum(fee['pending_amount'] for fee in fees), 2)
+    if amount > pending:
+        raise ValueError(f'amount {amount} exceeds pending amount {pending}')
+    
+    allocations = []
+    for fee in fees:
+        if amount <= 0:
+            break
+        share = min(amount, fee['pending_amount'])
+        if share > 0:
+            allocations.append((fee, share))
+            amount = round(amount - share, 2)
+    return allocations
+
+def import_fee_payments(conn, lines, dry_run=False, method=IMPORT_PAYMENT_METHOD):
+    """
+    Apply a bank payment CSV (roll_no or student_id, amount, optional fee_id and reference)
+    lines: any iterable of text lines, read one row at a time
+    Rows with errors are skipped and reported; the rest are written with executemany in one
+    BEGIN IMMEDIATE transaction (rolled back on dry_run). A reference that is already in
+    the ledger or earlier in the file is rejected, so re-importing a file pays nothing twice.
+    Returns: dict with rows, applied, payments, total_amount, error_count and errors
+    """
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [name.lstrip('\ufeff').strip().lower() for name in reader.fieldnames or []]
+    if 'amount' not in reader.fieldnames or not {'roll_no', 'student_id'} & set(reader.fieldnames):
+        raise ValueError('CSV header must include amount and roll_no or student_id')
+    
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        roll_numbers = dict(conn.execute('SELECT roll_no, student_id FROM students').fetchall())
+        open_fees = load_open_fees(conn)
+        references = {row[0] for row in conn.execute(
+            'SELECT DISTINCT reference FROM fee_payments WHERE reference IS NOT NULL'
+        )}
+        
+        originals = {}
+        payments = []
+        errors = []
+        error_count = 0
+        result = {'rows': 0, 'applied': 0, 'total_amount': 0}
+        
+        for record in reader:
+            result['rows'] += 1
             try:
-                sent_time = datetime.strptime(log['sent_at'], '%Y-%m-%d %H:%M:%S').strftime('%m/%d/%Y %I:%M %p')
-            except:
-                sent_time = log['sent_at']
-            
-            # Determine channel based on alert type
-            channel = 'Email'
-            
-            # Create display message
-            if log['alert_type'] == 'absence':
-                display_message = f"Absence notification for {log['name']} on {log_date}"
-            else:
-                display_message = f"Low attendance alert: {log['message']}"
+                student_id, fee_id, amount, reference = parse_payment_row(record, roll_numbers)
+                if reference is not None and reference in references:
+                    raise ValueError(f'duplicate reference {reference!r}')
+                allocations = allocate_payment(open_fees.get(student_id, []), fee_id, amount)
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < IMPORT_ERROR_LIMIT:
+                    # Line 1 is the header
+                    errors.append(f'Line {reader.line_num}: {e}')
+                continue
             
-            formatted_logs.append({
-                'date': sent_time,
-                'student_name': log['name'],
-                'roll_no': log['roll_no'],
-                'class': log['class'].replace('Class ', ''),
-                'section': log['section'],
-                'parent_contact': '',  # Not stored
-                'parent_email': log['parent_email'],
-                'channel': channel,
-                'message': display_message,
-                'status': log['status'].upper(),
-                'alert_type': log['alert_type']
-            })
+            if reference is not None:
+                references.add(reference)
+            for fee, share in allocations:
+                originals.setdefault(fee['fee_id'], dict(fee))
+                fee['paid_amount'] = round(fee['paid_amount'] + share, 2)
+                fee['pending_amount'] = round(fee['total_amount'] - fee['paid_amount'], 2)
+                fee['status'] = fee_status(fee['pending_amount'], fee['due_date'])
+                payments.append((fee['fee_id'], student_id, share, method, reference))
+            result['applied'] += 1
+            result['total_amount'] = round(result['total_amount'] + amount, 2)
+        
+        updated = [
+            fee for fees in open_fees.values() for fee in fees if fee['fee_id'] in originals
+        ]
+        conn.executemany(
+            'UPDATE fees SET paid_amount = ?, pending_amount = ?, status = ? WHERE fee_id = ?',
+            [(fee['paid_amount'], fee['pending_amount'], fee['status'], fee['fee_id']) for fee in updated]
+        )
+        conn.executemany(
+            '''INSERT INTO fee_payments (fee_id, student_id, amount, method, reference)
+               VALUES (?, ?, ?, ?, ?)''',
+            payments
+        )
+        apply_fee_balance_changes(conn, [
+            (fee['student_id'], originals[fee['fee_id']], fee) for fee in updated
+        ])
         
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    result.update(payments=len(payments), error_count=error_count, errors=errors)
+    return result
+
+# ============================================
+# API ROUTES: FEE GENERATION AND PAYMENT IMPORT
+# ============================================
+
+@app.route('/api/fees/generate', methods=['POST'])
+def generate_fees_route():
+    """
+    Raise a term's fees for whole classes
+    Request Body: JSON with due_date (YYYY-MM-DD), schedule ({class: amount}) and optional dry_run
+    Returns: JSON with the number of fees created per class
+    """
+    data = request.get_json() or {}
+    due_date = data.get('due_date')
+    try:
+        datetime.strptime(due_date or '', '%Y-%m-%d')
+    except (TypeError, ValueError):
         return jsonify({
-            'success': True,
-            'logs': formatted_logs
-        })
-        
-    except Exception as e:
-        print(f"Error fetching alert logs: {e}")
-        import traceback
-        traceback.print_exc()
-        if 'conn' in locals():
-            conn.close()
-        
-        # Return empty logs on error
+            'success': False,
+            'error': 'Invalid or missing due_date (expected YYYY-MM-DD)'
+        }), 400
+    
+    schedule = data.get('schedule')
+    if not isinstance(schedule, dict) or not schedule:
         return jsonify({
-            'success': True,
-            'logs': []
-        })
+            'success': False,
+            'error': 'schedule must map at least one class to an amount'
+        }), 400
+    try:
+        schedule = {str(class_name): round(float(amount), 2) for class_name, amount in schedule.items()}
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': 'Every schedule amount must be a number'
+        }), 400
+    if not all(math.isfinite(amount) and amount > 0 for amount in schedule.values()):
+        return jsonify({
+            'success': False,
+            'error': 'Every schedule amount must be a finite number greater than 0'
+        }), 400
+    
+    dry_run = bool(data.get('dry_run'))
+    conn = get_db_connection()
+    try:
+        created = generate_fees(conn, schedule, due_date, dry_run=dry_run)
+    finally:
+        conn.close()
+    
+    total = sum(created.values())
+    if total and not dry_run:
+        record_data_change('fees')
+    
+    return jsonify({
+        'success': True,
+        'dry_run': dry_run,
+        'message': f"{'Would create' if dry_run else 'Created'} {total} fee(s) due {due_date}",
+        'created': created,
+        'total_created': total
+    })
+
+@app.route('/api/fees/import', methods=['POST'])
+def import_fee_payments_route():
+    """
+    Import a bank payment CSV, uploaded as the 'file' form field or as the raw request body
+    Query Parameters: dry_run=1 validates and reports without writing anything
+    Returns: JSON with counts and per-row errors
+    """
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    # Read the upload row by row instead of loading the whole file
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    conn = get_db_connection()
+    try:
+        result = import_fee_payments(conn, lines, dry_run=dry_run)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Could not read payment file: {e}'
+        }), 400
+    finally:
+        conn.close()
+    
+    if result['payments'] and not dry_run:
+        record_data_change('fees')
+    
+    return jsonify({
+        'success': True,
+        'dry_run': dry_run,
+        'message': f"{result['applied']} of {result['rows']} payment(s) "
+                   f"{'would be applied' if dry_run else 'applied'}",
+        **result
+    })
 
 # ============================================
 # API ROUTE: FEES DATA
 # ============================================
 
 @app.route('/api/fees')
+@conditional_get('fees', 'students')
 def get_fees():
     """
     Get all fees records with student information
@@ -1416,84 +3809,130 @@ def get_fees():
 # API ROUTE: UPDATE FEE PAYMENT
 # ============================================
 
+def parse_payment_text(data, field, default=None):
+    """
+    An optional text field of a payment request, trimmed (default when missing or blank)
+    Raises ValueError unless it is a string of at most FEE_PAYMENT_TEXT_MAX_LENGTH characters
+    """
+    value = data.get(field)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    value = value.strip()
+    if len(value) > FEE_PAYMENT_TEXT_MAX_LENGTH:
+        raise ValueError(f'{field} must be at most {FEE_PAYMENT_TEXT_MAX_LENGTH} characters')
+    return value or default
+
 @app.route('/api/fees/<int:fee_id>/payment', methods=['POST'])
 def update_fee_payment(fee_id):
     """
-    Update fee payment for a student
-    Request Body: JSON with payment amount
-    Returns: JSON with success/error message
+    Record a fee payment in the ledger
+    Request Body: JSON with payment_amount and optional method, reference, received_by
+    Returns: JSON with success/error message and the fee's new amounts
     """
+    data = request.get_json() or {}
     try:
-        data = request.get_json()
-        payment_amount = float(data.get('payment_amount', 0))
-        
-        if payment_amount <= 0:
-            return jsonify({
-                'success': False,
-                'error': 'Payment amount must be greater than 0'
-            }), 400
-        
-        conn = get_db_connection()
-        
-        # Get current fee record
-        current_fee = conn.execute(
-            'SELECT * FROM fees WHERE fee_id = ?',
-            (fee_id,)
-        ).fetchone()
-        
-        if not current_fee:
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Fee record not found'
-            }), 404
-        
-        # Calculate new amounts
-        new_paid_amount = current_fee['paid_amount'] + payment_amount
-        new_pending_amount = current_fee['total_amount'] - new_paid_amount
-        
-        # Check if payment exceeds pending amount
-        if new_paid_amount > current_fee['total_amount']:
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': f'Payment amount (${payment_amount}) exceeds pending amount (${current_fee["pending_amount"]})'
-            }), 400
-        
-        # Determine new status
-        new_status = 'paid' if new_pending_amount == 0 else 'pending'
-        if new_pending_amount > 0:
-            # Check if overdue
-            due_date = datetime.strptime(current_fee['due_date'], '%Y-%m-%d')
-            if due_date < datetime.now():
-                new_status = 'overdue'
-        
-        # Update fee record
-        conn.execute(
-            '''UPDATE fees 
-               SET paid_amount = ?, 
-                   pending_amount = ?,
-                   status = ?
-               WHERE fee_id = ?''',
-            (new_paid_amount, new_pending_amount, new_status, fee_id)
-        )
-        
-        conn.commit()
-        conn.close()
-        
+        payment_amount = round(float(data.get('payment_amount', 0)), 2)
+    except (TypeError, ValueError):
+        payment_amount = 0
+    
+    if not (math.isfinite(payment_amount) and payment_amount > 0):
         return jsonify({
-            'success': True,
-            'message': f'Payment of ${payment_amount} recorded successfully',
-            'new_paid_amount': new_paid_amount,
-            'new_pending_amount': new_pending_amount,
-            'new_status': new_status
-        }), 200
-        
-    except Exception as e:
+            'success': False,
+            'error': 'Payment amount must be greater than 0'
+        }), 400
+    try:
+        method = parse_payment_text(data, 'method', 'cash')
+        reference = parse_payment_text(data, 'reference')
+        received_by = parse_payment_text(data, 'received_by')
+    except ValueError as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
+        }), 400
+    
+    conn = get_db_connection()
+    try:
+        result = record_fee_payment(
+            conn, fee_id, payment_amount,
+            method=method, reference=reference, received_by=received_by
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    finally:
+        conn.close()
+    
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': 'Fee record not found'
+        }), 404
+    
+    payment_id, fee = result
+    record_data_change('fees')
+    
+    return jsonify({
+        'success': True,
+        'message': f'Payment of ${payment_amount} recorded successfully',
+        'payment_id': payment_id,
+        'new_paid_amount': fee['paid_amount'],
+        'new_pending_amount': fee['pending_amount'],
+        'new_status': fee['status']
+    }), 200
+
+# ============================================
+# API ROUTE: FEE PAYMENT HISTORY
+# ============================================
+
+@app.route('/api/fees/<int:fee_id>/payments')
+def get_fee_payments(fee_id):
+    """Ledger entries of one fee, oldest first"""
+    conn = get_db_connection()
+    payments = [dict(row) for row in conn.execute(
+        '''SELECT payment_id, amount, method, reference, received_by, paid_at
+           FROM fee_payments
+           WHERE fee_id = ?
+           ORDER BY payment_id''',
+        (fee_id,)
+    )]
+    conn.close()
+    
+    return jsonify({
+        'success': True,
+        'payments': payments,
+        'total_paid': round(sum(payment['amount'] for payment in payments), 2)
+    })
+
+# ============================================
+# API ROUTE: FEES SUMMARY
+# ============================================
+
+@app.route('/api/fees/summary')
+@cached_response('fees', 'students')
+def get_fees_summary():
+    """
+    School and per-class outstanding balances, read from class_fee_balances
+    Returns: JSON with totals and one entry per class
+    """
+    conn = get_db_connection()
+    classes = [dict(row) for row in conn.execute(
+        f"SELECT class, {', '.join(FEE_BALANCE_COLUMNS)} FROM class_fee_balances ORDER BY class"
+    )]
+    conn.close()
+    
+    totals = {column: sum(row[column] for row in classes) for column in FEE_BALANCE_COLUMNS}
+    for column in ('total_amount', 'paid_amount', 'pending_amount'):
+        totals[column] = round(totals[column], 2)
+    
+    return jsonify({
+        'success': True,
+        'totals': totals,
+        'classes': classes
+    })
 
 # ============================================
 # ROUTE: EXAMS PAGE
@@ -1518,6 +3957,7 @@ def settings():
 # ============================================
 
 @app.route('/api/exams')
+@conditional_get('exams')
 def get_exams():
     """
     Get all exams with their details
@@ -1586,6 +4026,7 @@ def add_exam():
         
         exam_id = cursor.lastrowid
         conn.commit()
+        record_data_change('exams')
         conn.close()
         
         return jsonify({
@@ -1645,6 +4086,7 @@ def update_exam(exam_id):
         )
         
         conn.commit()
+        record_data_change('exams')
         conn.close()
         
         return jsonify({
@@ -1687,6 +4129,7 @@ def delete_exam(exam_id):
         # Delete exam
         conn.execute('DELETE FROM exams WHERE exam_id = ?', (exam_id,))
         conn.commit()
+        record_data_change('exams')
         conn.close()
         
         return jsonify({
@@ -1705,6 +4148,7 @@ def delete_exam(exam_id):
 # ============================================
 
 @app.route('/api/stats')
+@cached_response('students', 'teachers', 'attendance', 'fees', 'exams')
 def get_stats():
     """
     Get real-time dashboard statistics
@@ -1730,9 +4174,7 @@ def get_stats():
     attendance_percentage = today_attendance['attendance_percentage'] if today_attendance else 0
     
     # Get pending fees count
-    pending_fees_count = conn.execute(
-        'SELECT COUNT(*) as count FROM fees WHERE status IN ("pending", "overdue")'
-    ).fetchone()['count']
+    pending_fees_count = count_open_fees(conn)
     
     # Get upcoming exams count (within next 7 days)
     upcoming_exams = conn.execute(
@@ -1762,6 +4204,7 @@ def get_stats():
 # ============================================
 
 @app.route('/api/attendance-data')
+@cached_response('attendance')
 def get_attendance_data():
     """
     Get attendance data for the last 7 days
@@ -1801,6 +4244,7 @@ def get_attendance_data():
 # ============================================
 
 @app.route('/api/performance-data')
+@cached_response('performance')
 def get_performance_data():
     """
     Get class-wise average performance
@@ -1835,6 +4279,7 @@ def get_performance_data():
 # ============================================
 
 @app.route('/api/alerts')
+@cached_response('attendance', 'fees', 'exams')
 def get_alerts():
     """
     Generate smart alerts based on business rules
@@ -1866,10 +4311,7 @@ def get_alerts():
     # ==========================================
     # ALERT 2: UNPAID FEES WARNING
     # ==========================================
-    unpaid_fees = conn.execute(
-        '''SELECT COUNT(*) as count FROM fees 
-           WHERE status IN ("pending", "overdue")'''
-    ).fetchone()['count']
+    unpaid_fees = count_open_fees(conn)
     
     if unpaid_fees > 0:
         alerts.append({
@@ -1933,46 +4375,83 @@ def get_alerts():
 # API ROUTE: ALL STUDENTS
 # ============================================
 
+STUDENT_LIST_FIELDS = {
+    'id': 's.student_id',
+    'roll_no': 's.roll_no',
+    'name': 's.name',
+    'class': 's.class',
+    'section': 's.section',
+    'email': 's.email',
+    'attendance_status': "COALESCE(da.status, 'absent')"
+}
+
 @app.route('/api/students')
 def get_students():
     """
-    Get all active students with their attendance status
+    Get one page of active students with their attendance status
+    Query params: search, class, section, fields, limit, cursor
     Returns: JSON with student details including today's attendance
     """
+    try:
+        limit, after = parse_page_args(request.args)
+        fields = parse_fields_arg(request.args, STUDENT_LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'students': []}), 400
+    
+    clauses, params = build_student_filters(request.args)
+    clauses.append('s.status = "active"')
+    
+    # Only join today's attendance when the caller asked for it
+    joins = ''
+    if 'attendance_status' in fields:
+        joins = 'LEFT JOIN daily_attendance da ON s.student_id = da.student_id AND da.date = date("now")'
+    
     conn = get_db_connection()
+    students_list, next_cursor = fetch_student_page(
+        conn, STUDENT_LIST_FIELDS, fields, clauses, params, limit, after, joins
+    )
+    total = count_student_rows(conn, clauses, params)
+    conn.close()
     
-    students_records = conn.execute(
-        '''SELECT 
-            s.student_id,
-            s.roll_no,
-            s.name,
-            s.class,
-            s.section,
-            s.email,
-            COALESCE(da.status, 'absent') as attendance_status
-           FROM students s
-           LEFT JOIN daily_attendance da ON s.student_id = da.student_id AND da.date = date("now")
-           WHERE s.status = "active"
-           ORDER BY s.class DESC, s.section ASC, s.roll_no ASC'''
-    ).fetchall()
+    return jsonify({
+        'students': students_list,
+        'count': len(students_list),
+        'total': total,
+        'next_cursor': next_cursor
+    })
+
+# ============================================
+# API ROUTE: STUDENT COUNTS
+# ============================================
+
+@app.route('/api/students/count')
+def count_students():
+    """
+    Count students matching the list filters without fetching them
+    Query params: search, class, section, status
+    Returns: JSON with total, active, classes and sections counts
+    """
+    clauses, params = build_student_filters(request.args)
     
+    conn = get_db_connection()
+    counts = conn.execute(
+        f'''SELECT
+            COUNT(*) as total,
+            COUNT(CASE WHEN s.status = 'active' THEN 1 END) as active,
+            COUNT(DISTINCT s.class) as classes,
+            COUNT(DISTINCT s.section) as sections
+           FROM students s
+           WHERE {' AND '.join(clauses) or '1=1'}''',
+        params
+    ).fetchone()
     conn.close()
     
-    students_list = []
-    for student in students_records:
-        students_list.append({
-            'id': student['student_id'],
-            'roll_no': student['roll_no'],
-            'name': student['name'],
-            'class': student['class'],
-            'section': student['section'],
-            'email': student['email'],
-            'attendance_status': student['attendance_status']
-        })
-    
     return jsonify({
-        'students': students_list,
-        'total': len(students_list)
+        'success': True,
+        'total': counts['total'],
+        'active': counts['active'],
+        'classes': counts['classes'],
+        'sections': counts['sections']
     })
 
 # ============================================
@@ -2016,18 +4495,17 @@ def add_student():
         # Extract section from class (e.g., "Class 10" -> section "A")
         section = data.get('section', 'A')
         
-        # Insert new student
+        # Insert new student (phone/address are not stored in the students table)
         cursor = conn.execute(
-            '''INSERT INTO students (roll_no, name, class, section, email, phone, address, admission_date, status)
-               VALUES (?, ?, ?, ?, ?, ?, ?, date("now"), "active")''',
+            '''INSERT INTO students (roll_no, name, class, section, email, parent_email, enrollment_date, status)
+               VALUES (?, ?, ?, ?, ?, ?, date("now"), "active")''',
             (
                 data['roll_no'],
                 data['name'],
                 data['class'],
                 section,
                 data['email'],
-                data.get('phone', ''),
-                data.get('address', '')
+                data.get('parent_email') or None
             )
         )
         
@@ -2035,18 +4513,23 @@ def add_student():
         
         # Add today's attendance record
         attendance_status = data.get('attendance_status', 'present')
+        if attendance_status not in ATTENDANCE_STATUSES:
+            attendance_status = 'present'
+        today = conn.execute('SELECT date("now")').fetchone()[0]
         conn.execute(
             '''INSERT INTO daily_attendance (student_id, date, status)
-               VALUES (?, date("now"), ?)''',
-            (student_id, attendance_status)
+               VALUES (?, ?, ?)''',
+            (student_id, today, attendance_status)
         )
+        apply_attendance_changes(conn, [(student_id, today, None, attendance_status)])
         
         conn.commit()
+        record_data_change('students', 'attendance')
         
         # Get the newly created student
         new_student = conn.execute(
             '''SELECT 
-                student_id, roll_no, name, class, section, email, phone, address
+                student_id, roll_no, name, class, section, email
                FROM students WHERE student_id = ?''',
             (student_id,)
         ).fetchone()
@@ -2063,8 +4546,8 @@ def add_student():
                 'class': new_student['class'],
                 'section': new_student['section'],
                 'email': new_student['email'],
-                'phone': new_student['phone'],
-                'address': new_student['address'],
+                'phone': data.get('phone', ''),
+                'address': data.get('address', ''),
                 'attendance_status': attendance_status
             }
         }), 201
@@ -2080,6 +4563,7 @@ def add_student():
 # ============================================
 
 @app.route('/api/classes')
+@conditional_get('students')
 def get_classes():
     """
     Get list of unique classes
@@ -2155,6 +4639,7 @@ def get_absent_students():
 # ============================================
 
 @app.route('/api/teachers')
+@conditional_get('teachers')
 def get_teachers():
     """
     Get all active teachers with their details
@@ -2205,6 +4690,7 @@ def get_teachers():
 # ============================================
 
 @app.route('/api/departments')
+@conditional_get('teachers')
 def get_departments():
     """
     Get list of unique departments
@@ -2263,6 +4749,7 @@ def add_teacher():
         
         teacher_id = cursor.lastrowid
         conn.commit()
+        record_data_change('teachers')
         conn.close()
         
         return jsonify({
@@ -2334,37 +4821,28 @@ def api_teacher_attendance():
                 'error': 'No attendance records provided'
             }), 400
         
+        # Validate the whole payload before writing anything
+        rows, errors = parse_attendance_records(
+            records, 'teacher_id', parse_teacher_attendance_status
+        )
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid attendance records',
+                'details': errors
+            }), 400
+        
         conn = get_db_connection()
         
-        # Insert or update attendance records
-        for record in records:
-            # Check if record already exists for this teacher and date
-            existing = conn.execute(
-                '''SELECT id FROM teacher_attendance 
-                   WHERE teacher_id = ? AND date = ?''',
-                (record['teacher_id'], record['date'])
-            ).fetchone()
-            
-            if existing:
-                # Update existing record
-                conn.execute(
-                    '''UPDATE teacher_attendance 
-                       SET status = ?, remarks = ?, marked_at = CURRENT_TIMESTAMP
-                       WHERE teacher_id = ? AND date = ?''',
-                    (record['status'], record.get('remarks', ''), 
-                     record['teacher_id'], record['date'])
-                )
-            else:
-                # Insert new record
-                conn.execute(
-                    '''INSERT INTO teacher_attendance (teacher_id, date, status, remarks)
-                       VALUES (?, ?, ?, ?)''',
-                    (record['teacher_id'], record['date'], 
-                     record['status'], record.get('remarks', ''))
-                )
+        # Insert or update every record in one upsert
+        bulk_upsert_attendance(
+            conn, 'teacher_attendance', 'teacher_id', rows,
+            ('status', 'remarks'), touch_columns=('marked_at',)
+        )
         
         conn.commit()
         conn.close()
+        record_data_change('teacher_attendance')
         
         return jsonify({
             'success': True,
@@ -2378,145 +4856,560 @@ def api_teacher_attendance():
         }), 500
 
 # ============================================
-# API ROUTE: TEACHER ATTENDANCE REPORT
+# REPORT DATE RANGES
 # ============================================
 
-@app.route('/api/teacher-attendance-report')
-def teacher_attendance_report():
+def report_date_range(args):
     """
-    Get teacher attendance report for a date range or specific month
-    Query params: start_date, end_date OR month (YYYY-MM format)
-    Returns: JSON with attendance statistics and records
+    Read month (YYYY-MM) or start_date/end_date (YYYY-MM-DD) query parameters
+    Returns: inclusive (start_date, end_date) strings; raises ValueError on bad input
     """
+    month = args.get('month')
+    
+    if month:
+        start, end = month_date_range(month)
+        last_day = datetime.strptime(end, '%Y-%m-%d') - timedelta(days=1)
+        check_calendar_range(start, last_day.strftime('%Y-%m-%d'))
+        return start, last_day.strftime('%Y-%m-%d')
+    
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    if not start_date or not end_date:
+        raise ValueError('Please provide either month or start_date and end_date')
+    
     try:
-        conn = get_db_connection()
-        
-        # Check if month parameter is provided
-        month = request.args.get('month')
-        
-        if month:
-            # Parse month (format: YYYY-MM)
-            start_date = f"{month}-01"
-            # Get last day of month
-            year, month_num = map(int, month.split('-'))
-            if month_num == 12:
-                next_month = datetime(year + 1, 1, 1)
-            else:
-                next_month = datetime(year, month_num + 1, 1)
-            last_day = (next_month - timedelta(days=1)).day
-            end_date = f"{month}-{last_day:02d}"
-        else:
-            # Use start_date and end_date parameters
-            start_date = request.args.get('start_date')
-            end_date = request.args.get('end_date')
-            
-            if not start_date or not end_date:
-                return jsonify({
-                    'success': False,
-                    'error': 'Please provide either month or start_date and end_date'
-                }), 400
-        
-        # Get all teachers
-        teachers = conn.execute(
-            '''SELECT teacher_id, name, subject, department 
-               FROM teachers 
-               WHERE status = "active"
-               ORDER BY name ASC'''
-        ).fetchall()
-        
-        # Get attendance records for the date range
-        attendance_records = conn.execute(
-            '''SELECT teacher_id, date, status, remarks 
-               FROM teacher_attendance 
-               WHERE date BETWEEN ? AND ?
-               ORDER BY date ASC, teacher_id ASC''',
-            (start_date, end_date)
-        ).fetchall()
-        
-        conn.close()
-        
-        # Organize data by teacher
-        teacher_report = {}
-        for teacher in teachers:
-            tid = teacher['teacher_id']
-            teacher_report[tid] = {
-                'teacher_id': tid,
-                'name': teacher['name'],
-                'subject': teacher['subject'],
-                'department': teacher['department'],
-                'present': 0,
-                'absent': 0,
-                'leave': 0,
-                'not_marked': 0,
-                'total_days': 0,
-                'attendance_percentage': 0,
-                'daily_records': []
-            }
-        
-        # Count total working days in range
         start = datetime.strptime(start_date, '%Y-%m-%d')
         end = datetime.strptime(end_date, '%Y-%m-%d')
-        total_days = (end - start).days + 1
-        
-        # Process attendance records
-        for record in attendance_records:
-            tid = record['teacher_id']
-            if tid in teacher_report:
-                status = record['status']
-                teacher_report[tid][status] += 1
-                teacher_report[tid]['daily_records'].append({
-                    'date': record['date'],
-                    'status': status,
-                    'remarks': record['remarks'] or ''
-                })
-        
-        # Calculate statistics
-        for tid in teacher_report:
-            marked_days = (teacher_report[tid]['present'] + 
-                          teacher_report[tid]['absent'] + 
-                          teacher_report[tid]['leave'])
-            teacher_report[tid]['not_marked'] = total_days - marked_days
-            teacher_report[tid]['total_days'] = total_days
-            
-            if marked_days > 0:
-                teacher_report[tid]['attendance_percentage'] = round(
-                    (teacher_report[tid]['present'] / marked_days) * 100, 2
-                )
-        
-        # Calculate overall statistics
-        total_present = sum(t['present'] for t in teacher_report.values())
-        total_absent = sum(t['absent'] for t in teacher_report.values())
-        total_leave = sum(t['leave'] for t in teacher_report.values())
-        total_not_marked = sum(t['not_marked'] for t in teacher_report.values())
-        total_teachers = len(teacher_report)
-        
-        overall_percentage = 0
-        if total_present + total_absent + total_leave > 0:
-            overall_percentage = round(
-                (total_present / (total_present + total_absent + total_leave)) * 100, 2
-            )
-        
-        return jsonify({
-            'success': True,
-            'start_date': start_date,
-            'end_date': end_date,
-            'total_days': total_days,
-            'overall_stats': {
-                'total_teachers': total_teachers,
-                'total_present': total_present,
-                'total_absent': total_absent,
-                'total_leave': total_leave,
-                'total_not_marked': total_not_marked,
-                'attendance_percentage': overall_percentage
-            },
-            'teachers': list(teacher_report.values())
-        }), 200
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format')
+    if start > end:
+        raise ValueError('start_date must not be after end_date')
+    check_calendar_range(start_date, end_date)
+    return start_date, end_date
+
+# ============================================
+# SCHOOL CALENDAR
+# ============================================
+
+# Date ranges the calendar answers for: whole years within this many years of today
+CALENDAR_RANGE_YEARS = 5
+
+# Loaded school_days index per database file: DATABASE -> (calendar version, SchoolCalendar)
+_school_calendars = {}
+_school_calendars_lock = threading.Lock()
+
+def check_calendar_range(start, end):
+    """Raise ValueError unless [start, end] lies within CALENDAR_RANGE_YEARS of the current year"""
+    year = datetime.now().year
+    first, last = f'{year - CALENDAR_RANGE_YEARS}-01-01', f'{year + CALENDAR_RANGE_YEARS}-12-31'
+    if start < first or end > last:
+        raise ValueError(f'Dates must be between {first} and {last}')
+
+def get_school_calendar(conn, start=None, end=None):
+    """
+    The shared school calendar (terms, holidays, half-days) with its working-day index
+    Reloaded after every calendar edit; never writes: when [start, end] falls outside the
+    stored index the days are computed in memory (raises ValueError outside check_calendar_range)
+    """
+    if start is not None:
+        check_calendar_range(start, end)
+    version = response_cache.versions(('calendar',))[0]
+    with _school_calendars_lock:
+        cached = _school_calendars.get(DATABASE)
+        if cached and cached[0] == version:
+            calendar = cached[1]
+        else:
+            calendar = school_calendar.load_school_calendar(conn)
+            if calendar is not None:
+                _school_calendars[DATABASE] = (version, calendar)
+    
+    if calendar is None or (start is not None and not calendar.covers(start, end)):
+        # Whole years through next year, so nth_school_day lookups can run past end
+        span_end = max(int(end[:4]) if end else 0, datetime.now().year + 1)
+        span_start = start[:4] if start else str(datetime.now().year)
+        calendar = school_calendar.build_school_calendar(conn, f'{span_start}-01-01', f'{span_end}-12-31')
+    return calendar
+
+def save_school_calendar(conn):
+    """Rebuild the school_days index after a calendar edit, commit, and notify readers"""
+    school_calendar.rebuild_school_days(conn)
+    conn.commit()
+    record_data_change('calendar')
+
+def month_working_days(month):
+    """School days of a YYYY-MM month up to today (raises ValueError on a bad month)"""
+    start, end = month_date_range(month)
+    last_day = min(datetime.strptime(end, '%Y-%m-%d') - timedelta(days=1), datetime.now()).strftime('%Y-%m-%d')
+    if last_day < start:
+        return 0
+    
+    conn = get_db_connection()
+    try:
+        return get_school_calendar(conn, start, last_day).working_days_between(start, last_day)
+    finally:
+        conn.close()
+
+def parse_calendar_date(value, field='date'):
+    """Normalize a YYYY-MM-DD string; raises ValueError naming the field"""
+    try:
+        return datetime.strptime(value or '', '%Y-%m-%d').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a YYYY-MM-DD date')
+
+# ============================================
+# API ROUTE: SCHOOL HOLIDAYS
+# ============================================
+
+@app.route('/api/calendar/holidays', methods=['GET', 'POST'])
+def api_school_holidays():
+    """
+    GET: List holidays and half-days (optional year=YYYY)
+    POST: Add or update days: {"date": "YYYY-MM-DD", "name": "...", "kind": "holiday|half_day"}
+          or {"holidays": [...]}
+    """
+    if request.method == 'GET':
+        year = request.args.get('year', '')
+        query = 'SELECT date, name, kind FROM school_holidays'
+        params = []
+        if year:
+            if not year.isdigit():
+                return jsonify({'success': False, 'error': 'year must be YYYY'}), 400
+            query += ' WHERE date >= ? AND date < ?'
+            params = [f'{year}-01-01', f'{int(year) + 1}-01-01']
         
-    except Exception as e:
+        conn = get_db_connection()
+        holidays = [dict(row) for row in conn.execute(query + ' ORDER BY date', params)]
+        conn.close()
+        return jsonify({'success': True, 'holidays': holidays})
+    
+    data = request.get_json(silent=True) or {}
+    entries = data.get('holidays', [data]) if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return jsonify({'success': False, 'error': 'holidays must be a list'}), 400
+    
+    rows = []
+    for index, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError('must be an object')
+            date = parse_calendar_date(entry.get('date'))
+            kind = entry.get('kind', 'holiday')
+            if kind not in school_calendar.DAY_KINDS:
+                raise ValueError(f"kind must be one of: {', '.join(school_calendar.DAY_KINDS)}")
+            name = entry.get('name') or 'Holiday'
+            if not isinstance(name, str):
+                raise ValueError('name must be a string')
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Holiday {index}: {e}'}), 400
+        rows.append((date, name.strip(), kind))
+    
+    conn = get_db_connection()
+    conn.executemany(
+        '''INSERT INTO school_holidays (date, name, kind) VALUES (?, ?, ?)
+           ON CONFLICT(date) DO UPDATE SET name = excluded.name, kind = excluded.kind''',
+        rows
+    )
+    save_school_calendar(conn)
+    conn.close()
+    
+    return jsonify({'success': True, 'message': f'{len(rows)} holidays saved'})
+
+@app.route('/api/calendar/holidays/<date>', methods=['DELETE'])
+def delete_school_holiday(date):
+    """Remove a holiday so the date is a working day again"""
+    conn = get_db_connection()
+    deleted = conn.execute('DELETE FROM school_holidays WHERE date = ?', (date,)).rowcount
+    
+    if not deleted:
+        conn.close()
+        return jsonify({'success': False, 'error': 'Holiday not found'}), 404
+    
+    save_school_calendar(conn)
+    conn.close()
+    return jsonify({'success': True, 'message': 'Holiday deleted'})
+
+# ============================================
+# API ROUTE: SCHOOL TERMS
+# ============================================
+
+@app.route('/api/calendar/terms', methods=['GET', 'POST'])
+def api_school_terms():
+    """
+    GET: List terms with their number of school days
+    POST: Add a term: {"name": "...", "start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}
+    """
+    conn = get_db_connection()
+    
+    if request.method == 'GET':
+        terms = [dict(row) for row in conn.execute(
+            '''SELECT t.term_id, t.name, t.start_date, t.end_date, COUNT(d.date) AS school_days
+               FROM school_terms t
+               LEFT JOIN school_days d ON d.term_id = t.term_id
+               GROUP BY t.term_id
+               ORDER BY t.start_date'''
+        )]
+        conn.close()
+        return jsonify({'success': True, 'terms': terms})
+    
+    data = request.get_json() or {}
+    try:
+        name = (data.get('name') or '').strip()
+        if not name:
+            raise ValueError('name is required')
+        start_date = parse_calendar_date(data.get('start_date'), 'start_date')
+        end_date = parse_calendar_date(data.get('end_date'), 'end_date')
+        if start_date > end_date:
+            raise ValueError('start_date must not be after end_date')
+        overlap = conn.execute(
+            'SELECT name FROM school_terms WHERE start_date <= ? AND end_date >= ?',
+            (end_date, start_date)
+        ).fetchone()
+        if overlap:
+            raise ValueError(f"Term overlaps {overlap['name']}")
+    except ValueError as e:
+        conn.close()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    term_id = conn.execute(
+        'INSERT INTO school_terms (name, start_date, end_date) VALUES (?, ?, ?)',
+        (name, start_date, end_date)
+    ).lastrowid
+    save_school_calendar(conn)
+    conn.close()
+    
+    return jsonify({'success': True, 'term_id': term_id, 'message': 'Term added'}), 201
+
+@app.route('/api/calendar/terms/<int:term_id>', methods=['DELETE'])
+def delete_school_term(term_id):
+    """Remove a term"""
+    conn = get_db_connection()
+    deleted = conn.execute('DELETE FROM school_terms WHERE term_id = ?', (term_id,)).rowcount
+    
+    if not deleted:
+        conn.close()
+        return jsonify({'success': False, 'error': 'Term not found'}), 404
+    
+    save_school_calendar(conn)
+    conn.close()
+    return jsonify({'success': True, 'message': 'Term deleted'})
+
+# ============================================
+# API ROUTE: WORKING DAYS
+# ============================================
+
+@app.route('/api/calendar/working-days')
+def get_working_days():
+    """
+    Working-day lookups against the precomputed index
+    Query params: month or start_date/end_date -> school days in the range;
+                  nth (optional, with after=YYYY-MM-DD) -> the nth school day
+    """
+    try:
+        start_date, end_date = report_date_range(request.args)
+        nth = int(request.args['nth']) if 'nth' in request.args else None
+        after = parse_calendar_date(request.args['after'], 'after') if 'after' in request.args else start_date
+        check_calendar_range(min(start_date, after), end_date)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    conn = get_db_connection()
+    calendar = get_school_calendar(conn, min(start_date, after), end_date)
+    conn.close()
+    
+    days = calendar.working_days(start_date, end_date)
+    result = {
+        'success': True,
+        'start_date': start_date,
+        'end_date': end_date,
+        'working_days': len(days),
+        'first_school_day': str(days[0]) if len(days) else None,
+        'last_school_day': str(days[-1]) if len(days) else None
+    }
+    if nth is not None:
+        result['nth_school_day'] = calendar.nth_school_day(nth, after)
+    return jsonify(result)
+
+# ============================================
+# API ROUTE: TEACHER ATTENDANCE REPORT
+# ============================================
+
+TEACHER_REPORT_CACHE_TTL_SECONDS = 300
+
+# daily=rle: one 'P12A1L2N3' string per teacher (N = not marked)
+# daily=bitmap: base64 bit arrays per status, one bit per working day
+TEACHER_REPORT_DAILY_FORMATS = ('rle', 'bitmap')
+TEACHER_STATUS_LETTERS = {
+    attendance_analytics.PRESENT: 'P',
+    attendance_analytics.ABSENT: 'A',
+    attendance_analytics.TEACHER_STATUS_CODES['leave']: 'L',
+    attendance_analytics.NOT_MARKED: 'N',
+}
+
+def build_teacher_attendance_query(start_date, end_date, days):
+    """
+    Per-teacher present/absent/leave counts over the school days of the inclusive range
+    days: the range's school days from get_school_calendar (which may lie outside the stored index)
+    """
+    query = '''SELECT
+            t.teacher_id,
+            t.name,
+            t.subject,
+            t.department,
+            COALESCE(a.present, 0) AS present,
+            COALESCE(a.absent, 0) AS absent,
+            COALESCE(a.leave, 0) AS leave
+           FROM teachers t
+           LEFT JOIN (
+                SELECT ta.teacher_id,
+                       COUNT(CASE WHEN status = 'present' THEN 1 END) AS present,
+                       COUNT(CASE WHEN status = 'absent' THEN 1 END) AS absent,
+                       COUNT(CASE WHEN status = 'leave' THEN 1 END) AS leave
+                FROM teacher_attendance ta
+                WHERE ta.date BETWEEN ? AND ?
+                  AND ta.date IN (SELECT value FROM json_each(?))
+                GROUP BY ta.teacher_id
+           ) a ON a.teacher_id = t.teacher_id
+           WHERE t.status = 'active'
+           ORDER BY t.name ASC'''
+    return query, [start_date, end_date, json.dumps([str(day) for day in days])]
+
+def encode_teacher_daily_records(matrix, daily):
+    """Compressed per-day statuses for every teacher in the matrix: {teacher_id: encoding}"""
+    if daily == 'rle':
+        encoded = matrix.run_lengths(TEACHER_STATUS_LETTERS)
+    else:
+        bitmaps = {status: matrix.bitmaps(status) for status in ('present', 'absent', 'leave')}
+        encoded = [
+            {status: base64.b64encode(bits[row].tobytes()).decode() for status, bits in bitmaps.items()}
+            for row in range(len(matrix.owner_ids))
+        ]
+    return dict(zip(matrix.owner_ids.tolist(), encoded))
+
+@app.route('/api/teacher-attendance-report')
+@cached_response('teachers', 'teacher_attendance', 'calendar', ttl=TEACHER_REPORT_CACHE_TTL_SECONDS)
+def teacher_attendance_report():
+    """
+    Get teacher attendance report over the working days of a date range or specific month
+    Query params: start_date, end_date OR month (YYYY-MM format); daily=rle|bitmap adds per-day records
+    Only school days (see school_calendar) count as working days
+    Returns: JSON with attendance statistics and per-teacher counts
+    """
+    try:
+        start_date, end_date = report_date_range(request.args)
+    except ValueError as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
+        }), 400
+    
+    daily = request.args.get('daily', '')
+    if daily and daily not in TEACHER_REPORT_DAILY_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"daily must be one of: {', '.join(TEACHER_REPORT_DAILY_FORMATS)}"
+        }), 400
+    
+    conn = get_db_connection()
+    try:
+        days = get_school_calendar(conn, start_date, end_date).working_days(start_date, end_date)
+        query, params = build_teacher_attendance_query(start_date, end_date, days)
+        teachers = [dict(row) for row in conn.execute(query, params)]
+        
+        daily_records = None
+        if daily:
+            matrix = attendance_analytics.load_teacher_matrix(
+                conn, start_date, str(np.datetime64(end_date) + 1), dates=days
+            )
+            daily_records = encode_teacher_daily_records(matrix, daily)
+    finally:
+        conn.close()
+    
+    total_days = len(days)
+    for teacher in teachers:
+        marked_days = teacher['present'] + teacher['absent'] + teacher['leave']
+        teacher['not_marked'] = total_days - marked_days
+        teacher['total_days'] = total_days
+        teacher['attendance_percentage'] = (
+            round(teacher['present'] / marked_days * 100, 2) if marked_days > 0 else 0
+        )
+        if daily_records is not None:
+            teacher['daily_records'] = daily_records.get(teacher['teacher_id'], '')
+    
+    # Calculate overall statistics
+    total_present = sum(t['present'] for t in teachers)
+    total_absent = sum(t['absent'] for t in teachers)
+    total_leave = sum(t['leave'] for t in teachers)
+    total_marked = total_present + total_absent + total_leave
+    
+    report = {
+        'success': True,
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_days': total_days,
+        'calendar_days': (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1,
+        'overall_stats': {
+            'total_teachers': len(teachers),
+            'total_present': total_present,
+            'total_absent': total_absent,
+            'total_leave': total_leave,
+            'total_not_marked': sum(t['not_marked'] for t in teachers),
+            'attendance_percentage': round(total_present / total_marked * 100, 2) if total_marked > 0 else 0
+        },
+        'teachers': teachers
+    }
+    if daily:
+        report['daily_format'] = daily
+        report['working_days'] = [str(day) for day in days]
+    
+    return jsonify(report), 200
+
+# ============================================
+# REPORT EXPORTS (STREAMING CSV/XLSX)
+# ============================================
+
+# Each builder validates the query parameters and returns
+# (filename, header, query, params, row mapper or None); raises ValueError on bad input
+
+def export_percentage(part, whole):
+    return round(part / whole * 100, 1) if whole > 0 else 0
+
+def build_monthly_attendance_export(args):
+    """Monthly attendance per student (month, class, section)"""
+    month = args.get('month', '')
+    month_date_range(month)
+    
+    query, params = build_monthly_attendance_query(month, args.get('class', ''), args.get('section', ''))
+    header = ['Roll No', 'Name', 'Class', 'Section', 'Total Days', 'Present', 'Absent', 'Late', 'Attendance %']
+    
+    def row_mapper(row):
+        return (row['roll_no'], row['name'], row['class'], row['section'], row['total_days'],
+                row['present'], row['absent'], row['late'], export_percentage(row['present'], row['total_days']))
+    
+    return f'attendance_{month}', header, query, params, row_mapper
+
+def build_teacher_attendance_export(args):
+    """Teacher attendance totals over the working days of a month or start_date/end_date range"""
+    start_date, end_date = report_date_range(args)
+    conn = get_db_connection()
+    days = get_school_calendar(conn, start_date, end_date).working_days(start_date, end_date)
+    conn.close()
+    
+    total_days = len(days)
+    query, params = build_teacher_attendance_query(start_date, end_date, days)
+    header = ['Teacher ID', 'Name', 'Subject', 'Department', 'Present Days', 'Absent Days',
+              'Leave Days', 'Not Marked Days', 'Total Days', 'Attendance %']
+    
+    def row_mapper(row):
+        marked = row['present'] + row['absent'] + row['leave']
+        return (row['teacher_id'], row['name'], row['subject'], row['department'], row['present'],
+                row['absent'], row['leave'], total_days - marked, total_days,
+                export_percentage(row['present'], marked))
+    
+    return f'teacher_attendance_{start_date}_to_{end_date}', header, query, params, row_mapper
+
+def build_fees_export(args):
+    """Fee records with student details (status, class)"""
+    query = '''SELECT f.fee_id, s.roll_no, s.name, s.class, s.section,
+                      f.total_amount, f.paid_amount, f.pending_amount, f.due_date, f.status
+               FROM fees f
+               JOIN students s ON f.student_id = s.student_id
+               WHERE 1=1'''
+    params = []
+    
+    if args.get('status'):
+        query += ' AND f.status = ?'
+        params.append(args['status'])
+    if args.get('class'):
+        query += ' AND s.class = ?'
+        params.append(args['class'])
+    
+    query += ' ORDER BY f.status DESC, f.due_date ASC, f.fee_id'
+    header = ['Fee ID', 'Roll No', 'Name', 'Class', 'Section', 'Total Amount', 'Paid Amount',
+              'Pending Amount', 'Due Date', 'Status']
+    return f"fees_{datetime.now().strftime('%Y-%m-%d')}", header, query, params, None
+
+def build_exam_performance_export(args):
+    """Exam results per student (class, exam_id, subject)"""
+    query = '''SELECT e.exam_name, e.subject, e.exam_date, s.roll_no, s.name, p.class, s.section,
+                      p.marks_obtained, p.max_marks, p.percentage, p.grade
+               FROM performance p
+               JOIN exams e ON p.exam_id = e.exam_id
+               JOIN students s ON p.student_id = s.student_id
+               WHERE 1=1'''
+    params = []
+    
+    if args.get('class'):
+        query += ' AND p.class = ?'
+        params.append(args['class'])
+    if args.get('exam_id'):
+        try:
+            params.append(int(args['exam_id']))
+        except ValueError:
+            raise ValueError('exam_id must be an integer')
+        query += ' AND p.exam_id = ?'
+    if args.get('subject'):
+        query += ' AND e.subject = ?'
+        params.append(args['subject'])
+    
+    query += ' ORDER BY e.exam_date, e.exam_id, s.class, s.section, s.roll_no'
+    header = ['Exam', 'Subject', 'Exam Date', 'Roll No', 'Name', 'Class', 'Section',
+              'Marks Obtained', 'Max Marks', 'Percentage', 'Grade']
+    return f"exam_performance_{datetime.now().strftime('%Y-%m-%d')}", header, query, params, None
+
+EXPORT_REPORTS = {
+    'monthly-attendance': build_monthly_attendance_export,
+    'teacher-attendance': build_teacher_attendance_export,
+    'fees': build_fees_export,
+    'exam-performance': build_exam_performance_export,
+}
+
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, CSV_MIMETYPE),
+    'xlsx': (xlsx_chunks, XLSX_MIMETYPE),
+}
+
+def export_rows(query, params, row_mapper=None):
+    """Yield report rows straight off the cursor (one row in memory at a time)"""
+    conn = get_db_connection()
+    try:
+        for row in conn.execute(query, params):
+            yield row_mapper(row) if row_mapper else tuple(row)
+    finally:
+        conn.close()
+
+# ============================================
+# API ROUTE: REPORT EXPORTS
+# ============================================
+
+@app.route('/api/export/<report>')
+def export_report(report):
+    """
+    Download a report as CSV or XLSX, streamed while the rows are read
+    Reports: monthly-attendance, teacher-attendance, fees, exam-performance
+    Query params: format (csv or xlsx) plus the report's own filters
+    """
+    builder = EXPORT_REPORTS.get(report)
+    if builder is None:
+        return jsonify({'success': False, 'error': f'Unknown report: {report}'}), 404
+    
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': f'Unknown format: {export_format}'}), 400
+    
+    try:
+        filename, header, query, params, row_mapper = builder(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    writer, mimetype = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(writer(header, export_rows(query, params, row_mapper))),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{export_format}"',
+            'Cache-Control': 'no-store'
+        }
+    )
 
 # ============================================
 # API ROUTE: SEND MESSAGE
@@ -2574,57 +5467,23 @@ def send_teacher_message():
                 'error': 'Invalid recipient type'
             }), 400
         
-        # Send email
+        # Send email over a pooled SMTP session
         priority_text = ''
         if priority == 'high':
             priority_text = '[HIGH PRIORITY] '
         
-        msg = Message(
-            subject=f"{priority_text}{subject}",
-            sender=app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[recipient_email]
+        msg = build_email_message(
+            'teacher_message',
+            f"{priority_text}{subject}",
+            recipient_email,
+            {
+                'recipient_name': recipient_name,
+                'priority': priority,
+                'body': body,
+                'body_html': Markup('<br>').join(body.split('\n'))
+            }
         )
-        
-        # HTML email template
-        msg.html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                          color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .priority-high {{ background: #ef4444; color: white; padding: 10px; 
-                                 margin-bottom: 20px; border-radius: 4px; }}
-                .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; 
-                          font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2>🎓 School Management System</h2>
-                    <p>Message from Teacher</p>
-                </div>
-                <div class="content">
-                    {'<div class="priority-high"><strong>⚠️ HIGH PRIORITY MESSAGE</strong></div>' if priority == 'high' else ''}
-                    <p><strong>Dear {recipient_name},</strong></p>
-                    <div style="background: white; padding: 20px; border-left: 4px solid #667eea; margin: 20px 0;">
-                        {body.replace(chr(10), '<br>')}
-                    </div>
-                    <div class="footer">
-                        <p>This is an automated message from the School Management System.</p>
-                        <p>Please do not reply to this email.</p>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        mail.send(msg)
+        send_email_message(msg)
         
         return jsonify({
             'success': True,
@@ -2638,6 +5497,86 @@ def send_teacher_message():
             'error': str(e)
         }), 500
 
+# ============================================
+# API ROUTE: DATABASE POOL METRICS
+# ============================================
+
+@app.route('/api/system/db-pool')
+def get_db_pool_metrics():
+    """
+    Get connection pool usage metrics
+    Returns: JSON with pool hits, opens and wait time
+    """
+    return jsonify({
+        'success': True,
+        'pool': db_pool.get_metrics()
+    })
+
+# ============================================
+# API ROUTE: DASHBOARD STREAM
+# ============================================
+
+DASHBOARD_STREAMS = {
+    'dashboard': [
+        ('stats', get_stats, ('students', 'teachers', 'attendance', 'fees', 'exams')),
+        ('attendance-data', get_attendance_data, ('attendance',)),
+        ('performance-data', get_performance_data, ('performance',)),
+        ('alerts', get_alerts, ('attendance', 'fees', 'exams')),
+    ],
+    'teacher-dashboard': [
+        ('stats', get_teacher_stats, ('students', 'teachers', 'attendance')),
+    ],
+}
+
+@app.route('/api/stream/<stream>')
+def stream_dashboard(stream):
+    """
+    Push dashboard data over Server-Sent Events
+    Sends every event in full on connect, then only the changed keys after each write
+    Returns: text/event-stream response
+    """
+    events = DASHBOARD_STREAMS.get(stream)
+    if events is None:
+        return jsonify({'success': False, 'error': f'Unknown stream: {stream}'}), 404
+    
+    return Response(
+        dashboard_event_stream(stream, events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# ============================================
+# API ROUTE: CHANGE FEED METRICS
+# ============================================
+
+@app.route('/api/system/change-feed')
+def get_change_feed_metrics():
+    """
+    Get dashboard stream metrics
+    Returns: JSON with the feed sequence, connected subscribers and snapshot computations
+    """
+    metrics = change_feed.get_metrics()
+    metrics['snapshot_computations'] = dashboard_snapshots.computations
+    return jsonify({
+        'success': True,
+        'feed': metrics
+    })
+
+# ============================================
+# API ROUTE: RESPONSE CACHE METRICS
+# ============================================
+
+@app.route('/api/system/response-cache')
+def get_response_cache_metrics():
+    """
+    Get dashboard response cache metrics
+    Returns: JSON with hits, misses, evictions and invalidations
+    """
+    return jsonify({
+        'success': True,
+        'cache': response_cache.get_metrics()
+    })
+
 # ============================================
 # ERROR HANDLERS
 # ============================================
@@ -2654,7 +5593,31 @@ def internal_error(error):
 # MAIN APPLICATION ENTRY POINT
 # ============================================
 
+# ============================================
+# BACKGROUND WORKERS
+# ============================================
+
+def start_background_workers(debug):
+    """
+    Start the background threads, but only in the process that serves requests
+    With the debug reloader this module runs in a watcher process and again in the serving
+    child (WERKZEUG_RUN_MAIN=true); workers in the watcher would race the child's workers
+    Returns: True if the workers were started
+    """
+    if debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return False
+    
+    # Deliver any alert emails left in the outbox by a previous run
+    email_outbox.start()
+    
+    # Flag fees that went overdue while the server was down, then once a day; its cache
+    # invalidations must happen in the process whose ResponseCache serves the fee views
+    fee_status_sweeper.start()
+    return True
+
 if __name__ == '__main__':
+    debug = True
+    
     print("\n" + "="*50)
     print("🎓 SCHOOL MANAGEMENT SYSTEM")
     print("="*50)
@@ -2662,6 +5625,8 @@ if __name__ == '__main__':
     # Initialize database
     init_database()
     
+    start_background_workers(debug)
+    
     print("\n🚀 Starting Flask server...")
     print("\n📊 ADMIN URLs:")
     print("   • Dashboard:   http://127.0.0.1:5000/dashboard")
@@ -2678,4 +5643,4 @@ if __name__ == '__main__':
     print("="*50 + "\n")
     
     # Run Flask app
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=debug, host='0.0.0.0', port=5000)
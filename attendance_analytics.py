@@ -0,0 +1,234 @@
+"""
+Vectorized attendance analytics for the School Management System
+
+Loads daily_attendance (or teacher_attendance) for a date range into an
+owner x school-day int8 matrix, then computes rates, rolling rates, absence
+streaks and day-of-week patterns with NumPy instead of per-record loops.
+
+Usage:
+    matrix = load_student_matrix(conn, '2026-01-01', '2026-04-01')
+    rates = matrix.rates()
+    longest, current = matrix.absence_streaks()
+"""
+
+import numpy as np
+
+# Cell codes; NOT_MARKED covers days an owner has no record (or an explicit not_marked)
+NOT_MARKED = -1
+ABSENT = 0
+PRESENT = 1
+
+STUDENT_STATUS_CODES = {'absent': ABSENT, 'present': PRESENT, 'late': 2}
+TEACHER_STATUS_CODES = {'absent': ABSENT, 'present': PRESENT, 'leave': 2, 'not_marked': NOT_MARKED}
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+def percentages(numerator, denominator):
+    """Element-wise numerator / denominator * 100, with 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator * 100, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+class AttendanceMatrix:
+    """
+    Attendance of many owners (students or teachers) over the school days of a range
+    owner_ids: sorted int64 array, one per row
+    dates: datetime64[D] array, one per column (days with at least one record)
+    codes: int8 array of shape (owners, days) holding status codes or NOT_MARKED
+    groups: optional array of group labels per row (class, department)
+    """
+
+    def __init__(self, owner_ids, dates, codes, status_codes, groups=None, owners=None):
+        self.owner_ids = owner_ids
+        self.dates = dates
+        self.codes = codes
+        self.status_codes = status_codes
+        self.groups = groups
+        self.owners = owners or []
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def select_days(self, mask):
+        """A matrix with only the columns where mask is True (e.g. school days)"""
+        return AttendanceMatrix(self.owner_ids, self.dates[mask], self.codes[:, mask], self.status_codes,
+                                groups=self.groups, owners=self.owners)
+
+    def counts(self):
+        """Per-owner day counts: one array per status plus 'marked'"""
+        counts = {
+            status: np.count_nonzero(self.codes == code, axis=1)
+            for status, code in self.status_codes.items() if code != NOT_MARKED
+        }
+        counts['marked'] = np.count_nonzero(self.codes != NOT_MARKED, axis=1)
+        return counts
+
+    def rates(self):
+        """Per-owner present percentage of marked days"""
+        counts = self.counts()
+        return percentages(counts['present'], counts['marked'])
+
+    def group_rates(self):
+        """Present percentage per group label: {label: percentage}"""
+        if self.groups is None:
+            raise ValueError('This matrix was loaded without groups')
+
+        counts = self.counts()
+        labels, inverse = np.unique(self.groups, return_inverse=True)
+        present = np.bincount(inverse, weights=counts['present'], minlength=len(labels))
+        marked = np.bincount(inverse, weights=counts['marked'], minlength=len(labels))
+        return dict(zip(labels.tolist(), percentages(present, marked).tolist()))
+
+    def rolling_rates(self, window_days):
+        """
+        Per-owner present percentage over the trailing window_days calendar days
+        ending on each school day; returns an array shaped like codes
+        """
+        present = np.zeros((self.codes.shape[0], self.codes.shape[1] + 1), dtype=np.int32)
+        marked = np.zeros_like(present)
+        np.cumsum(self.codes == PRESENT, axis=1, out=present[:, 1:])
+        np.cumsum(self.codes != NOT_MARKED, axis=1, out=marked[:, 1:])
+
+        days = self.dates.astype(np.int64)
+        window_start = np.searchsorted(days, days - window_days + 1, side='left')
+        window_end = np.arange(1, len(days) + 1)
+        return percentages(present[:, window_end] - present[:, window_start],
+                           marked[:, window_end] - marked[:, window_start])
+
+    def absence_streaks(self):
+        """
+        Consecutive absences over school days (an unmarked day ends a streak)
+        Returns: (longest streak per owner, streak still running on the last day per owner)
+        """
+        if self.codes.shape[1] == 0:
+            empty = np.zeros(self.codes.shape[0], dtype=np.int32)
+            return empty, empty.copy()
+
+        absent = self.codes == ABSENT
+        running = np.cumsum(absent, axis=1, dtype=np.int32)
+        # Each streak restarts from the running total at the last non-absent day
+        restart = np.maximum.accumulate(np.where(absent, 0, running), axis=1)
+        streaks = running - restart
+        return streaks.max(axis=1), streaks[:, -1]
+
+    def weekdays(self):
+        """Weekday (0 = Monday) of every column"""
+        # 1970-01-01 was a Thursday
+        return (self.dates.astype(np.int64) + 3) % 7
+
+    def weekday_rates(self):
+        """
+        Present percentage by day of week
+        Returns: (overall {weekday name: percentage}, per-owner array of shape (owners, 7))
+        """
+        one_hot = np.zeros((self.codes.shape[1], 7), dtype=np.int32)
+        one_hot[np.arange(self.codes.shape[1]), self.weekdays()] = 1
+
+        present = (self.codes == PRESENT).astype(np.int32) @ one_hot
+        marked = (self.codes != NOT_MARKED).astype(np.int32) @ one_hot
+        overall = percentages(present.sum(axis=0), marked.sum(axis=0))
+        return dict(zip(WEEKDAYS, overall.tolist())), percentages(present, marked)
+
+    def run_lengths(self, letters):
+        """
+        Run-length encode each owner's row, e.g. 'P12A1P5N3'
+        letters: {code: single-character label}; every code in the matrix needs one
+        """
+        encoded = []
+        for row in self.codes:
+            if len(row) == 0:
+                encoded.append('')
+                continue
+            starts = np.concatenate(([0], np.flatnonzero(row[1:] != row[:-1]) + 1))
+            lengths = np.diff(np.append(starts, len(row)))
+            encoded.append(''.join(f'{letters[code]}{length}'
+                                   for code, length in zip(row[starts].tolist(), lengths.tolist())))
+        return encoded
+
+    def bitmaps(self, status):
+        """Per-owner packed bit array (one bit per column, first column in the high bit) of one status"""
+        return np.packbits(self.codes == self.status_codes[status], axis=1)
+
+def status_case_sql(status_codes):
+    """SQL CASE expression mapping the status column to its int8 code"""
+    branches = ' '.join(f"WHEN '{status}' THEN {code}" for status, code in status_codes.items())
+    return f'CASE status {branches} ELSE {NOT_MARKED} END'
+
+def load_attendance_matrix(conn, table, owner_column, owners, start, end, status_codes, groups=None, dates=None,
+                           owner_query=None, owner_params=()):
+    """
+    Load attendance records for [start, end) into an AttendanceMatrix
+    owners: rows whose first column is the owner id, ordered by id
+    dates: optional sorted datetime64[D] columns (e.g. working days); records on other days are dropped
+    owner_query: optional SELECT of the owner ids, so only their records are read from the table
+    Records of owners not in the list are ignored
+    """
+    owner_ids = np.array([owner[0] for owner in owners], dtype=np.int64)
+
+    query = f'''SELECT {owner_column},
+                      CAST(julianday(date) - julianday(?) AS INTEGER),
+                      {status_case_sql(status_codes)}
+               FROM {table}
+               WHERE date >= ? AND date < ?'''
+    params = [start, start, end]
+    if owner_query:
+        query += f' AND {owner_column} IN ({owner_query})'
+        params.extend(owner_params)
+
+    records = conn.execute(query, params).fetchall()
+    records = np.array(records, dtype=np.int64).reshape(-1, 3)
+
+    rows = np.searchsorted(owner_ids, records[:, 0])
+    known = rows < len(owner_ids)
+    known[known] = owner_ids[rows[known]] == records[known, 0]
+    records, rows = records[known], rows[known]
+
+    if dates is None:
+        # Only days that have at least one record count as school days
+        day_offsets, columns = np.unique(records[:, 1], return_inverse=True)
+        dates = np.datetime64(start, 'D') + day_offsets
+    else:
+        day_offsets = (dates - np.datetime64(start, 'D')).astype(np.int64)
+        columns = np.searchsorted(day_offsets, records[:, 1])
+        on_day = columns < len(day_offsets)
+        on_day[on_day] = day_offsets[columns[on_day]] == records[on_day, 1]
+        records, rows, columns = records[on_day], rows[on_day], columns[on_day]
+
+    codes = np.full((len(owner_ids), len(dates)), NOT_MARKED, dtype=np.int8)
+    codes[rows, columns] = records[:, 2]
+
+    return AttendanceMatrix(owner_ids, dates, codes, status_codes,
+                            groups=np.array(groups) if groups is not None else None, owners=owners)
+
+def load_student_matrix(conn, start, end, class_name='', section=''):
+    """Student x school-day matrix for [start, end), grouped by class"""
+    where = '1=1'
+    params = []
+    if class_name:
+        where += ' AND class = ?'
+        params.append(class_name)
+    if section:
+        where += ' AND section = ?'
+        params.append(section)
+
+    students = conn.execute(
+        f'SELECT student_id, roll_no, name, class, section FROM students WHERE {where} ORDER BY student_id', params
+    ).fetchall()
+    # The same filter limits the records read, not just the rows kept
+    owner_query = f'SELECT student_id FROM students WHERE {where}' if params else None
+    return load_attendance_matrix(conn, 'daily_attendance', 'student_id', students, start, end,
+                                  STUDENT_STATUS_CODES, groups=[s['class'] for s in students],
+                                  owner_query=owner_query, owner_params=params)
+
+def load_teacher_matrix(conn, start, end, dates=None):
+    """Active teacher x school-day matrix for [start, end), grouped by department"""
+    teachers = conn.execute(
+        '''SELECT teacher_id, name, subject, department
+           FROM teachers
+           WHERE status = 'active'
+           ORDER BY teacher_id'''
+    ).fetchall()
+    return load_attendance_matrix(conn, 'teacher_attendance', 'teacher_id', teachers, start, end,
+                                  TEACHER_STATUS_CODES, groups=[t['department'] for t in teachers], dates=dates)
@@ -0,0 +1,73 @@
+"""
+Benchmark SMTP delivery: one session per message vs. the pooled sessions
+Runs against the local stand-in SMTP server (no real emails are sent)
+
+Run with: python benchmark_smtp.py [message_count] [handshake_ms]
+handshake_ms simulates the TLS + AUTH cost of a real server (default 50)
+"""
+
+import smtplib
+import sys
+import time
+
+import app
+from local_smtp_server import LocalSMTPServer
+
+def build_messages(count):
+    """Build sample absence notifications"""
+    return [
+        app.build_absence_notification(
+            f'Student {i}', f'10A{i:03d}', 'Class 10', 'A', '2026-02-04', f'parent{i}@example.com'
+        )
+        for i in range(count)
+    ]
+
+def send_one_session_per_message(messages):
+    """Old behaviour: connect, (STARTTLS, login) and quit for every message"""
+    for msg in messages:
+        with smtplib.SMTP(app.MAIL_SERVER, app.MAIL_PORT) as server:
+            server.send_message(msg)
+
+def send_with_pool(messages):
+    """New behaviour: deliver in batches over pooled sessions"""
+    for i in range(0, len(messages), app.EMAIL_BATCH_SIZE):
+        results = app.smtp_pool.send_batch(messages[i:i + app.EMAIL_BATCH_SIZE])
+        assert all(r is None for r in results), results
+
+def run_benchmark(count=200, handshake_ms=50):
+    server = LocalSMTPServer().start()
+    server.handshake_delay = handshake_ms / 1000
+    app.MAIL_SERVER = '127.0.0.1'
+    app.MAIL_PORT = server.port
+    app.MAIL_USE_TLS = False
+    app.MAIL_PASSWORD = ''
+
+    messages = build_messages(count)
+
+    try:
+        results = {}
+        for label, sender in [('Before (session per message)', send_one_session_per_message),
+                              ('After (pooled sessions)', send_with_pool)]:
+            sessions_before = server.sessions
+            started = time.perf_counter()
+            sender(messages)
+            elapsed = time.perf_counter() - started
+            results[label] = count / elapsed
+            print(f"{label:32} {count / elapsed:10.1f} msg/s  "
+                  f"({elapsed:.2f}s, {server.sessions - sessions_before} SMTP sessions)")
+
+        before, after = results.values()
+        print(f"\nSpeedup: {after / before:.1f}x")
+        return results
+    finally:
+        app.smtp_pool.close_all()
+        server.stop()
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    handshake_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print("=" * 60)
+    print(f"SMTP BENCHMARK: {count} messages, {handshake_ms}ms simulated handshake")
+    print("=" * 60)
+    run_benchmark(count, handshake_ms)
@@ -0,0 +1,26 @@
+"""
+Shared pytest fixtures for the School Management System tests
+"""
+import pytest
+
+import app
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    Point the app at a fresh database in tmp_path with an empty response cache
+    app.DATABASE is restored and background workers are stopped afterwards
+    """
+    path = str(tmp_path / 'database.db')
+    monkeypatch.setattr(app, 'DATABASE', path)
+    app.response_cache.clear()
+    app.init_database()
+    yield path
+    app.email_outbox.stop()
+    app.fee_status_sweeper.stop()
+    app.response_cache.clear()
+
+@pytest.fixture
+def client(database):
+    """Flask test client on the fresh database"""
+    return app.app.test_client()
@@ -39,7 +39,7 @@ def create_alert_logs_table():
                     date DATE NOT NULL,
                     parent_email TEXT NOT NULL,
                     message TEXT NOT NULL,
-                    status TEXT NOT NULL CHECK(status IN ('sent', 'failed')),
+                    status TEXT NOT NULL CHECK(status IN ('queued', 'sent', 'failed')),
                     sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (student_id) REFERENCES students(student_id)
                 )
@@ -0,0 +1,124 @@
+"""
+Local stand-in SMTP server for testing email delivery
+Accepts every message and keeps it in memory (nothing leaves the machine)
+
+Run with: python local_smtp_server.py [port] [handshake_ms]
+Then point app.py at it: MAIL_SERVER = "127.0.0.1", MAIL_PORT = 1025,
+MAIL_USE_TLS = False, MAIL_PASSWORD = ""
+"""
+
+import socketserver
+import sys
+import threading
+import time
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Handle one SMTP session (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT)"""
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.sessions += 1
+
+        # Simulate the cost of a real TCP/TLS/AUTH handshake
+        if server.handshake_delay:
+            time.sleep(server.handshake_delay)
+
+        self.reply('220 localhost Local SMTP stand-in ready')
+        sender = None
+        recipients = []
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender = command[10:].strip()
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip())
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    if data_line.startswith(b'..'):
+                        data_line = data_line[1:]
+                    data.append(data_line)
+
+                with server.lock:
+                    if server.fail_next > 0:
+                        server.fail_next -= 1
+                        self.reply('451 Temporary failure, try again later')
+                        continue
+                    server.messages.append({
+                        'sender': sender,
+                        'recipients': recipients,
+                        'data': b''.join(data).decode(errors='replace')
+                    })
+                self.reply('250 OK: queued')
+            elif verb == 'RSET':
+                sender = None
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                break
+            else:
+                self.reply('502 Command not implemented')
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded in-memory SMTP server"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), SMTPHandler)
+        self.lock = threading.Lock()
+        self.messages = []
+        self.sessions = 0
+        self.fail_next = 0  # Number of upcoming messages to reject with 451
+        self.handshake_delay = 0.0  # Seconds to wait before greeting each session
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    server = LocalSMTPServer(port=port)
+    if len(sys.argv) > 2:
+        server.handshake_delay = int(sys.argv[2]) / 1000
+    print("=" * 60)
+    print(f"LOCAL SMTP SERVER listening on 127.0.0.1:{server.port}")
+    print("=" * 60)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nReceived {len(server.messages)} message(s) in {server.sessions} session(s)")
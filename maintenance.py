@@ -0,0 +1,114 @@
+"""
+Database maintenance commands for the School Management System
+
+Usage:
+    python maintenance.py migrate                    Apply pending schema migrations
+    python maintenance.py rebuild-rollup [--month M] Rebuild the monthly attendance rollup
+    python maintenance.py rebuild-summary [--date D] Rebuild the daily attendance summaries
+    python maintenance.py rebuild-streaks            Rebuild the consecutive absence streaks
+    python maintenance.py rebuild-calendar           Rebuild the school_days working-day index
+    python maintenance.py rebuild-fee-balances       Rebuild the student and class fee balances
+    python maintenance.py sweep-overdue-fees         Mark pending fees past their due date as overdue
+"""
+
+import argparse
+import os
+import sys
+
+import app
+
+def cmd_migrate(args):
+    """Apply pending schema migrations (main() already ran them)"""
+    print("✅ Migrations applied")
+
+def cmd_rebuild_rollup(args):
+    """Rebuild student_monthly_attendance from daily_attendance"""
+    conn = app.get_db_connection()
+    rows = app.rebuild_attendance_rollup(conn, args.month)
+    conn.close()
+    scope = args.month or 'all months'
+    print(f"✅ Monthly attendance rollup rebuilt for {scope}: {rows} row(s)")
+
+def cmd_rebuild_summary(args):
+    """Rebuild class_daily_attendance and the attendance summary rows from daily_attendance"""
+    conn = app.get_db_connection()
+    rows = app.rebuild_attendance_summary(conn, args.date)
+    conn.close()
+    scope = args.date or 'all dates'
+    print(f"✅ Daily attendance summary rebuilt for {scope}: {rows} class row(s)")
+
+def cmd_rebuild_streaks(args):
+    """Rebuild student_absence_streaks from daily_attendance"""
+    conn = app.get_db_connection()
+    rows = app.rebuild_absence_streaks(conn)
+    conn.close()
+    print(f"✅ Absence streaks rebuilt for {rows} student(s)")
+
+def cmd_rebuild_calendar(args):
+    """Rebuild school_days from school_terms and school_holidays"""
+    conn = app.get_db_connection()
+    calendar = app.school_calendar.rebuild_school_days(conn)
+    conn.commit()
+    conn.close()
+    print(f"✅ Working-day index rebuilt: {len(calendar.school_days)} school day(s) "
+          f"from {calendar.start} to {calendar.end}")
+
+def cmd_rebuild_fee_balances(args):
+    """Rebuild student_fee_balances and class_fee_balances from fees"""
+    conn = app.get_db_connection()
+    rows = app.rebuild_fee_balances(conn)
+    conn.close()
+    print(f"✅ Fee balances rebuilt for {rows} student(s)")
+
+def cmd_sweep_overdue_fees(args):
+    """Run the daily overdue sweep now (for deployments that schedule it with cron)"""
+    conn = app.get_db_connection()
+    fee_ids = app.sweep_overdue_fees(conn)
+    conn.close()
+    print(f"✅ Overdue sweep: {len(fee_ids)} fee(s) marked overdue")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='School Management System maintenance')
+    parser.add_argument('--database', default=app.DATABASE, help='Path to the SQLite database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('migrate', help='Apply pending schema migrations')
+
+    rollup = subparsers.add_parser('rebuild-rollup', help='Rebuild the monthly attendance rollup')
+    rollup.add_argument('--month', help='Only rebuild one month (YYYY-MM)')
+
+    summary = subparsers.add_parser('rebuild-summary', help='Rebuild the daily attendance summaries')
+    summary.add_argument('--date', help='Only rebuild one date (YYYY-MM-DD)')
+
+    subparsers.add_parser('rebuild-streaks', help='Rebuild the consecutive absence streaks')
+    subparsers.add_parser('rebuild-calendar', help='Rebuild the school_days working-day index')
+    subparsers.add_parser('rebuild-fee-balances', help='Rebuild the student and class fee balances')
+    subparsers.add_parser('sweep-overdue-fees', help='Mark pending fees past their due date as overdue')
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        print("❌ Database not found. Please run the application first to create the database.")
+        return 1
+
+    app.DATABASE = args.database
+
+    # Every command expects an up-to-date schema
+    conn = app.get_db_connection()
+    app.migrate_database(conn)
+    conn.close()
+
+    commands = {
+        'migrate': cmd_migrate,
+        'rebuild-rollup': cmd_rebuild_rollup,
+        'rebuild-summary': cmd_rebuild_summary,
+        'rebuild-streaks': cmd_rebuild_streaks,
+        'rebuild-calendar': cmd_rebuild_calendar,
+        'rebuild-fee-balances': cmd_rebuild_fee_balances,
+        'sweep-overdue-fees': cmd_sweep_overdue_fees,
+    }
+    commands[args.command](args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
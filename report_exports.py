@@ -0,0 +1,143 @@
+"""
+Streaming CSV and XLSX writers for report exports
+
+Both writers take a header and an iterable of rows (e.g. a database cursor) and
+yield bytes every few hundred rows, so an export holds at most one chunk in
+memory and the first bytes go out before the last row has been read.
+
+Usage:
+    rows = conn.execute(query, params)
+    return Response(stream_with_context(csv_chunks(header, rows)), mimetype=CSV_MIMETYPE)
+"""
+
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+CSV_MIMETYPE = 'text/csv'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Rows written between yields
+CHUNK_ROWS = 500
+
+def csv_chunks(header, rows, chunk_rows=CHUNK_ROWS):
+    """Yield a UTF-8 CSV (with a BOM so Excel detects the encoding) in chunks of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+# ============================================
+# XLSX (SpreadsheetML written straight into a streamed zip)
+# ============================================
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+# Control characters are not allowed in XML 1.0 text
+XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class _ChunkSink:
+    """Write-only file object that collects zip output until the generator drains it"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def xlsx_cell(value):
+    """One <c> element: numbers as numeric cells, everything else as an inline string"""
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(XML_ILLEGAL_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+def xlsx_chunks(header, rows, sheet_name='Report', chunk_rows=CHUNK_ROWS):
+    """Yield a single-sheet XLSX workbook in chunks of rows"""
+    sink = _ChunkSink()
+    # An unseekable sink makes zipfile write data descriptors instead of seeking back
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+        workbook.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(name=escape(sheet_name[:31], {'"': '&quot;'})))
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_START + xlsx_row(header)).encode('utf-8'))
+            yield sink.drain()
+
+            lines = []
+            for row in rows:
+                lines.append(xlsx_row(row))
+                if len(lines) == chunk_rows:
+                    sheet.write(''.join(lines).encode('utf-8'))
+                    lines.clear()
+                    yield sink.drain()
+
+            sheet.write((''.join(lines) + XLSX_SHEET_END).encode('utf-8'))
+
+    yield sink.drain()
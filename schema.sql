@@ -15,6 +15,41 @@ CREATE TABLE IF NOT EXISTS students (
     status TEXT DEFAULT 'active'
 );
 
+-- Keyset pagination order for student lists
+CREATE INDEX IF NOT EXISTS idx_students_class_section_roll
+    ON students (class, section, roll_no);
+
+-- Full-text search over students (external content, kept in sync by triggers)
+CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+    name,
+    roll_no,
+    email,
+    parent_email,
+    content = 'students',
+    content_rowid = 'student_id',
+    prefix = '2 3'
+);
+
+-- Rank name and roll_no matches above email and parent_email matches
+INSERT INTO students_fts (students_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 2.0, 1.0)');
+
+CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+    INSERT INTO students_fts (rowid, name, roll_no, email, parent_email)
+    VALUES (new.student_id, new.name, new.roll_no, new.email, new.parent_email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+    INSERT INTO students_fts (students_fts, rowid, name, roll_no, email, parent_email)
+    VALUES ('delete', old.student_id, old.name, old.roll_no, old.email, old.parent_email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name, roll_no, email, parent_email ON students BEGIN
+    INSERT INTO students_fts (students_fts, rowid, name, roll_no, email, parent_email)
+    VALUES ('delete', old.student_id, old.name, old.roll_no, old.email, old.parent_email);
+    INSERT INTO students_fts (rowid, name, roll_no, email, parent_email)
+    VALUES (new.student_id, new.name, new.roll_no, new.email, new.parent_email);
+END;
+
 -- Teachers Table
 CREATE TABLE IF NOT EXISTS teachers (
     teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -37,6 +72,30 @@ CREATE TABLE IF NOT EXISTS teacher_attendance (
     UNIQUE(teacher_id, date)
 );
 
+-- School Terms (between the first and last term, only days inside a term are school days)
+CREATE TABLE IF NOT EXISTS school_terms (
+    term_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    CHECK(start_date <= end_date)
+);
+
+-- School Holidays and Half-Days (weekend days are configured in school_calendar.py)
+CREATE TABLE IF NOT EXISTS school_holidays (
+    date DATE PRIMARY KEY,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'holiday' CHECK(kind IN ('holiday', 'half_day'))
+);
+
+-- Working-day index: every school day numbered in date order (rebuilt on calendar edits)
+CREATE TABLE IF NOT EXISTS school_days (
+    date DATE PRIMARY KEY,
+    ordinal INTEGER NOT NULL,
+    term_id INTEGER,
+    half_day INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
 -- Attendance Table (Summary)
 CREATE TABLE IF NOT EXISTS attendance (
     attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -47,6 +106,9 @@ CREATE TABLE IF NOT EXISTS attendance (
     attendance_percentage REAL NOT NULL
 );
 
+-- One summary row per date (maintained from daily_attendance by save_attendance)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date);
+
 -- Daily Student Attendance Table
 CREATE TABLE IF NOT EXISTS daily_attendance (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -57,6 +119,49 @@ CREATE TABLE IF NOT EXISTS daily_attendance (
     UNIQUE(student_id, date)
 );
 
+-- Covering indexes for date-range attendance reports
+CREATE INDEX IF NOT EXISTS idx_daily_attendance_date_student
+    ON daily_attendance (date, student_id, status);
+CREATE INDEX IF NOT EXISTS idx_daily_attendance_student_date
+    ON daily_attendance (student_id, date, status);
+CREATE INDEX IF NOT EXISTS idx_teacher_attendance_date
+    ON teacher_attendance (date, teacher_id, status);
+
+-- Monthly Attendance Rollup (per-student counts maintained by save_attendance)
+CREATE TABLE IF NOT EXISTS student_monthly_attendance (
+    student_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month),
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+) WITHOUT ROWID;
+
+-- Daily Attendance Summary per class (maintained by save_attendance)
+CREATE TABLE IF NOT EXISTS class_daily_attendance (
+    date DATE NOT NULL,
+    class TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, class)
+) WITHOUT ROWID;
+
+-- Consecutive absence streak per student (maintained by save_attendance)
+CREATE TABLE IF NOT EXISTS student_absence_streaks (
+    student_id INTEGER PRIMARY KEY,
+    last_date DATE NOT NULL,
+    current_streak INTEGER NOT NULL DEFAULT 0,
+    streak_start DATE,
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_absence_streaks_current
+    ON student_absence_streaks (current_streak, student_id);
+
 -- Fees Table
 CREATE TABLE IF NOT EXISTS fees (
     fee_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,6 +174,65 @@ CREATE TABLE IF NOT EXISTS fees (
     FOREIGN KEY (student_id) REFERENCES students(student_id)
 );
 
+-- Overdue sweep lookups (pending fees by due date)
+CREATE INDEX IF NOT EXISTS idx_fees_status_due ON fees (status, due_date);
+
+-- Per-student fee lookups (payment import, duplicate checks in bulk generation)
+CREATE INDEX IF NOT EXISTS idx_fees_student_due ON fees (student_id, due_date);
+
+-- Daily overdue sweeps and the fees each one marked overdue
+CREATE TABLE IF NOT EXISTS fee_status_sweeps (
+    sweep_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    as_of_date DATE NOT NULL,
+    swept_at REAL NOT NULL,
+    fees_updated INTEGER NOT NULL,
+    fee_ids TEXT NOT NULL
+);
+
+-- Fee Payments Ledger (append-only; fees.paid_amount is the sum of a fee's payments)
+CREATE TABLE IF NOT EXISTS fee_payments (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fee_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    amount REAL NOT NULL CHECK(amount > 0),
+    method TEXT NOT NULL DEFAULT 'cash',
+    reference TEXT,
+    received_by TEXT,
+    paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (fee_id) REFERENCES fees(fee_id),
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fee_payments_fee ON fee_payments (fee_id, payment_id);
+
+CREATE TRIGGER IF NOT EXISTS fee_payments_no_update BEFORE UPDATE ON fee_payments BEGIN
+    SELECT RAISE(ABORT, 'fee_payments is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS fee_payments_no_delete BEFORE DELETE ON fee_payments BEGIN
+    SELECT RAISE(ABORT, 'fee_payments is append-only');
+END;
+
+-- Outstanding fee balances per student and per class (maintained by record_fee_payment and the overdue sweep)
+CREATE TABLE IF NOT EXISTS student_fee_balances (
+    student_id INTEGER PRIMARY KEY,
+    total_amount REAL NOT NULL DEFAULT 0,
+    paid_amount REAL NOT NULL DEFAULT 0,
+    pending_amount REAL NOT NULL DEFAULT 0,
+    open_fees INTEGER NOT NULL DEFAULT 0,
+    overdue_fees INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+);
+
+CREATE TABLE IF NOT EXISTS class_fee_balances (
+    class TEXT PRIMARY KEY,
+    total_amount REAL NOT NULL DEFAULT 0,
+    paid_amount REAL NOT NULL DEFAULT 0,
+    pending_amount REAL NOT NULL DEFAULT 0,
+    open_fees INTEGER NOT NULL DEFAULT 0,
+    overdue_fees INTEGER NOT NULL DEFAULT 0
+);
+
 -- Exams Table
 CREATE TABLE IF NOT EXISTS exams (
     exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -98,15 +262,44 @@ CREATE TABLE IF NOT EXISTS performance (
 CREATE TABLE IF NOT EXISTS alert_logs (
     log_id INTEGER PRIMARY KEY AUTOINCREMENT,
     student_id INTEGER NOT NULL,
-    alert_type TEXT NOT NULL CHECK(alert_type IN ('absence', 'low_attendance')),
+    alert_type TEXT NOT NULL CHECK(alert_type IN ('absence', 'low_attendance', 'absence_streak')),
     date DATE NOT NULL,
     parent_email TEXT NOT NULL,
     message TEXT NOT NULL,
-    status TEXT NOT NULL CHECK(status IN ('sent', 'failed')),
+    status TEXT NOT NULL CHECK(status IN ('queued', 'sent', 'failed', 'rate_limited')),
     sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES students(student_id)
 );
 
+-- Alert deduplication key and per-recipient rate limit lookups
+CREATE INDEX IF NOT EXISTS idx_alert_logs_dedup
+    ON alert_logs (student_id, alert_type, date, status);
+CREATE INDEX IF NOT EXISTS idx_alert_logs_recipient
+    ON alert_logs (parent_email, sent_at);
+
+-- Alert log from/to date filters
+CREATE INDEX IF NOT EXISTS idx_alert_logs_sent_at
+    ON alert_logs (sent_at);
+
+-- Email Outbox (Alert emails waiting for background delivery)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_id INTEGER,
+    alert_type TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    FOREIGN KEY (log_id) REFERENCES alert_logs(log_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next
+    ON email_outbox (status, next_attempt_at);
+
 -- ============================================
 -- SAMPLE DATA FOR DEMONSTRATION
 -- ============================================
@@ -215,16 +408,6 @@ INSERT INTO daily_attendance (student_id, date, status) VALUES
 (29, date('now'), 'present'),
 (30, date('now'), 'absent');
 
--- Insert Attendance Data (Last 7 days)
-INSERT INTO attendance (date, total_students, present_students, absent_students, attendance_percentage) VALUES
-(date('now', '-6 days'), 30, 27, 3, 90.0),
-(date('now', '-5 days'), 30, 26, 4, 86.7),
-(date('now', '-4 days'), 30, 28, 2, 93.3),
-(date('now', '-3 days'), 30, 24, 6, 80.0),
-(date('now', '-2 days'), 30, 22, 8, 73.3),
-(date('now', '-1 days'), 30, 23, 7, 76.7),
-(date('now'), 20, 18, 2, 90.0);
-
 -- Insert Fees Data (Some pending)
 INSERT INTO fees (student_id, total_amount, paid_amount, pending_amount, due_date, status) VALUES
 (1, 15000, 15000, 0, date('now', '+30 days'), 'paid'),
@@ -286,3 +469,73 @@ INSERT INTO performance (student_id, exam_id, class, marks_obtained, max_marks,
 -- Class 7 Performance
 (8, 4, 'Class 7', 72, 100, 72.0, 'B'),
 (14, 4, 'Class 7', 88, 100, 88.0, 'A');
+
+-- Build the monthly attendance rollup for the sample attendance
+INSERT INTO student_monthly_attendance (student_id, month, present, absent, late, total)
+SELECT student_id,
+       substr(date, 1, 7),
+       COUNT(CASE WHEN status = 'present' THEN 1 END),
+       COUNT(CASE WHEN status = 'absent' THEN 1 END),
+       COUNT(CASE WHEN status = 'late' THEN 1 END),
+       COUNT(*)
+FROM daily_attendance
+GROUP BY student_id, substr(date, 1, 7);
+
+-- Build the daily attendance summaries for the sample attendance
+INSERT INTO class_daily_attendance (date, class, present, absent, late, total)
+SELECT d.date,
+       s.class,
+       COUNT(CASE WHEN d.status = 'present' THEN 1 END),
+       COUNT(CASE WHEN d.status = 'absent' THEN 1 END),
+       COUNT(CASE WHEN d.status = 'late' THEN 1 END),
+       COUNT(*)
+FROM daily_attendance d
+JOIN students s ON s.student_id = d.student_id
+GROUP BY d.date, s.class;
+
+INSERT OR REPLACE INTO attendance (date, total_students, present_students, absent_students, attendance_percentage)
+SELECT date, SUM(total), SUM(present), SUM(absent), ROUND(SUM(present) * 100.0 / SUM(total), 1)
+FROM class_daily_attendance
+GROUP BY date;
+
+-- Build the absence streaks for the sample attendance
+INSERT INTO student_absence_streaks (student_id, last_date, current_streak, streak_start)
+SELECT d.student_id,
+       MAX(d.date),
+       COUNT(CASE WHEN d.date > COALESCE(b.last_attended, '') THEN 1 END),
+       MIN(CASE WHEN d.date > COALESCE(b.last_attended, '') THEN d.date END)
+FROM daily_attendance d
+LEFT JOIN (SELECT student_id, MAX(date) AS last_attended
+           FROM daily_attendance
+           WHERE status != 'absent'
+           GROUP BY student_id) b ON b.student_id = d.student_id
+GROUP BY d.student_id;
+
+-- Opening ledger entries for the sample fees' paid amounts
+INSERT INTO fee_payments (fee_id, student_id, amount, method, paid_at)
+SELECT fee_id, student_id, paid_amount, 'opening_balance', NULL
+FROM fees
+WHERE paid_amount > 0
+ORDER BY fee_id;
+
+-- Build the fee balances for the sample fees
+INSERT INTO student_fee_balances (student_id, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+SELECT student_id,
+       SUM(total_amount),
+       SUM(paid_amount),
+       SUM(pending_amount),
+       COUNT(CASE WHEN status != 'paid' THEN 1 END),
+       COUNT(CASE WHEN status = 'overdue' THEN 1 END)
+FROM fees
+GROUP BY student_id;
+
+INSERT INTO class_fee_balances (class, total_amount, paid_amount, pending_amount, open_fees, overdue_fees)
+SELECT s.class,
+       SUM(f.total_amount),
+       SUM(f.paid_amount),
+       SUM(f.pending_amount),
+       COUNT(CASE WHEN f.status != 'paid' THEN 1 END),
+       COUNT(CASE WHEN f.status = 'overdue' THEN 1 END)
+FROM fees f
+JOIN students s ON s.student_id = f.student_id
+GROUP BY s.class;
@@ -0,0 +1,194 @@
+"""
+School calendar with a precomputed working-day index for the School Management System
+
+Terms bound the school year: between the first term's start and the last term's
+end, only days inside a term can be school days. Outside that range (years
+before the calendar was set up), every weekday counts. Weekend days and
+school_holidays entries of kind 'holiday' are never school days. 'half_day'
+entries are school days with a flag.
+
+The school days of a span of whole years are numbered once and stored in the
+school_days table (date -> ordinal). SchoolCalendar loads that index into arrays, so
+"working days between A and B", "is D a school day" and "nth school day" are
+constant-time lookups instead of datetime arithmetic.
+
+Usage:
+    calendar = load_school_calendar(conn)
+    calendar.working_days_between('2026-03-01', '2026-03-31')
+    calendar.nth_school_day(10, after='2026-04-01')
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+# Days of the week without school (Monday = 0)
+WEEKEND_DAYS = (5, 6)
+
+DAY_KINDS = ('holiday', 'half_day')
+
+def to_day(date):
+    return np.datetime64(date, 'D')
+
+class SchoolCalendar:
+    """
+    Numbered school days of a span of dates
+    start, end: inclusive span (datetime64[D])
+    school_days: sorted datetime64[D] array; school day n (1-based) is school_days[n - 1]
+    term_ids, half_days: per school day term id (0 = no term) and half-day flag
+    """
+
+    def __init__(self, start, end, school_days, term_ids=None, half_days=None):
+        self.start = to_day(start)
+        self.end = to_day(end)
+        self.school_days = np.asarray(school_days, dtype='datetime64[D]')
+        self.term_ids = term_ids if term_ids is not None else np.zeros(len(self.school_days), dtype=np.int64)
+        self.half_days = half_days if half_days is not None else np.zeros(len(self.school_days), dtype=bool)
+
+        # before[i] = school days strictly before start + i (one extra slot for end + 1)
+        offsets = (self.school_days - self.start).astype(np.int64)
+        self.before = np.zeros(int((self.end - self.start).astype(np.int64)) + 2, dtype=np.int64)
+        np.add.at(self.before, offsets + 1, 1)
+        np.cumsum(self.before, out=self.before)
+
+    def _offset(self, date):
+        offset = int((to_day(date) - self.start).astype(np.int64))
+        if not 0 <= offset < len(self.before) - 1:
+            raise ValueError(f'{date} is outside the school calendar ({self.start} to {self.end})')
+        return offset
+
+    def covers(self, start, end):
+        return self.start <= to_day(start) and to_day(end) <= self.end
+
+    def is_school_day(self, date):
+        offset = self._offset(date)
+        return bool(self.before[offset + 1] > self.before[offset])
+
+    def is_school_days(self, dates):
+        """Vectorized is_school_day for a datetime64[D] array (dates outside the span are False)"""
+        offsets = (np.asarray(dates, dtype='datetime64[D]') - self.start).astype(np.int64)
+        inside = (offsets >= 0) & (offsets < len(self.before) - 1)
+        result = np.zeros(len(offsets), dtype=bool)
+        result[inside] = self.before[offsets[inside] + 1] > self.before[offsets[inside]]
+        return result
+
+    def working_days_between(self, start, end):
+        """Number of school days in the inclusive range"""
+        return int(self.before[self._offset(end) + 1] - self.before[self._offset(start)])
+
+    def working_days(self, start, end):
+        """School days of the inclusive range as a datetime64[D] array (a view, no copying)"""
+        return self.school_days[self.before[self._offset(start)]:self.before[self._offset(end) + 1]]
+
+    def ordinal(self, date):
+        """1-based number of a school day within the span, or None if date is not a school day"""
+        offset = self._offset(date)
+        return int(self.before[offset + 1]) if self.before[offset + 1] > self.before[offset] else None
+
+    def nth_school_day(self, n, after=None):
+        """The nth school day (1-based) on or after a date (default: start of the span), or None"""
+        first = self.before[self._offset(after)] if after is not None else 0
+        index = first + n - 1
+        if n < 1 or index >= len(self.school_days):
+            return None
+        return str(self.school_days[index])
+
+    def rows(self):
+        """(date, ordinal, term_id, half_day) for every school day, as stored in school_days"""
+        return [
+            (str(day), ordinal, term_id or None, int(half_day))
+            for ordinal, (day, term_id, half_day) in enumerate(
+                zip(self.school_days, self.term_ids.tolist(), self.half_days.tolist()), 1)
+        ]
+
+    @classmethod
+    def from_rules(cls, start, end, terms=(), special_days=(), weekend_days=WEEKEND_DAYS):
+        """
+        Work out the school days of [start, end]
+        terms: (term_id, start_date, end_date) rows; special_days: (date, kind) rows
+        """
+        start, end = to_day(start), to_day(end)
+        days = np.arange(start, end + 1)
+        # 1970-01-01 was a Thursday
+        weekdays = (days.astype(np.int64) + 3) % 7
+        school = ~np.isin(weekdays, weekend_days)
+        term_ids = np.zeros(len(days), dtype=np.int64)
+
+        if terms:
+            in_term = np.zeros(len(days), dtype=bool)
+            for term_id, term_start, term_end in terms:
+                window = (days >= to_day(term_start)) & (days <= to_day(term_end))
+                in_term |= window
+                term_ids[window] = term_id
+            # Vacations only exist between the first and last configured term
+            configured = (days >= min(to_day(t[1]) for t in terms)) & (days <= max(to_day(t[2]) for t in terms))
+            school &= in_term | ~configured
+
+        half_days = np.zeros(len(days), dtype=bool)
+        for date, kind in special_days:
+            offset = int((to_day(date) - start).astype(np.int64))
+            if 0 <= offset < len(days):
+                if kind == 'holiday':
+                    school[offset] = False
+                else:
+                    half_days[offset] = True
+
+        return cls(start, end, days[school], term_ids[school], half_days[school])
+
+def calendar_span(conn, start=None, end=None):
+    """
+    Whole years covering the terms, the recorded attendance, the current and
+    next year, and optionally [start, end]
+    """
+    dates = [datetime.now().strftime('%Y-%m-%d'), f'{datetime.now().year + 1}-12-31']
+    for row in conn.execute(
+        '''SELECT MIN(start_date), MAX(end_date) FROM school_terms
+           UNION ALL SELECT MIN(date), MAX(date) FROM daily_attendance
+           UNION ALL SELECT MIN(date), MAX(date) FROM teacher_attendance'''
+    ):
+        dates.extend(value for value in row if value)
+    dates.extend(date for date in (start, end) if date)
+
+    years = [int(date[:4]) for date in dates]
+    return f'{min(years)}-01-01', f'{max(years)}-12-31'
+
+def build_school_calendar(conn, start, end, weekend_days=WEEKEND_DAYS):
+    """Compute the school days of [start, end] from school_terms and school_holidays"""
+    terms = [tuple(row) for row in conn.execute(
+        'SELECT term_id, start_date, end_date FROM school_terms ORDER BY start_date'
+    )]
+    special_days = [tuple(row) for row in conn.execute(
+        'SELECT date, kind FROM school_holidays WHERE date BETWEEN ? AND ?', (start, end)
+    )]
+    return SchoolCalendar.from_rules(start, end, terms, special_days, weekend_days)
+
+def rebuild_school_days(conn, start=None, end=None, weekend_days=WEEKEND_DAYS):
+    """
+    Recompute the school_days index over calendar_span() (widened to cover [start, end])
+    Returns: the new SchoolCalendar; the caller commits
+    """
+    span_start, span_end = calendar_span(conn, start, end)
+    calendar = build_school_calendar(conn, span_start, span_end, weekend_days)
+
+    conn.execute('DELETE FROM school_days')
+    conn.executemany(
+        'INSERT INTO school_days (date, ordinal, term_id, half_day) VALUES (?, ?, ?, ?)',
+        calendar.rows()
+    )
+    return calendar
+
+def load_school_calendar(conn):
+    """Load the stored school_days index, or None when it is empty"""
+    rows = conn.execute('SELECT date, term_id, half_day FROM school_days ORDER BY date').fetchall()
+    if not rows:
+        return None
+
+    # The index always spans whole years
+    start = f'{rows[0][0][:4]}-01-01'
+    end = f'{rows[-1][0][:4]}-12-31'
+    return SchoolCalendar(
+        start, end,
+        np.array([row[0] for row in rows], dtype='datetime64[D]'),
+        np.array([row[1] or 0 for row in rows], dtype=np.int64),
+        np.array([row[2] for row in rows], dtype=bool)
+    )
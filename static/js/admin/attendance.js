@@ -219,7 +219,7 @@ async function loadClasses() {
     try {
         console.log('📚 Loading classes...');
         
-        const response = await fetch('/api/classes');
+        const response = await conditionalFetch('/api/classes');
         const data = await response.json();
         
         console.log('✅ Classes loaded:', data);
@@ -253,27 +253,38 @@ async function loadClasses() {
 }
 
 // ==================== LOAD ATTENDANCE DATA ====================
+// Students are fetched a page at a time; the table and counters fill in as pages arrive
+const STUDENT_PAGE_SIZE = 200;
+const ATTENDANCE_FIELDS = 'id,roll_no,name,class,section,attendance_status';
+
 async function loadAttendanceData() {
     try {
-        const response = await fetch('/api/students');
-        const data = await response.json();
-        
-        // Store all students
-        allStudents = data.students;
-        filteredStudents = [...allStudents];
+        allStudents = [];
+        let cursor = null;
         
-        const present = allStudents.filter(s => s.attendance_status === 'present').length;
-        const absent = allStudents.filter(s => s.attendance_status === 'absent').length;
-        const total = allStudents.length;
-        const rate = total > 0 ? ((present / total) * 100).toFixed(1) : 0;
-        
-        document.getElementById('presentCount').textContent = present;
-        document.getElementById('absentCount').textContent = absent;
-        document.getElementById('attendanceRate').textContent = rate + '%';
-        document.getElementById('showingCount').textContent = total;
-        
-        renderAttendanceTable(filteredStudents);
-        hideLoadingOverlay();
+        do {
+            const params = new URLSearchParams({ fields: ATTENDANCE_FIELDS, limit: STUDENT_PAGE_SIZE });
+            if (cursor) params.set('cursor', cursor);
+            
+            const response = await fetch(`/api/students?${params}`);
+            const data = await response.json();
+            
+            // Store all students loaded so far
+            const firstPage = allStudents.length === 0;
+            allStudents = allStudents.concat(data.students);
+            filteredStudents = [...allStudents];
+            updateAttendanceSummary();
+            
+            if (firstPage) {
+                renderAttendanceTable(filteredStudents);
+                hideLoadingOverlay();
+            } else {
+                const tbody = document.getElementById('attendanceTableBody');
+                data.students.forEach(student => tbody.appendChild(createAttendanceRow(student)));
+            }
+            
+            cursor = data.next_cursor;
+        } while (cursor);
         
     } catch (error) {
         console.error('Error loading attendance:', error);
@@ -281,6 +292,18 @@ async function loadAttendanceData() {
     }
 }
 
+function updateAttendanceSummary() {
+    const present = allStudents.filter(s => s.attendance_status === 'present').length;
+    const absent = allStudents.filter(s => s.attendance_status === 'absent').length;
+    const total = allStudents.length;
+    const rate = total > 0 ? ((present / total) * 100).toFixed(1) : 0;
+    
+    document.getElementById('presentCount').textContent = present;
+    document.getElementById('absentCount').textContent = absent;
+    document.getElementById('attendanceRate').textContent = rate + '%';
+    document.getElementById('showingCount').textContent = total;
+}
+
 // ==================== LOAD ATTENDANCE TREND CHART ====================
 async function loadAttendanceTrendChart(classFilter = 'all', monthFilter = 'current', yearFilter = 'current') {
     try {
@@ -474,22 +497,26 @@ function renderAttendanceTable(students) {
     }
     
     students.forEach(student => {
-        const row = document.createElement('tr');
-        const statusClass = student.attendance_status === 'present' ? 'badge-success' : 'badge-danger';
-        const statusText = student.attendance_status.charAt(0).toUpperCase() + student.attendance_status.slice(1);
-        
-        row.innerHTML = `
-            <td>${student.roll_no}</td>
-            <td>${student.name}</td>
-            <td>${student.class}</td>
-            <td><span class="badge ${statusClass}">${statusText}</span></td>
-            <td>${new Date().toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' })}</td>
-        `;
-        
-        tbody.appendChild(row);
+        tbody.appendChild(createAttendanceRow(student));
     });
 }
 
+function createAttendanceRow(student) {
+    const row = document.createElement('tr');
+    const statusClass = student.attendance_status === 'present' ? 'badge-success' : 'badge-danger';
+    const statusText = student.attendance_status.charAt(0).toUpperCase() + student.attendance_status.slice(1);
+    
+    row.innerHTML = `
+        <td>${student.roll_no}</td>
+        <td>${student.name}</td>
+        <td>${student.class}</td>
+        <td><span class="badge ${statusClass}">${statusText}</span></td>
+        <td>${new Date().toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' })}</td>
+    `;
+    
+    return row;
+}
+
 // ==================== APPLY ALL TABLE FILTERS ====================
 function applyAllTableFilters() {
     let results = [...filteredStudents];
@@ -720,7 +747,7 @@ function initializeReportSection() {
 // ==================== LOAD CLASSES FOR REPORT ====================
 async function loadReportClasses() {
     try {
-        const response = await fetch('/api/classes');
+        const response = await conditionalFetch('/api/classes');
         const data = await response.json();
         
         const reportClassFilter = document.getElementById('reportClassFilter');
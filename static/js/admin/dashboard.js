@@ -14,13 +14,17 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize all components
     initializeDate();
     initializeSidebar();
-    loadDashboardStats();
-    loadAttendanceChart();
-    loadPerformanceChart();
-    loadSmartAlerts();
+    
+    // Live updates: the stream delivers the initial data and every change after it
+    openDashboardStream('dashboard', {
+        'stats': loadDashboardStats,
+        'attendance-data': loadAttendanceChart,
+        'performance-data': loadPerformanceChart,
+        'alerts': loadSmartAlerts
+    }, refreshDashboard, 30000);
     
     // Setup refresh button
-    document.getElementById('refreshAlerts').addEventListener('click', loadSmartAlerts);
+    document.getElementById('refreshAlerts').addEventListener('click', () => loadSmartAlerts());
 });
 
 // ==================== DATE DISPLAY ====================
@@ -51,12 +55,14 @@ function initializeSidebar() {
 }
 
 // ==================== LOAD DASHBOARD STATISTICS ====================
-async function loadDashboardStats() {
+async function loadDashboardStats(data = null) {
     try {
         console.log('📊 Loading dashboard statistics...');
         
-        const response = await fetch('/api/stats');
-        const data = await response.json();
+        if (!data) {
+            const response = await fetch('/api/stats');
+            data = await response.json();
+        }
         
         console.log('✅ Stats loaded:', data);
         
@@ -187,12 +193,14 @@ function updateFeesChange(elementId, status, count) {
 }
 
 // ==================== LOAD ATTENDANCE CHART ====================
-async function loadAttendanceChart() {
+async function loadAttendanceChart(data = null) {
     try {
         console.log('📈 Loading attendance chart...');
         
-        const response = await fetch('/api/attendance-data');
-        const data = await response.json();
+        if (!data) {
+            const response = await fetch('/api/attendance-data');
+            data = await response.json();
+        }
         
         console.log('✅ Attendance data loaded:', data);
         
@@ -298,12 +306,14 @@ async function loadAttendanceChart() {
 }
 
 // ==================== LOAD PERFORMANCE CHART ====================
-async function loadPerformanceChart() {
+async function loadPerformanceChart(data = null) {
     try {
         console.log('📊 Loading performance chart...');
         
-        const response = await fetch('/api/performance-data');
-        const data = await response.json();
+        if (!data) {
+            const response = await fetch('/api/performance-data');
+            data = await response.json();
+        }
         
         console.log('✅ Performance data loaded:', data);
         
@@ -421,7 +431,7 @@ async function loadPerformanceChart() {
 }
 
 // ==================== LOAD SMART ALERTS ====================
-async function loadSmartAlerts() {
+async function loadSmartAlerts(data = null) {
     try {
         console.log('🔔 Loading smart alerts...');
         
@@ -436,8 +446,10 @@ async function loadSmartAlerts() {
             </div>
         `;
         
-        const response = await fetch('/api/alerts');
-        const data = await response.json();
+        if (!data) {
+            const response = await fetch('/api/alerts');
+            data = await response.json();
+        }
         
         console.log('✅ Alerts loaded:', data);
         
@@ -552,13 +564,13 @@ style.textContent = `
 `;
 document.head.appendChild(style);
 
-// ==================== AUTO REFRESH (Every 30 seconds) ====================
-setInterval(() => {
+// ==================== POLLING FALLBACK (only while the stream is down) ====================
+function refreshDashboard() {
     console.log('🔄 Auto-refreshing dashboard data...');
     loadDashboardStats();
     loadAttendanceChart();
     loadPerformanceChart();
     loadSmartAlerts();
-}, 30000);
+}
 
 console.log('✅ Dashboard JavaScript loaded successfully!');
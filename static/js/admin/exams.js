@@ -79,7 +79,7 @@ function setupEventListeners() {
 
 async function loadExamsData() {
     try {
-        const response = await fetch('/api/exams');
+        const response = await conditionalFetch('/api/exams');
         if (!response.ok) {
             throw new Error('Failed to fetch exams');
         }
@@ -221,7 +221,7 @@ function closeDetailsModalFunc() {
 // API Functions
 async function editExam(examId) {
     try {
-        const response = await fetch('/api/exams');
+        const response = await conditionalFetch('/api/exams');
         const result = await response.json();
         const exam = result.exams.find(e => e.id === examId);
         
@@ -238,7 +238,7 @@ async function editExam(examId) {
 
 async function viewExamDetails(examId) {
     try {
-        const response = await fetch('/api/exams');
+        const response = await conditionalFetch('/api/exams');
         const result = await response.json();
         const exam = result.exams.find(e => e.id === examId);
         
@@ -362,7 +362,7 @@ async function handleExamSubmit(e) {
 
 async function exportExamsToCSV() {
     try {
-        const response = await fetch('/api/exams');
+        const response = await conditionalFetch('/api/exams');
         const result = await response.json();
         const exams = result.exams || [];
         
@@ -72,6 +72,14 @@ function setupEventListeners() {
         filterByClass(selectedClass);
     });
     
+    // Export button (the server streams the file)
+    const exportBtn = document.getElementById('exportFeesBtn');
+    exportBtn.addEventListener('click', function() {
+        const params = new URLSearchParams({ format: 'xlsx' });
+        if (classFilter.value !== 'all') params.set('class', classFilter.value);
+        window.location.href = `/api/export/fees?${params}`;
+    });
+    
     // Refresh button
     const refreshBtn = document.getElementById('refreshData');
     refreshBtn.addEventListener('click', function() {
@@ -89,7 +97,7 @@ async function loadClasses() {
     try {
         console.log('📚 Loading classes...');
         
-        const response = await fetch('/api/classes');
+        const response = await conditionalFetch('/api/classes');
         const data = await response.json();
         
         console.log('✅ Classes loaded:', data);
@@ -117,7 +125,7 @@ async function loadClasses() {
 // ==================== LOAD FEES DATA ====================
 async function loadFeesData() {
     try {
-        const response = await fetch('/api/fees');
+        const response = await conditionalFetch('/api/fees');
         const data = await response.json();
         
         if (!data.success) {
@@ -135,15 +143,7 @@ async function loadFeesData() {
         
         filteredFees = [...allFees];
         
-        // Calculate statistics
-        const totalCollected = allFees.reduce((sum, fee) => sum + fee.paid_amount, 0);
-        const pendingAmount = allFees.reduce((sum, fee) => sum + fee.pending_amount, 0);
-        const overdueCount = allFees.filter(fee => fee.status === 'overdue' || 
-            (fee.status === 'pending' && new Date(fee.due_date) < new Date())).length;
-        
-        document.getElementById('totalCollected').textContent = '$' + totalCollected.toLocaleString();
-        document.getElementById('pendingAmount').textContent = '$' + pendingAmount.toLocaleString();
-        document.getElementById('overdueCount').textContent = overdueCount;
+        await loadFeesSummary();
         document.getElementById('showingCount').textContent = allFees.length;
         
         renderFeesTable(filteredFees);
@@ -155,6 +155,21 @@ async function loadFeesData() {
     }
 }
 
+// ==================== LOAD FEES SUMMARY ====================
+async function loadFeesSummary() {
+    // Totals come from the maintained balance summary instead of summing every fee here
+    const response = await conditionalFetch('/api/fees/summary');
+    const data = await response.json();
+    
+    if (!data.success) {
+        throw new Error('Failed to load fees summary');
+    }
+    
+    document.getElementById('totalCollected').textContent = '$' + data.totals.paid_amount.toLocaleString();
+    document.getElementById('pendingAmount').textContent = '$' + data.totals.pending_amount.toLocaleString();
+    document.getElementById('overdueCount').textContent = data.totals.overdue_fees;
+}
+
 // ==================== RENDER FEES TABLE ====================
 function renderFeesTable(fees) {
     const tbody = document.getElementById('feesTableBody');
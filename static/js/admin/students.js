@@ -8,6 +8,13 @@ let allStudents = [];
 let filteredStudents = [];
 let currentView = 'all'; // 'all' or 'absent'
 
+// Incremental loading: students arrive a page at a time from /api/students
+const PAGE_SIZE = 100;
+const STUDENT_FIELDS = 'id,roll_no,name,class,section,email,attendance_status';
+let nextCursor = null;
+let isLoadingPage = false;
+let loadGeneration = 0;
+
 // ==================== INITIALIZATION ====================
 document.addEventListener('DOMContentLoaded', function() {
     console.log('🎓 Students Page Initialized');
@@ -124,6 +131,21 @@ function setupEventListeners() {
     if (addStudentForm) {
         addStudentForm.addEventListener('submit', handleAddStudent);
     }
+    
+    // Load more button, plus automatic loading when it scrolls into view
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+    if (loadMoreBtn) {
+        loadMoreBtn.addEventListener('click', loadMoreStudents);
+        
+        if ('IntersectionObserver' in window) {
+            const observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    loadMoreStudents();
+                }
+            });
+            observer.observe(loadMoreBtn);
+        }
+    }
 }
 
 // ==================== LOAD CLASSES FOR FILTER ====================
@@ -131,7 +153,7 @@ async function loadClasses() {
     try {
         console.log('📚 Loading classes...');
         
-        const response = await fetch('/api/classes');
+        const response = await conditionalFetch('/api/classes');
         const data = await response.json();
         
         console.log('✅ Classes loaded:', data);
@@ -157,24 +179,50 @@ async function loadClasses() {
 }
 
 // ==================== LOAD ALL STUDENTS ====================
+function buildStudentFilterParams() {
+    const params = new URLSearchParams();
+    const query = document.getElementById('searchInput').value.trim();
+    const selectedClass = document.getElementById('classFilter').value;
+    
+    if (query) params.set('search', query);
+    if (selectedClass && selectedClass !== 'all') params.set('class', selectedClass);
+    
+    return params;
+}
+
 async function loadStudents() {
     try {
-        console.log('👥 Loading all students...');
+        console.log('👥 Loading first page of students...');
+        
+        // Ignore pages still in flight from an older filter
+        const generation = ++loadGeneration;
+        const params = buildStudentFilterParams();
         
-        const response = await fetch('/api/students');
+        // Totals are counted separately so pages stay small
+        loadStudentTotal(params, generation);
+        
+        params.set('fields', STUDENT_FIELDS);
+        params.set('limit', PAGE_SIZE);
+        
+        isLoadingPage = true;
+        const response = await fetch(`/api/students?${params}`);
         const data = await response.json();
+        isLoadingPage = false;
+        
+        if (generation !== loadGeneration) return;
         
         console.log('✅ Students loaded:', data);
         
         // Store students data
         allStudents = data.students;
         filteredStudents = [...allStudents];
+        nextCursor = data.next_cursor;
         
         // Update view
         currentView = 'all';
         updateTableTitle('All Students');
         renderStudentsTable(filteredStudents);
-        updateTotalCount(filteredStudents.length);
+        updateLoadMore();
         
         // Reset toggle button
         const toggleBtn = document.getElementById('toggleView');
@@ -186,11 +234,67 @@ async function loadStudents() {
         toggleBtn.setAttribute('data-mode', 'all');
         
     } catch (error) {
+        isLoadingPage = false;
         console.error('❌ Error loading students:', error);
         showError('Failed to load students. Please try again.');
     }
 }
 
+// ==================== LOAD NEXT PAGE ====================
+async function loadMoreStudents() {
+    if (currentView !== 'all' || !nextCursor || isLoadingPage) return;
+    
+    const generation = loadGeneration;
+    const params = buildStudentFilterParams();
+    params.set('fields', STUDENT_FIELDS);
+    params.set('limit', PAGE_SIZE);
+    params.set('cursor', nextCursor);
+    
+    try {
+        isLoadingPage = true;
+        const response = await fetch(`/api/students?${params}`);
+        const data = await response.json();
+        isLoadingPage = false;
+        
+        if (generation !== loadGeneration) return;
+        
+        // Append only the new rows instead of re-rendering the table
+        const tableBody = document.getElementById('studentsTableBody');
+        data.students.forEach(student => {
+            tableBody.appendChild(createStudentRow(student, 0));
+        });
+        
+        allStudents = allStudents.concat(data.students);
+        filteredStudents = allStudents;
+        nextCursor = data.next_cursor;
+        updateLoadMore();
+        
+    } catch (error) {
+        isLoadingPage = false;
+        console.error('❌ Error loading more students:', error);
+    }
+}
+
+async function loadStudentTotal(params, generation) {
+    try {
+        const response = await fetch(`/api/students/count?${params}&status=active`);
+        const data = await response.json();
+        
+        if (generation === loadGeneration && currentView === 'all') {
+            updateTotalCount(data.total);
+        }
+    } catch (error) {
+        console.error('❌ Error counting students:', error);
+    }
+}
+
+function updateLoadMore() {
+    const loadMore = document.getElementById('loadMore');
+    if (loadMore) {
+        loadMore.style.display = currentView === 'all' && nextCursor ? 'flex' : 'none';
+    }
+}
+
 // ==================== LOAD ABSENT STUDENTS ====================
 async function loadAbsentStudents() {
     try {
@@ -207,9 +311,12 @@ async function loadAbsentStudents() {
         
         // Update view
         currentView = 'absent';
+        loadGeneration++;
+        nextCursor = null;
         updateTableTitle(`Today's Absent Students (${data.date})`);
         renderStudentsTable(filteredStudents);
         updateTotalCount(filteredStudents.length);
+        updateLoadMore();
         
         // Update toggle button
         const toggleBtn = document.getElementById('toggleView');
@@ -231,6 +338,11 @@ function toggleView() {
     const toggleBtn = document.getElementById('toggleView');
     const mode = toggleBtn.getAttribute('data-mode');
     
+    // Reset filters (before loading, since the all view filters on the server)
+    document.getElementById('searchInput').value = '';
+    document.getElementById('clearSearch').style.display = 'none';
+    document.getElementById('classFilter').value = 'all';
+    
     if (mode === 'all') {
         // Switch to absent view
         loadAbsentStudents();
@@ -238,11 +350,6 @@ function toggleView() {
         // Switch to all view
         loadStudents();
     }
-    
-    // Reset filters
-    document.getElementById('searchInput').value = '';
-    document.getElementById('clearSearch').style.display = 'none';
-    document.getElementById('classFilter').value = 'all';
 }
 
 // ==================== RENDER STUDENTS TABLE ====================
@@ -321,63 +428,44 @@ function createStudentRow(student, index) {
 }
 
 // ==================== PERFORM SEARCH ====================
+let searchTimeout;
+
 function performSearch(query) {
-    if (!query) {
-        // No search query - show all current students
-        filteredStudents = [...allStudents];
-    } else {
-        // Filter by name or roll number
-        const lowerQuery = query.toLowerCase();
-        filteredStudents = allStudents.filter(student => {
-            return student.name.toLowerCase().includes(lowerQuery) ||
-                   student.roll_no.toLowerCase().includes(lowerQuery);
-        });
-    }
-    
-    // Apply class filter if set
-    const classFilter = document.getElementById('classFilter');
-    const selectedClass = classFilter.value;
-    
-    if (selectedClass !== 'all') {
-        filteredStudents = filteredStudents.filter(student => 
-            student.class === selectedClass
-        );
+    // All students are filtered on the server; debounce keystrokes
+    if (currentView === 'all') {
+        clearTimeout(searchTimeout);
+        searchTimeout = setTimeout(loadStudents, 300);
+        return;
     }
     
-    // Render results with fade animation
-    const tableWrapper = document.querySelector('.table-wrapper');
-    tableWrapper.style.opacity = '0';
-    
-    setTimeout(() => {
-        renderStudentsTable(filteredStudents);
-        updateTotalCount(filteredStudents.length);
-        tableWrapper.style.opacity = '1';
-    }, 150);
+    applyAbsentFilters();
 }
 
 // ==================== FILTER BY CLASS ====================
 function filterByClass(selectedClass) {
-    if (selectedClass === 'all') {
-        filteredStudents = [...allStudents];
-    } else {
-        filteredStudents = allStudents.filter(student => 
-            student.class === selectedClass
-        );
+    if (currentView === 'all') {
+        loadStudents();
+        return;
     }
     
-    // Also apply search if active
-    const searchInput = document.getElementById('searchInput');
-    const query = searchInput.value.trim();
-    
-    if (query) {
-        const lowerQuery = query.toLowerCase();
-        filteredStudents = filteredStudents.filter(student => {
-            return student.name.toLowerCase().includes(lowerQuery) ||
-                   student.roll_no.toLowerCase().includes(lowerQuery);
-        });
-    }
+    applyAbsentFilters();
+}
+
+// ==================== FILTER ABSENT LIST ====================
+function applyAbsentFilters() {
+    // Today's absent list is loaded in full, so it is filtered in the browser
+    const query = document.getElementById('searchInput').value.trim().toLowerCase();
+    const selectedClass = document.getElementById('classFilter').value;
+    
+    filteredStudents = allStudents.filter(student => {
+        const matchesSearch = !query ||
+            student.name.toLowerCase().includes(query) ||
+            student.roll_no.toLowerCase().includes(query);
+        const matchesClass = selectedClass === 'all' || student.class === selectedClass;
+        return matchesSearch && matchesClass;
+    });
     
-    // Render with animation
+    // Render results with fade animation
     const tableWrapper = document.querySelector('.table-wrapper');
     tableWrapper.style.opacity = '0';
     
@@ -539,12 +627,9 @@ async function handleAddStudent(e) {
             // Close modal
             closeAddStudentModal();
             
-            // Reload students list to reflect the new addition
+            // Reload students list (and its total) to reflect the new addition
             await loadStudents();
             
-            // Update the student count badge
-            updateStudentCount();
-            
         } else {
             // Show error message
             alert(`❌ Error: ${result.error}\n\nPlease check your input and try again.`);
@@ -562,14 +647,6 @@ async function handleAddStudent(e) {
     }
 }
 
-// ==================== UPDATE STUDENT COUNT ====================
-function updateStudentCount() {
-    const countBadge = document.getElementById('showingCount');
-    if (countBadge && allStudents.length > 0) {
-        countBadge.textContent = allStudents.length;
-    }
-}
-
 // ==================== SMOOTH TRANSITIONS ====================
 const style = document.createElement('style');
 style.textContent = `
@@ -113,7 +113,7 @@ async function loadDepartments() {
     try {
         console.log('🏢 Loading departments...');
         
-        const response = await fetch('/api/departments');
+        const response = await conditionalFetch('/api/departments');
         const data = await response.json();
         
         console.log('✅ Departments loaded:', data);
@@ -143,7 +143,7 @@ async function loadTeachers(shouldRenderTable = false) {
     try {
         console.log('👨‍🏫 Loading all teachers...');
         
-        const response = await fetch('/api/teachers');
+        const response = await conditionalFetch('/api/teachers');
         const data = await response.json();
         
         console.log('✅ Teachers loaded:', data);
@@ -647,7 +647,7 @@ function setupAttendanceListeners() {
 }
 
 function loadTeacherDepartmentsForFilter() {
-    fetch('/api/departments')
+    conditionalFetch('/api/departments')
         .then(response => response.json())
         .then(data => {
             const select = document.getElementById('teacherDepartmentFilter');
@@ -717,7 +717,7 @@ async function loadTeacherAttendance() {
         
         // Fetch teachers and attendance for selected date in parallel
         const [teachersResponse, attendanceResponse] = await Promise.all([
-            fetch('/api/teachers'),
+            conditionalFetch('/api/teachers'),
             fetch(`/api/teacher-attendance?date=${selectedDate}`)
         ]);
         
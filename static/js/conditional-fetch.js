@@ -0,0 +1,56 @@
+/* ============================================
+   CONDITIONAL FETCH
+   Revalidates read-only JSON APIs with ETags so
+   unchanged payloads come back as empty 304s
+   ============================================ */
+
+const CONDITIONAL_FETCH_PREFIX = 'etag:';
+
+function readConditionalEntry(url) {
+    try {
+        const stored = sessionStorage.getItem(CONDITIONAL_FETCH_PREFIX + url);
+        return stored ? JSON.parse(stored) : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function writeConditionalEntry(url, entry) {
+    try {
+        sessionStorage.setItem(CONDITIONAL_FETCH_PREFIX + url, JSON.stringify(entry));
+    } catch (error) {
+        // Storage full or unavailable: the next request simply downloads again
+        console.warn('⚠️ Could not store ETag response for', url);
+    }
+}
+
+// Drop-in replacement for fetch() on GET endpoints that send ETags
+async function conditionalFetch(url, options = {}) {
+    const method = (options.method || 'GET').toUpperCase();
+    if (method !== 'GET') {
+        return fetch(url, options);
+    }
+    
+    const cached = readConditionalEntry(url);
+    const headers = new Headers(options.headers || {});
+    if (cached) {
+        headers.set('If-None-Match', cached.etag);
+    }
+    
+    // Bypass the browser cache so a 304 reaches this code instead of being resolved for us
+    const response = await fetch(url, { ...options, headers, cache: 'no-store' });
+    
+    if (response.status === 304 && cached) {
+        return new Response(cached.body, {
+            status: 200,
+            headers: { 'Content-Type': 'application/json', 'ETag': cached.etag }
+        });
+    }
+    
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        writeConditionalEntry(url, { etag, body: await response.clone().text() });
+    }
+    
+    return response;
+}
@@ -0,0 +1,52 @@
+/* ============================================
+   DASHBOARD STREAM - Server-Sent Events client
+   Live dashboard updates pushed by the server,
+   with polling only while the stream is down
+   ============================================ */
+
+// handlers: { eventName: function(data) } called with the merged payload of each event
+// poll: reloads everything over plain fetches while the stream is unavailable
+function openDashboardStream(stream, handlers, poll, pollInterval) {
+    let pollTimer = null;
+
+    function startPolling() {
+        if (!pollTimer) {
+            console.log('🔄 Dashboard stream unavailable, polling instead');
+            poll();
+            pollTimer = setInterval(poll, pollInterval);
+        }
+    }
+
+    function stopPolling() {
+        if (pollTimer) {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+    }
+
+    if (!window.EventSource) {
+        startPolling();
+        return null;
+    }
+
+    // The server sends each event in full on connect, then only the keys that changed
+    const state = {};
+    const source = new EventSource(`/api/stream/${stream}`);
+
+    Object.entries(handlers).forEach(([event, handler]) => {
+        source.addEventListener(event, (message) => {
+            state[event] = Object.assign(state[event] || {}, JSON.parse(message.data));
+            handler(state[event]);
+        });
+    });
+
+    source.addEventListener('open', () => {
+        console.log('📡 Dashboard stream connected');
+        stopPolling();
+    });
+
+    // EventSource reconnects by itself; poll in the meantime so the page stays fresh
+    source.addEventListener('error', startPolling);
+
+    return source;
+}
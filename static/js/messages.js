@@ -168,8 +168,14 @@ function loadClassesAndStudents() {
     }
 }
 
-// Load all students with search and filter
-function loadAllStudents() {
+// Load all students with search and filter, a page at a time
+// (a search uses ranked typeahead results instead, limited to the best matches)
+const STUDENT_PAGE_SIZE = 200;
+const STUDENT_TYPEAHEAD_LIMIT = 20;
+const RECIPIENT_FIELDS = 'student_id,roll_no,name,class,section,email,parent_email';
+let studentLoadGeneration = 0;
+
+async function loadAllStudents() {
     const searchInput = document.getElementById('studentSearchInput');
     const classFilter = document.getElementById('studentClassFilter');
     const studentSelect = document.getElementById('messageStudent');
@@ -183,62 +189,80 @@ function loadAllStudents() {
     const classValue = classFilter ? classFilter.value : '';
     
     // Build query parameters
-    let url = '/api/teacher/students/all?';
+    const params = new URLSearchParams({ fields: RECIPIENT_FIELDS, limit: STUDENT_PAGE_SIZE });
     if (searchValue) {
-        url += `search=${encodeURIComponent(searchValue)}&`;
+        params.set('search', searchValue);
+        params.set('mode', 'typeahead');
+        params.set('limit', STUDENT_TYPEAHEAD_LIMIT);
     }
     if (classValue) {
         // Parse class and section from format "Class 10|A"
         const parts = classValue.split('|');
         if (parts.length === 2) {
-            url += `class=${encodeURIComponent(parts[0])}&`;
-            url += `section=${encodeURIComponent(parts[1])}&`;
+            params.set('class', parts[0]);
+            params.set('section', parts[1]);
         }
     }
     
-    console.log('Loading students from:', url);
+    // A newer search replaces this one; stop appending its pages
+    const generation = ++studentLoadGeneration;
+    console.log('Loading students with:', params.toString());
+    
+    // Clear existing options
+    studentSelect.innerHTML = '';
+    const countInfo = document.createElement('option');
+    countInfo.disabled = true;
+    countInfo.textContent = '─── Loading students... ───';
+    studentSelect.appendChild(countInfo);
+    
+    let loaded = 0;
+    let cursor = null;
     
-    fetch(url)
-        .then(response => {
+    try {
+        do {
+            if (cursor) params.set('cursor', cursor);
+            
+            const response = await fetch(`/api/teacher/students/all?${params}`);
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-            return response.json();
-        })
-        .then(data => {
-            console.log('Students loaded:', data.total);
+            const data = await response.json();
             
-            // Clear existing options
-            studentSelect.innerHTML = '';
+            if (generation !== studentLoadGeneration) return;
             
-            if (data.success && data.students && data.students.length > 0) {
-                data.students.forEach(student => {
-                    const option = document.createElement('option');
-                    option.value = student.student_id;
-                    // Store both student and parent email as data attributes
-                    option.setAttribute('data-student-email', student.email || '');
-                    option.setAttribute('data-parent-email', student.parent_email || '');
-                    option.setAttribute('data-student-name', student.name || '');
-                    option.textContent = `${student.name} - ${student.class} ${student.section} (${student.roll_no || student.student_id})`;
-                    studentSelect.appendChild(option);
-                });
-                
-                // Show count
-                const countInfo = document.createElement('option');
-                countInfo.disabled = true;
-                countInfo.textContent = `─── ${data.students.length} student(s) found ───`;
-                studentSelect.insertBefore(countInfo, studentSelect.firstChild);
-            } else {
+            (data.students || []).forEach(student => {
                 const option = document.createElement('option');
-                option.value = '';
-                option.textContent = 'No students found';
+                option.value = student.student_id;
+                // Store both student and parent email as data attributes
+                option.setAttribute('data-student-email', student.email || '');
+                option.setAttribute('data-parent-email', student.parent_email || '');
+                option.setAttribute('data-student-name', student.name || '');
+                option.textContent = `${student.name} - ${student.class} ${student.section} (${student.roll_no || student.student_id})`;
                 studentSelect.appendChild(option);
-            }
-        })
-        .catch(error => {
-            console.error('Error loading students:', error);
-            studentSelect.innerHTML = '<option value="">Error loading students. Check console.</option>';
-        });
+            });
+            
+            loaded += (data.students || []).length;
+            cursor = data.next_cursor;
+            
+            // Show count
+            countInfo.textContent = cursor
+                ? `─── ${loaded} student(s) loaded, loading more... ───`
+                : `─── ${loaded} student(s) found ───`;
+        } while (cursor);
+        
+        console.log('Students loaded:', loaded);
+        
+        if (loaded === 0) {
+            studentSelect.innerHTML = '';
+            const option = document.createElement('option');
+            option.value = '';
+            option.textContent = 'No students found';
+            studentSelect.appendChild(option);
+        }
+    } catch (error) {
+        console.error('Error loading students:', error);
+        studentSelect.innerHTML = '<option value="">Error loading students. Check console.</option>';
+    }
 }
 
 // Load inbox messages
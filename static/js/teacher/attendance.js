@@ -79,7 +79,7 @@ async function loadClassOptions() {
         if (data.success && data.classes) {
             const selects = [
                 'classSelect', 'dailyClassSelect', 
-                'monthlyClassSelect', 'alertClassSelect'
+                'monthlyClassSelect', 'alertClassSelect', 'logClassSelect'
             ];
             
             selects.forEach(selectId => {
@@ -360,7 +360,7 @@ function displayDailyDetails(details, date) {
     detailsDiv.innerHTML = `
         <h3>
             Detailed Attendance - ${date}
-            <button class="export-btn" onclick="exportToCSV()">
+            <button class="export-btn" onclick="exportMonthlyReport('csv')">
                 <i class="fas fa-download"></i> Export CSV
             </button>
         </h3>
@@ -427,7 +427,7 @@ async function generateMonthlyReport() {
         hideLoading();
         
         if (data.success) {
-            displayMonthlyOverview(data.overall_percentage);
+            displayMonthlyOverview(data.overall_percentage, data.working_days);
             displayMonthlyDetails(data.students, month);
         }
     } catch (error) {
@@ -436,7 +436,7 @@ async function generateMonthlyReport() {
     }
 }
 
-function displayMonthlyOverview(percentage) {
+function displayMonthlyOverview(percentage, workingDays) {
     const overviewDiv = document.getElementById('monthlyOverview');
     overviewDiv.innerHTML = `
         <h3>Overall Class Attendance</h3>
@@ -444,6 +444,7 @@ function displayMonthlyOverview(percentage) {
         <div class="progress-bar">
             <div class="progress-fill" style="width: ${percentage}%"></div>
         </div>
+        <p style="color: #718096; margin-top: 10px;">${workingDays} school days so far this month</p>
     `;
 }
 
@@ -458,7 +459,7 @@ function displayMonthlyDetails(students, month) {
     detailsDiv.innerHTML = `
         <h3>
             Student Attendance Details - ${month}
-            <button class="export-btn" onclick="exportToCSV()">
+            <button class="export-btn" onclick="exportMonthlyReport('csv')">
                 <i class="fas fa-download"></i> Export CSV
             </button>
         </h3>
@@ -527,6 +528,8 @@ async function findLowAttendance() {
         hideLoading();
         
         if (data.success) {
+            // The notify-all request re-runs this query on the server
+            window.lowAttendanceQuery = { month, threshold, className, section };
             displayLowAttendance(data.students, threshold);
         }
     } catch (error) {
@@ -626,16 +629,21 @@ async function informParent(studentId) {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
+                month: window.lowAttendanceQuery?.month,
                 students: [student]
             })
         });
         
         const data = await response.json();
         
-        if (data.success && data.emails_sent > 0) {
-            btn.innerHTML = '<i class="fas fa-check"></i> Sent';
+        if (data.success && data.emails_queued > 0) {
+            btn.innerHTML = '<i class="fas fa-check"></i> Queued';
             btn.style.background = '#48bb78';
-            showToast('success', `Low attendance alert sent to parent of ${student.name}`);
+            showToast('success', `Low attendance alert queued for parent of ${student.name}`);
+        } else if (data.success && data.results?.[0]?.status === 'duplicate') {
+            btn.innerHTML = '<i class="fas fa-check"></i> Notified';
+            btn.style.background = '#48bb78';
+            showToast('success', data.results[0].message);
         } else {
             btn.disabled = false;
             btn.innerHTML = originalContent;
@@ -671,8 +679,12 @@ async function informAllParents() {
             headers: {
                 'Content-Type': 'application/json'
             },
+            // Notify everyone below the threshold in one server-side pass
             body: JSON.stringify({
-                students: window.lowAttendanceStudents
+                month: window.lowAttendanceQuery.month,
+                all_below: window.lowAttendanceQuery.threshold,
+                class: window.lowAttendanceQuery.className,
+                section: window.lowAttendanceQuery.section
             })
         });
         
@@ -683,12 +695,12 @@ async function informAllParents() {
         if (data.success) {
             showToast('success', data.message);
             
-            // Update button states for successfully sent emails
+            // Update button states for queued (or previously sent) emails
             data.results?.forEach(result => {
-                if (result.status === 'sent') {
+                if (result.status === 'queued' || result.status === 'duplicate') {
                     const btn = document.getElementById(`btn-${result.student_id}`);
                     if (btn) {
-                        btn.innerHTML = '<i class="fas fa-check"></i> Sent';
+                        btn.innerHTML = `<i class="fas fa-check"></i> ${result.status === 'queued' ? 'Queued' : 'Notified'}`;
                         btn.style.background = '#48bb78';
                         btn.disabled = true;
                     }
@@ -735,40 +747,92 @@ function informParent_old(studentId) {
 // TAB 5: ALERT LOGS
 // ============================================
 
+let alertLogsCursor = null;
+let alertLogsShown = 0;
+
+// Build the alert log query string from the filters
+function alertLogsQuery(cursor = null) {
+    const params = new URLSearchParams();
+    const filters = {
+        alert_type: document.getElementById('logTypeSelect').value,
+        status: document.getElementById('logStatusSelect').value,
+        class: document.getElementById('logClassSelect').value,
+        from: document.getElementById('logFromDate').value,
+        to: document.getElementById('logToDate').value
+    };
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value) params.set(key, value);
+    });
+    if (cursor) params.set('cursor', cursor);
+    return params.toString();
+}
+
+// Load the first page of alert logs for the current filters
 async function loadAlertLogs() {
     try {
-        const response = await fetch('/api/teacher/alert-logs');
+        const response = await fetch(`/api/teacher/alert-logs?${alertLogsQuery()}`);
+        const data = await response.json();
+        
+        if (data.success && data.logs) {
+            alertLogsShown = 0;
+            displayAlertLogs(data.logs, data.next_cursor);
+        } else {
+            alert('Error: ' + (data.error || 'Could not load alert logs'));
+        }
+    } catch (error) {
+        console.error('Error loading alert logs:', error);
+    }
+}
+
+// Append the next page of alert logs
+async function loadMoreAlertLogs() {
+    if (!alertLogsCursor) return;
+    
+    try {
+        const response = await fetch(`/api/teacher/alert-logs?${alertLogsQuery(alertLogsCursor)}`);
         const data = await response.json();
         
         if (data.success && data.logs) {
-            displayAlertLogs(data.logs);
+            displayAlertLogs(data.logs, data.next_cursor, true);
         }
     } catch (error) {
         console.error('Error loading alert logs:', error);
     }
 }
 
-function displayAlertLogs(logs) {
+function formatAlertLogMessage(log) {
+    if (log.alert_type === 'absence') {
+        const date = new Date(`${log.date}T00:00:00`).toLocaleDateString();
+        return `Absence notification for ${log.student_name} on ${date}`;
+    }
+    if (log.alert_type === 'absence_streak') {
+        return `Consecutive absence alert: ${log.message}`;
+    }
+    return `Low attendance alert: ${log.message}`;
+}
+
+function displayAlertLogs(logs, nextCursor = null, append = false) {
     const tbody = document.getElementById('alertLogsBody');
     const countSpan = document.getElementById('alertCount');
     
-    countSpan.textContent = `${logs.length} alerts`;
+    alertLogsCursor = nextCursor;
+    alertLogsShown += logs.length;
+    countSpan.textContent = `${alertLogsShown}${nextCursor ? '+' : ''} alerts`;
+    document.getElementById('alertLogsMore').style.display = nextCursor ? 'flex' : 'none';
     
-    if (logs.length === 0) {
+    if (alertLogsShown === 0) {
         tbody.innerHTML = '<tr><td colspan="9" style="text-align: center; padding: 40px; color: #718096;">No alert logs found</td></tr>';
         return;
     }
     
-    tbody.innerHTML = logs.map(log => `
+    const rows = logs.map(log => `
         <tr>
-            <td>${log.date}</td>
+            <td>${log.sent_at ? new Date(log.sent_at).toLocaleString() : '-'}</td>
             <td>${log.student_name}</td>
             <td>${log.roll_no}</td>
-            <td>${log.class}</td>
+            <td>${log.class.replace('Class ', '')}</td>
             <td>${log.section}</td>
             <td>
-                <i class="fas fa-phone" style="color: #667eea; margin-right: 5px;"></i>
-                ${log.parent_contact}<br>
                 <small style="color: #718096;">
                     <i class="fas fa-envelope" style="margin-right: 5px;"></i>
                     ${log.parent_email}
@@ -779,12 +843,24 @@ function displayAlertLogs(logs) {
                     Email (SMTP)
                 </span>
             </td>
-            <td style="font-size: 12px; max-width: 300px;">${log.message}</td>
+            <td style="font-size: 12px; max-width: 300px;">${formatAlertLogMessage(log)}</td>
             <td>
-                <span class="status-badge sent">SENT</span>
+                <span class="status-badge ${getAlertLogBadgeClass(log.status)}">${log.status.replace('_', ' ').toUpperCase()}</span>
             </td>
         </tr>
     `).join('');
+    
+    if (append) {
+        tbody.insertAdjacentHTML('beforeend', rows);
+    } else {
+        tbody.innerHTML = rows;
+    }
+}
+
+function getAlertLogBadgeClass(status) {
+    if (status === 'sent') return 'sent';
+    if (status === 'queued' || status === 'rate_limited') return 'warning';
+    return 'critical';
 }
 
 // ============================================
@@ -799,8 +875,21 @@ function hideLoading() {
     document.getElementById('loadingOverlay').classList.remove('active');
 }
 
-function exportToCSV() {
-    alert('CSV export feature coming soon!');
+// Download the monthly report for the selected filters (the server streams the file)
+function exportMonthlyReport(format = 'csv') {
+    const month = document.getElementById('monthSelect').value;
+    if (!month) {
+        alert('Please select a month');
+        return;
+    }
+    
+    const params = new URLSearchParams({ format, month });
+    const className = document.getElementById('monthlyClassSelect').value;
+    const section = document.getElementById('monthlySectionSelect').value;
+    if (className) params.set('class', className);
+    if (section) params.set('section', section);
+    
+    window.location.href = `/api/export/monthly-attendance?${params}`;
 }
 
 // ============================================
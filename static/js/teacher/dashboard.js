@@ -13,8 +13,8 @@ document.addEventListener('DOMContentLoaded', () => {
     // Set current date
     setCurrentDate();
     
-    // Load dashboard statistics
-    loadDashboardStats();
+    // Load dashboard statistics, then keep them live over the stream
+    openDashboardStream('teacher-dashboard', { 'stats': loadDashboardStats }, loadDashboardStats, 5 * 60 * 1000);
     
     // Setup event listeners
     setupEventListeners();
@@ -62,17 +62,19 @@ function setCurrentDate() {
 // LOAD DASHBOARD STATISTICS
 // ============================================
 
-async function loadDashboardStats() {
+async function loadDashboardStats(data = null) {
     try {
         console.log('📊 Loading dashboard statistics...');
         
-        const response = await fetch('/api/teacher/stats');
-        
-        if (!response.ok) {
-            throw new Error('Failed to load statistics');
+        if (!data) {
+            const response = await fetch('/api/teacher/stats');
+            
+            if (!response.ok) {
+                throw new Error('Failed to load statistics');
+            }
+            
+            data = await response.json();
         }
-        
-        const data = await response.json();
         console.log('✅ Statistics loaded:', data);
         
         // Update stat cards with animation
@@ -182,9 +184,6 @@ function setupEventListeners() {
     if (notificationBtn) {
         notificationBtn.addEventListener('click', showNotifications);
     }
-    
-    // Refresh stats every 5 minutes
-    setInterval(loadDashboardStats, 5 * 60 * 1000);
 }
 
 // ============================================
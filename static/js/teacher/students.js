@@ -2,6 +2,13 @@
 let allStudents = [];
 let filteredStudents = [];
 
+// Incremental loading: filters run on the server and pages are appended
+const PAGE_SIZE = 100;
+const STUDENT_FIELDS = 'student_id,roll_no,name,class,section,email,enrollment_date,status';
+let nextCursor = null;
+let isLoadingPage = false;
+let loadGeneration = 0;
+
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Students page loaded');
     
@@ -44,6 +51,18 @@ function setupEventListeners() {
     // Export button
     document.getElementById('exportBtn').addEventListener('click', exportStudents);
     
+    // Load more button, plus automatic loading when it scrolls into view
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+    loadMoreBtn.addEventListener('click', loadMoreStudents);
+    if ('IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadMoreStudents();
+            }
+        });
+        observer.observe(loadMoreBtn);
+    }
+    
     // Modal controls
     const modal = document.getElementById('viewStudentModal');
     const closeBtn = modal.querySelector('.close');
@@ -79,62 +98,105 @@ async function loadClasses() {
     }
 }
 
-// Load all students
+// Build query parameters from the search box and filters
+function buildFilterParams() {
+    const params = new URLSearchParams();
+    const filters = {
+        search: document.getElementById('searchInput').value.trim(),
+        class: document.getElementById('classFilter').value,
+        section: document.getElementById('sectionFilter').value,
+        status: document.getElementById('statusFilter').value
+    };
+    
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value) params.set(key, value);
+    });
+    
+    return params;
+}
+
+// Fetch one page of students matching the current filters
+async function fetchStudentsPage(cursor) {
+    const params = buildFilterParams();
+    params.set('fields', STUDENT_FIELDS);
+    params.set('limit', PAGE_SIZE);
+    if (cursor) params.set('cursor', cursor);
+    
+    const response = await fetch(`/api/teacher/students/all?${params}`);
+    const data = await response.json();
+    
+    if (!data.success) {
+        throw new Error(data.error || 'Unknown error');
+    }
+    return data;
+}
+
+// Load the first page of students (also used whenever a filter changes)
 async function loadStudents() {
+    // Ignore pages still in flight from an older filter
+    const generation = ++loadGeneration;
+    
+    // Totals are counted separately so pages stay small
+    updateStats(buildFilterParams(), generation);
+    
     try {
-        const response = await fetch('/api/teacher/students/all');
-        const data = await response.json();
+        isLoadingPage = true;
+        const data = await fetchStudentsPage(null);
+        isLoadingPage = false;
         
-        if (data.success) {
-            allStudents = data.students;
-            filteredStudents = [...allStudents];
-            displayStudents(filteredStudents);
-            updateStats(filteredStudents);
-        } else {
-            showError('Failed to load students: ' + (data.error || 'Unknown error'));
-        }
+        if (generation !== loadGeneration) return;
+        
+        allStudents = data.students;
+        filteredStudents = allStudents;
+        nextCursor = data.next_cursor;
+        displayStudents(filteredStudents);
+        updateLoadMore();
     } catch (error) {
+        isLoadingPage = false;
         console.error('Error loading students:', error);
         showError('Failed to load students: ' + error.message);
     }
 }
 
-// Filter students based on search and filters
-function filterStudents() {
-    const searchTerm = document.getElementById('searchInput').value.toLowerCase().trim();
-    const classFilter = document.getElementById('classFilter').value;
-    const sectionFilter = document.getElementById('sectionFilter').value;
-    const statusFilter = document.getElementById('statusFilter').value;
-    
-    filteredStudents = allStudents.filter(student => {
-        // Search filter
-        const matchesSearch = !searchTerm || 
-            student.name.toLowerCase().includes(searchTerm) ||
-            student.roll_no.toLowerCase().includes(searchTerm) ||
-            String(student.student_id).includes(searchTerm);
-        
-        // Class filter
-        const matchesClass = !classFilter || student.class === classFilter;
+// Append the next page of students
+async function loadMoreStudents() {
+    if (!nextCursor || isLoadingPage) return;
+    
+    const generation = loadGeneration;
+    
+    try {
+        isLoadingPage = true;
+        const data = await fetchStudentsPage(nextCursor);
+        isLoadingPage = false;
         
-        // Section filter
-        const matchesSection = !sectionFilter || student.section === sectionFilter;
+        if (generation !== loadGeneration) return;
         
-        // Status filter
-        const matchesStatus = !statusFilter || student.status === statusFilter;
+        const tbody = document.getElementById('studentsTableBody');
+        data.students.forEach(student => tbody.appendChild(createStudentRow(student)));
         
-        return matchesSearch && matchesClass && matchesSection && matchesStatus;
-    });
-    
-    displayStudents(filteredStudents);
-    updateStats(filteredStudents);
+        allStudents = allStudents.concat(data.students);
+        filteredStudents = allStudents;
+        nextCursor = data.next_cursor;
+        updateLoadMore();
+    } catch (error) {
+        isLoadingPage = false;
+        console.error('Error loading more students:', error);
+    }
+}
+
+// Show the load more button only while there are more pages
+function updateLoadMore() {
+    document.getElementById('loadMore').style.display = nextCursor ? 'flex' : 'none';
+}
+
+// Filter students based on search and filters (filtering happens on the server)
+function filterStudents() {
+    loadStudents();
 }
 
 // Display students in table
 function displayStudents(students) {
     const tbody = document.getElementById('studentsTableBody');
-    const resultCount = document.getElementById('resultCount');
-    
-    resultCount.textContent = `${students.length} student${students.length !== 1 ? 's' : ''}`;
     
     if (students.length === 0) {
         tbody.innerHTML = `
@@ -151,46 +213,58 @@ function displayStudents(students) {
     tbody.innerHTML = '';
     
     students.forEach(student => {
-        const row = document.createElement('tr');
-        row.innerHTML = `
-            <td>${student.student_id}</td>
-            <td>${student.roll_no}</td>
-            <td>${student.name}</td>
-            <td>${student.class}</td>
-            <td>${student.section}</td>
-            <td>${student.email}</td>
-            <td>${formatDate(student.enrollment_date)}</td>
-            <td>
-                <span class="status-badge ${student.status}">
-                    ${student.status.charAt(0).toUpperCase() + student.status.slice(1)}
-                </span>
-            </td>
-            <td>
-                <div class="action-buttons">
-                    <button class="icon-btn view" onclick="viewStudent(${student.student_id})" title="View Details">
-                        <i class="fas fa-eye"></i>
-                    </button>
-                    <button class="icon-btn email" onclick="sendEmail('${student.email}')" title="Send Email">
-                        <i class="fas fa-envelope"></i>
-                    </button>
-                </div>
-            </td>
-        `;
-        tbody.appendChild(row);
+        tbody.appendChild(createStudentRow(student));
     });
 }
 
-// Update statistics
-function updateStats(students) {
-    const totalStudents = students.length;
-    const activeStudents = students.filter(s => s.status === 'active').length;
-    const uniqueClasses = [...new Set(students.map(s => s.class))].length;
-    const uniqueSections = [...new Set(students.map(s => s.section))].length;
-    
-    animateCounter('totalStudents', totalStudents);
-    animateCounter('activeStudents', activeStudents);
-    animateCounter('totalClasses', uniqueClasses);
-    animateCounter('totalSections', uniqueSections);
+// Build a table row for one student
+function createStudentRow(student) {
+    const row = document.createElement('tr');
+    row.innerHTML = `
+        <td>${student.student_id}</td>
+        <td>${student.roll_no}</td>
+        <td>${student.name}</td>
+        <td>${student.class}</td>
+        <td>${student.section}</td>
+        <td>${student.email}</td>
+        <td>${formatDate(student.enrollment_date)}</td>
+        <td>
+            <span class="status-badge ${student.status}">
+                ${student.status.charAt(0).toUpperCase() + student.status.slice(1)}
+            </span>
+        </td>
+        <td>
+            <div class="action-buttons">
+                <button class="icon-btn view" onclick="viewStudent(${student.student_id})" title="View Details">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="icon-btn email" onclick="sendEmail('${student.email}')" title="Send Email">
+                    <i class="fas fa-envelope"></i>
+                </button>
+            </div>
+        </td>
+    `;
+    return row;
+}
+
+// Update statistics from the count endpoint (covers every page, not just loaded rows)
+async function updateStats(params, generation) {
+    try {
+        const response = await fetch(`/api/students/count?${params}`);
+        const counts = await response.json();
+        
+        if (generation !== loadGeneration) return;
+        
+        const resultCount = document.getElementById('resultCount');
+        resultCount.textContent = `${counts.total} student${counts.total !== 1 ? 's' : ''}`;
+        
+        animateCounter('totalStudents', counts.total);
+        animateCounter('activeStudents', counts.active);
+        animateCounter('totalClasses', counts.classes);
+        animateCounter('totalSections', counts.sections);
+    } catch (error) {
+        console.error('Error loading student counts:', error);
+    }
 }
 
 // Animate counter
@@ -240,16 +314,31 @@ function clearFilters() {
     filterStudents();
 }
 
-// Export students to CSV
-function exportStudents() {
-    if (filteredStudents.length === 0) {
+// Export students to CSV (fetches every page matching the current filters)
+async function exportStudents() {
+    const students = [];
+    let cursor = null;
+    
+    try {
+        do {
+            const data = await fetchStudentsPage(cursor);
+            students.push(...data.students);
+            cursor = data.next_cursor;
+        } while (cursor);
+    } catch (error) {
+        console.error('Error exporting students:', error);
+        alert('Failed to export students: ' + error.message);
+        return;
+    }
+    
+    if (students.length === 0) {
         alert('No students to export');
         return;
     }
     
     // Create CSV content
     const headers = ['Student ID', 'Roll No', 'Name', 'Class', 'Section', 'Email', 'Enrollment Date', 'Status'];
-    const rows = filteredStudents.map(s => [
+    const rows = students.map(s => [
         s.student_id,
         s.roll_no,
         s.name,
@@ -0,0 +1,89 @@
+"""
+Test the incrementally maintained consecutive absence streaks and their alerts
+Run with: python test_absence_streaks.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def save(client, student_id, *days):
+    """Save (date, status) records for one student"""
+    response = client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': student_id, 'date': date, 'status': status} for date, status in days
+    ]})
+    assert response.status_code == 200
+    return response.get_json()
+
+def streak_rows(conn):
+    return [tuple(row) for row in conn.execute('SELECT * FROM student_absence_streaks ORDER BY student_id')]
+
+def test_streaks_match_rebuild(client):
+    """Appends, same-day corrections and back-dated corrections all equal a rebuild"""
+    save(client, 1, ('2027-03-01', 'Present'), ('2027-03-02', 'Absent'))
+    save(client, 1, ('2027-03-03', 'Absent'))
+    save(client, 2, ('2027-03-01', 'Absent'), ('2027-03-02', 'Absent'), ('2027-03-03', 'Late'))
+    # Same-day correction, then a back-dated one that joins two runs of absences
+    save(client, 2, ('2027-03-03', 'Absent'))
+    save(client, 1, ('2027-03-01', 'Absent'))
+    app.email_outbox.stop()
+
+    conn = app.get_db_connection()
+    incremental = streak_rows(conn)
+    state = {row[0]: row[1:] for row in incremental}
+    print(f"  Streaks: {state[1]}, {state[2]}")
+    assert state[1] == ('2027-03-03', 3, '2027-03-01')
+    assert state[2] == ('2027-03-03', 3, '2027-03-01')
+
+    app.rebuild_absence_streaks(conn)
+    assert streak_rows(conn) == incremental
+    conn.close()
+
+def test_threshold_queues_one_alert(client):
+    """The third consecutive absence queues a streak alert; the fourth does not"""
+    results = [save(client, 1, (date, 'Absent'))['streak_alerts']
+               for date in ('2027-04-05', '2027-04-06', '2027-04-07', '2027-04-08')]
+    app.email_outbox.stop()
+    assert results == [0, 0, 1, 0]
+
+    conn = app.get_db_connection()
+    logs = conn.execute(
+        "SELECT date, message FROM alert_logs WHERE alert_type = 'absence_streak' AND student_id = 1"
+    ).fetchall()
+    conn.close()
+    print(f"  Streak alerts: {[tuple(log) for log in logs]}")
+    assert [log['date'] for log in logs] == ['2027-04-07']
+
+def test_each_threshold_queues_its_own_alert(client):
+    """A 5-day streak queues a second alert after the 3-day one"""
+    results = [save(client, 1, (date, 'Absent'))['streak_alerts']
+               for date in ('2027-04-05', '2027-04-06', '2027-04-07', '2027-04-08', '2027-04-09')]
+    # Re-saving the fifth day doesn't send the 5-day alert again
+    results.append(save(client, 1, ('2027-04-09', 'Absent'))['streak_alerts'])
+    app.email_outbox.stop()
+    assert results == [0, 0, 1, 0, 1, 0]
+
+    conn = app.get_db_connection()
+    dates = [row['date'] for row in conn.execute(
+        "SELECT date FROM alert_logs WHERE alert_type = 'absence_streak' AND student_id = 1 ORDER BY log_id"
+    )]
+    conn.close()
+    assert dates == ['2027-04-07', '2027-04-09']
+
+def test_streaks_api_lists_at_risk_students(client):
+    save(client, 4, ('2027-05-03', 'Absent'), ('2027-05-04', 'Absent'), ('2027-05-05', 'Absent'))
+    save(client, 5, ('2027-05-03', 'Absent'), ('2027-05-04', 'Present'))
+    app.email_outbox.stop()
+
+    data = client.get('/api/teacher/attendance/streaks?min_streak=2').get_json()
+    assert [(s['student_id'], s['current_streak'], s['streak_start']) for s in data['students']] == [
+        (4, 3, '2027-05-03')
+    ]
+    assert client.get('/api/teacher/attendance/streaks?min_streak=x').status_code == 400
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING ABSENCE STREAKS")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
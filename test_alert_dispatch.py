@@ -0,0 +1,122 @@
+"""
+Test alert dispatch: deduplication by (student, type, date/period), per-recipient
+rate limits and the bulk "notify all below threshold" mode
+Run with: python test_alert_dispatch.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def alert_count(alert_type, student_id=None):
+    conn = app.get_db_connection()
+    query = 'SELECT COUNT(*) FROM alert_logs WHERE alert_type = ?'
+    params = [alert_type]
+    if student_id is not None:
+        query += ' AND student_id = ?'
+        params.append(student_id)
+    count = conn.execute(query, params).fetchone()[0]
+    conn.close()
+    return count
+
+def test_resaving_a_day_does_not_resend_absence_mail(client):
+    payload = {'attendance': [{'student_id': 1, 'date': '2027-01-11', 'status': 'Absent'}]}
+
+    first = client.post('/api/teacher/attendance/save', json=payload).get_json()
+    second = client.post('/api/teacher/attendance/save', json=payload).get_json()
+    app.email_outbox.stop()
+
+    assert (first['emails_queued'], second['emails_queued']) == (1, 0)
+    assert alert_count('absence', 1) == 1
+
+def test_low_attendance_notify_once_per_month(client):
+    student = {'student_id': 1, 'percentage': 50, 'total_days': 2, 'present': 1, 'absent': 1}
+
+    first = client.post('/api/teacher/attendance/low/notify', json={'month': '2027-01', 'students': [student]}).get_json()
+    again = client.post('/api/teacher/attendance/low/notify', json={'month': '2027-01', 'students': [student]}).get_json()
+    next_month = client.post('/api/teacher/attendance/low/notify', json={'month': '2027-02', 'students': [student]}).get_json()
+    app.email_outbox.stop()
+
+    print(f"  Repeat click: {again['results']}")
+    assert (first['emails_queued'], again['emails_queued'], next_month['emails_queued']) == (1, 0, 1)
+    assert again['results'][0]['status'] == 'duplicate'
+
+def test_low_attendance_notify_rejects_bad_requests(client):
+    for body in ({'month': '2027-1', 'students': [{'student_id': 1}]},
+                 {'month': '1000-01', 'students': [{'student_id': 1}]},
+                 {'month': '2027-01', 'students': [{'student_id': 1}, {'percentage': 50}]},
+                 {'month': '2027-01', 'students': [{'student_id': '1'}]},
+                 {'month': '2027-01', 'students': [None]},
+                 {'month': '2027-01', 'students': {'student_id': 1}},
+                 {'month': '2027-01', 'all_below': 'lots'}):
+        response = client.post('/api/teacher/attendance/low/notify', json=body)
+        assert response.status_code == 400, body
+    assert alert_count('low_attendance') == 0
+
+def test_recipient_rate_limit(database):
+    """A parent stops receiving alerts once the limit for the window is reached"""
+    conn = app.get_db_connection()
+    alerts = [{
+        'student_id': 1, 'alert_type': 'absence', 'date': f'2027-01-{day:02d}',
+        'recipient': 'parent@example.com', 'message': 'Absent', 'payload': {}
+    } for day in range(1, app.ALERT_RATE_LIMIT_PER_RECIPIENT + 3)]
+
+    outcomes = app.dispatch_alerts(conn, alerts)
+    conn.commit()
+    later = app.dispatch_alerts(conn, alerts[:1] + [dict(alerts[0], date='2027-02-01')])
+    conn.close()
+
+    limit = app.ALERT_RATE_LIMIT_PER_RECIPIENT
+    assert outcomes == ['queued'] * limit + ['rate_limited'] * 2
+    assert later == ['duplicate', 'rate_limited']
+
+def test_rate_limited_alerts_are_logged_and_escalations_bypass_the_limit(client):
+    """Absence mails past the limit are logged as rate_limited; streak and low attendance alerts still go out"""
+    days = ['2027-04-05', '2027-04-06', '2027-04-07', '2027-04-08', '2027-04-09', '2027-04-12']
+    results = []
+    for date in days:
+        data = client.post('/api/teacher/attendance/save', json={
+            'attendance': [{'student_id': 1, 'date': date, 'status': 'Absent'}]
+        }).get_json()
+        results.append((data['emails_queued'], data['streak_alerts'], data['emails_rate_limited']))
+    notify = client.post('/api/teacher/attendance/low/notify', json={
+        'month': '2027-04', 'students': [{'student_id': 1, 'percentage': 0}]
+    }).get_json()
+    app.email_outbox.stop()
+
+    print(f"  Per day (queued, streak, rate limited): {results}")
+    assert results == [(1, 0, 0), (1, 0, 0), (2, 1, 0), (1, 0, 0), (2, 1, 0), (0, 0, 1)]
+    assert notify['emails_queued'] == 1
+
+    conn = app.get_db_connection()
+    limited = conn.execute(
+        "SELECT alert_type, date FROM alert_logs WHERE student_id = 1 AND status = 'rate_limited'"
+    ).fetchall()
+    conn.close()
+    assert [tuple(row) for row in limited] == [('absence', '2027-04-12')]
+
+    logs = client.get('/api/teacher/alert-logs?status=rate_limited').get_json()
+    assert [log['date'] for log in logs['logs']] == ['2027-04-12']
+
+def test_notify_all_below_threshold_in_one_pass(client):
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': student_id, 'date': '2027-03-01', 'status': 'Absent'} for student_id in range(1, 11)
+    ]})
+    app.email_outbox.stop()
+
+    data = client.post('/api/teacher/attendance/low/notify', json={
+        'month': '2027-03', 'all_below': 75, 'class': 'Class 10'
+    }).get_json()
+    app.email_outbox.stop()
+    print(f"  Notify all: {data['message']}")
+
+    assert data['emails_queued'] + data['emails_skipped'] + data['emails_failed'] == 10
+    assert data['emails_queued'] > 0
+    assert alert_count('low_attendance') == data['emails_queued']
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING ALERT DISPATCH")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
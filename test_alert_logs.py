@@ -0,0 +1,113 @@
+"""
+Test the keyset-paginated, filterable alert log API
+Run with: python test_alert_logs.py (or pytest)
+"""
+import sqlite3
+import sys
+
+import pytest
+
+import app
+
+@pytest.fixture
+def client(client):
+    """Test client on a fresh database holding a known set of alert logs"""
+    conn = app.get_db_connection()
+    conn.execute('DELETE FROM alert_logs')
+    conn.executemany(
+        '''INSERT INTO alert_logs (student_id, alert_type, date, parent_email, message, status, sent_at)
+           VALUES (?, ?, ?, 'parent@example.com', 'Absent', ?, ?)''',
+        [(1 + i % 12, ('absence', 'low_attendance')[i % 2], f'2027-01-{1 + i // 3:02d}',
+          ('sent', 'queued', 'failed')[i % 3], f'2027-01-{1 + i // 3:02d} 08:00:00')
+         for i in range(30)]
+    )
+    conn.commit()
+    conn.close()
+    return client
+
+def fetch_all(client, query='', cursor=None):
+    """Follow next_cursor through every page; returns (logs, number of pages)"""
+    logs, pages = [], 0
+    while True:
+        url = f'/api/teacher/alert-logs?limit=7{query}' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        assert data['success']
+        logs.extend(data['logs'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return logs, pages
+
+def test_pages_cover_every_log_once(client):
+    logs, pages = fetch_all(client)
+    print(f"  {len(logs)} logs over {pages} pages")
+
+    ids = [log['log_id'] for log in logs]
+    assert len(ids) == len(set(ids)) == 30
+    assert pages == 5
+    assert ids == sorted(ids, reverse=True)
+    assert logs[0]['sent_at'] == '2027-01-10T08:00:00Z'
+
+def test_pages_are_stable_while_sent_at_changes(client):
+    """Rows without sent_at are listed, and delivery rewriting sent_at moves nothing between pages"""
+    conn = app.get_db_connection()
+    conn.execute("UPDATE alert_logs SET sent_at = NULL WHERE log_id % 5 = 0")
+    conn.commit()
+    conn.close()
+
+    first = client.get('/api/teacher/alert-logs?limit=10').get_json()
+    conn = app.get_db_connection()
+    conn.execute("UPDATE alert_logs SET status = 'sent', sent_at = '2030-01-01 00:00:00' WHERE log_id % 3 = 0")
+    conn.commit()
+    conn.close()
+
+    rest, _ = fetch_all(client, cursor=first['next_cursor'])
+    ids = [log['log_id'] for log in first['logs'] + rest]
+    assert len(ids) == len(set(ids)) == 30
+    assert any(log['sent_at'] is None for log in first['logs'] + rest)
+
+def test_filters(client):
+    failed, _ = fetch_all(client, '&status=failed&alert_type=low_attendance')
+    assert failed and all(log['status'] == 'failed' and log['alert_type'] == 'low_attendance' for log in failed)
+
+    dated, _ = fetch_all(client, '&from=2027-01-02&to=2027-01-03')
+    assert len(dated) == 6
+    assert {log['sent_at'][:10] for log in dated} == {'2027-01-02', '2027-01-03'}
+
+    conn = app.get_db_connection()
+    class_name = conn.execute('SELECT class FROM students WHERE student_id = 1').fetchone()[0]
+    expected = conn.execute(
+        '''SELECT COUNT(*) FROM alert_logs al JOIN students s ON s.student_id = al.student_id
+           WHERE s.class = ?''', (class_name,)
+    ).fetchone()[0]
+    conn.close()
+    by_class, _ = fetch_all(client, f'&class={class_name}')
+    assert len(by_class) == expected
+
+def test_bad_arguments_are_rejected(client):
+    for query in ('cursor=bogus', 'status=lost', 'alert_type=sms', 'from=01/02/2027', 'limit=0',
+                  f"cursor={app.encode_page_cursor(['2027-01-01 08:00:00', 5])}"):
+        assert client.get(f'/api/teacher/alert-logs?{query}').status_code == 400, query
+
+def test_pages_walk_the_primary_key():
+    conn = sqlite3.connect(':memory:')
+    with open('schema.sql', 'r') as f:
+        conn.executescript(f.read())
+    app.migrate_database(conn)
+
+    plan = [row[3] for row in conn.execute(
+        '''EXPLAIN QUERY PLAN SELECT al.log_id FROM alert_logs al
+           JOIN students s ON al.student_id = s.student_id
+           WHERE al.log_id < ?
+           ORDER BY al.log_id DESC LIMIT 51''', (10,)
+    )]
+    conn.close()
+    print(f"  Plan: {plan}")
+    assert any('INTEGER PRIMARY KEY (rowid<?)' in detail for detail in plan), plan
+    assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING ALERT LOG PAGINATION")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,117 @@
+"""
+Test the vectorized attendance analytics (matrix loading, rates, streaks, weekday patterns)
+Run with: python test_attendance_analytics.py (or pytest)
+"""
+import sys
+import time
+
+import numpy as np
+import pytest
+
+import app
+import attendance_analytics as analytics
+
+A, P, L, N = analytics.ABSENT, analytics.PRESENT, 2, analytics.NOT_MARKED
+
+def make_matrix(codes, start='2026-03-02', groups=None):
+    """Matrix over consecutive days from start (2026-03-02 is a Monday)"""
+    codes = np.array(codes, dtype=np.int8)
+    dates = np.datetime64(start, 'D') + np.arange(codes.shape[1])
+    return analytics.AttendanceMatrix(np.arange(1, len(codes) + 1), dates, codes,
+                                      analytics.STUDENT_STATUS_CODES, groups=groups)
+
+def test_rates_and_streaks():
+    matrix = make_matrix([
+        [P, A, A, P, A, A, A],
+        [A, A, N, A, L, P, A],
+        [N, N, N, N, N, N, N],
+    ], groups=['Class 9', 'Class 9', 'Class 10'])
+
+    assert np.allclose(matrix.rates(), [200 / 7, 100 / 6, 0])
+    longest, current = matrix.absence_streaks()
+    assert longest.tolist() == [3, 2, 0]
+    assert current.tolist() == [3, 1, 0]
+    assert matrix.group_rates() == {'Class 10': 0.0, 'Class 9': 300 / 13}
+
+def test_rolling_and_weekday_rates():
+    matrix = make_matrix([[P, A, P, P, A, P, A, P, P, P]])
+
+    rolling = matrix.rolling_rates(3)[0]
+    assert np.allclose(rolling[:4], [100, 50, 200 / 3, 200 / 3])
+
+    overall, per_student = matrix.weekday_rates()
+    # Mondays are days 0 and 7 (present, present); Friday is day 4 (absent)
+    assert overall['Monday'] == 100
+    assert overall['Tuesday'] == 50
+    assert overall['Friday'] == 0
+    assert per_student.shape == (1, 7)
+
+def test_low_attendance_route_uses_matrix(client):
+    """The low attendance report matches the rollup counts and adds streaks"""
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 1, 'date': '2026-03-02', 'status': 'Present'},
+        {'student_id': 1, 'date': '2026-03-03', 'status': 'Absent'},
+        {'student_id': 1, 'date': '2026-03-04', 'status': 'Absent'},
+        {'student_id': 2, 'date': '2026-03-02', 'status': 'Present'},
+    ]})
+    app.email_outbox.stop()
+
+    students = client.get('/api/teacher/attendance/low?month=2026-03&threshold=75').get_json()['students']
+    print(f"  Low attendance in 2026-03: {students}")
+    assert [s['student_id'] for s in students] == [1]
+    assert (students[0]['total_days'], students[0]['present'], students[0]['percentage']) == (3, 1, 33.3)
+    assert students[0]['current_absence_streak'] == 2
+
+def test_low_attendance_agrees_with_monthly_report(client):
+    """Records on non-school days count in both reports; a bad month is a 400"""
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 1, 'date': '2026-03-06', 'status': 'Present'},
+        {'student_id': 1, 'date': '2026-03-07', 'status': 'Absent'},   # Saturday
+        {'student_id': 1, 'date': '2026-03-09', 'status': 'Absent'},
+    ]})
+    app.email_outbox.stop()
+
+    monthly = client.get('/api/teacher/attendance/monthly?month=2026-03&class=Class 10').get_json()
+    low = client.get('/api/teacher/attendance/low?month=2026-03&class=Class 10').get_json()['students']
+    expected = next(s for s in monthly['students'] if s['student_id'] == 1)
+    student = next(s for s in low if s['student_id'] == 1)
+    assert (student['total_days'], student['percentage']) == (expected['total_days'], expected['percentage']) == (3, 33.3)
+
+    for query in ('month=2026-13', 'month=March', 'threshold=high'):
+        assert client.get(f'/api/teacher/attendance/low?{query}').status_code == 400, query
+
+def test_class_filter_limits_records_read(database):
+    """The class/section filter is applied in SQL, not after reading every record"""
+    conn = app.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    matrix = analytics.load_student_matrix(conn, '2026-03-01', '2026-04-01', 'Class 10', 'A')
+    conn.set_trace_callback(None)
+    conn.close()
+
+    records_query = next(sql for sql in statements if 'FROM daily_attendance' in sql)
+    assert 'IN (SELECT student_id FROM students WHERE' in records_query
+    assert {owner['class'] for owner in matrix.owners} == {'Class 10'}
+
+def test_year_of_data_is_fast():
+    """5,000 students x a school year of days stays well under a second"""
+    rng = np.random.default_rng(7)
+    codes = rng.choice(np.array([A, P, L, N], dtype=np.int8), size=(5000, 250), p=[0.1, 0.8, 0.05, 0.05])
+    matrix = make_matrix(codes, groups=rng.choice(['Class 7', 'Class 8', 'Class 9', 'Class 10'], 5000))
+
+    started = time.perf_counter()
+    matrix.rates()
+    matrix.group_rates()
+    matrix.rolling_rates(7)
+    matrix.rolling_rates(30)
+    matrix.absence_streaks()
+    matrix.weekday_rates()
+    elapsed = time.perf_counter() - started
+    print(f"  5,000 x 250 analytics: {elapsed * 1000:.0f} ms")
+    assert elapsed < 1.0
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING ATTENDANCE ANALYTICS")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
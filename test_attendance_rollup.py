@@ -0,0 +1,101 @@
+"""
+Test that the monthly attendance rollup stays in step with daily_attendance
+Run with: python test_attendance_rollup.py (or pytest)
+"""
+import sys
+import threading
+
+import pytest
+
+import app
+
+def rollup_rows(conn):
+    return [tuple(row) for row in conn.execute(
+        'SELECT * FROM student_monthly_attendance ORDER BY student_id, month'
+    )]
+
+def test_rollup_matches_rebuild_after_saves(client):
+    """Incremental updates must equal a full rebuild"""
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 2, 'date': '2026-02-03', 'status': 'Present'},
+        {'student_id': 2, 'date': '2026-02-04', 'status': 'Absent'},
+        {'student_id': 3, 'date': '2026-02-04', 'status': 'Late'},
+    ]})
+    # Re-save a day with different statuses
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 2, 'date': '2026-02-04', 'status': 'Present'},
+        {'student_id': 3, 'date': '2026-02-04', 'status': 'On Leave'},
+    ]})
+
+    conn = app.get_db_connection()
+    incremental = rollup_rows(conn)
+    row = conn.execute(
+        "SELECT present, absent, late, total FROM student_monthly_attendance WHERE student_id = 2 AND month = '2026-02'"
+    ).fetchone()
+    assert tuple(row) == (2, 0, 0, 2)
+
+    app.rebuild_attendance_rollup(conn)
+    assert rollup_rows(conn) == incremental
+    conn.close()
+
+def test_monthly_report_reads_rollup(client):
+    """The monthly report should reflect saved attendance"""
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 1, 'date': '2026-03-02', 'status': 'Present'},
+        {'student_id': 1, 'date': '2026-03-03', 'status': 'Absent'},
+    ]})
+
+    data = client.get('/api/teacher/attendance/monthly?month=2026-03&class=Class 10&section=A').get_json()
+    rahul = next(s for s in data['students'] if s['student_id'] == 1)
+    print(f"  Rahul in 2026-03: {rahul}")
+
+    assert (rahul['total_days'], rahul['present'], rahul['absent'], rahul['percentage']) == (2, 1, 1, 50.0)
+    app.email_outbox.stop()
+
+def test_concurrent_saves_of_one_day(database, monkeypatch):
+    """Two saves of the same record must not both apply a delta against the same previous status"""
+    barrier = threading.Barrier(2, timeout=0.5)
+    fetch = app.fetch_attendance_statuses
+
+    def fetch_then_wait(*args):
+        # Without a write lock both saves would read the (missing) previous status here
+        statuses = fetch(*args)
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        return statuses
+
+    monkeypatch.setattr(app, 'fetch_attendance_statuses', fetch_then_wait)
+
+    def save(status):
+        conn = app.get_db_connection()
+        app.save_student_attendance(conn, {(2, '2027-05-03'): (status,)})
+        conn.commit()
+        conn.close()
+
+    threads = [threading.Thread(target=save, args=(status,)) for status in ('absent', 'present')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = app.get_db_connection()
+    rollup = conn.execute(
+        "SELECT present, absent, late, total FROM student_monthly_attendance WHERE student_id = 2 AND month = '2027-05'"
+    ).fetchone()
+    counts = conn.execute(
+        '''SELECT COUNT(CASE WHEN status = 'present' THEN 1 END), COUNT(CASE WHEN status = 'absent' THEN 1 END),
+                  COUNT(CASE WHEN status = 'late' THEN 1 END), COUNT(*)
+           FROM daily_attendance WHERE date >= '2027-05-01' AND date < '2027-06-01' AND student_id = 2'''
+    ).fetchone()
+    print(f"  Rollup {tuple(rollup)}, daily_attendance {tuple(counts)}")
+    assert tuple(rollup) == tuple(counts)
+    assert counts[3] == 1
+    conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING MONTHLY ATTENDANCE ROLLUP")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
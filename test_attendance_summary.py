@@ -0,0 +1,82 @@
+"""
+Test the daily attendance summaries (per class and per date) kept in step with daily_attendance
+Run with: python test_attendance_summary.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def summary_rows(conn):
+    classes = [tuple(row) for row in conn.execute('SELECT * FROM class_daily_attendance ORDER BY date, class')]
+    dates = [tuple(row) for row in conn.execute(
+        '''SELECT date, total_students, present_students, absent_students, attendance_percentage
+           FROM attendance ORDER BY date'''
+    )]
+    return classes, dates
+
+def test_summary_matches_rebuild_after_saves(client):
+    """Incremental updates (including re-saves) must equal a full rebuild"""
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 1, 'date': '2026-02-04', 'status': 'Present'},
+        {'student_id': 2, 'date': '2026-02-04', 'status': 'Absent'},
+        {'student_id': 11, 'date': '2026-02-04', 'status': 'Late'},
+    ]})
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 2, 'date': '2026-02-04', 'status': 'Present'},
+    ]})
+    app.email_outbox.stop()
+
+    conn = app.get_db_connection()
+    incremental = summary_rows(conn)
+    day = conn.execute("SELECT * FROM attendance WHERE date = '2026-02-04'").fetchone()
+    print(f"  2026-02-04: {dict(day)}")
+    assert (day['total_students'], day['present_students'], day['absent_students']) == (3, 2, 0)
+    assert day['attendance_percentage'] == 66.7
+
+    app.rebuild_attendance_summary(conn)
+    assert summary_rows(conn) == incremental
+    conn.close()
+
+def test_dashboard_reads_todays_summary(client):
+    """Saving today's attendance moves the dashboard percentage"""
+    conn = app.get_db_connection()
+    today = conn.execute('SELECT date("now")').fetchone()[0]
+    absent = [row[0] for row in conn.execute(
+        "SELECT student_id FROM daily_attendance WHERE date = ? AND status = 'absent'", (today,)
+    )]
+    conn.close()
+
+    before = client.get('/api/stats').get_json()['attendance_percentage']
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': student_id, 'date': today, 'status': 'Present'} for student_id in absent
+    ]})
+    after = client.get('/api/stats').get_json()['attendance_percentage']
+    print(f"  Today's attendance: {before}% -> {after}%")
+
+    assert before < 100
+    assert after == 100
+
+def test_migration_backfills_older_databases(database):
+    """An older database (duplicate dates, no summary table) is upgraded and backfilled"""
+    conn = app.get_db_connection()
+    expected = summary_rows(conn)
+    today = conn.execute('SELECT date("now")').fetchone()[0]
+    conn.execute('DROP TABLE class_daily_attendance')
+    conn.execute('DROP INDEX idx_attendance_date')
+    conn.execute(
+        '''INSERT INTO attendance (date, total_students, present_students, absent_students, attendance_percentage)
+           VALUES (?, 20, 18, 2, 90.0)''', (today,)
+    )
+    conn.commit()
+
+    app.migrate_database(conn)
+    assert summary_rows(conn) == expected
+    conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING DAILY ATTENDANCE SUMMARY")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,72 @@
+"""
+Test the bulk attendance upsert behind the student and teacher save endpoints
+Run with: python test_bulk_attendance.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def test_invalid_payload_writes_nothing(client):
+    """One bad record should reject the whole student payload"""
+    response = client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': '2', 'date': '2026-04-01', 'status': 'Present'},
+        {'student_id': 3, 'date': '01/04/2026', 'status': 'Absent'},
+    ]})
+    data = response.get_json()
+    print(f"  Invalid payload: {response.status_code} {data['details']}")
+
+    assert response.status_code == 400
+    assert len(data['details']) == 1
+
+    conn = app.get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM daily_attendance WHERE date = '2026-04-01'").fetchone()[0]
+    conn.close()
+    assert count == 0
+
+def test_student_upsert_updates_in_place(client):
+    """Re-saving a day updates the existing rows instead of duplicating them"""
+    for status in ('Absent', 'Late'):
+        response = client.post('/api/teacher/attendance/save', json={'attendance': [
+            # The attendance page sends ids as strings
+            {'student_id': '2', 'date': '2026-04-01', 'status': status},
+            {'student_id': '3', 'date': '2026-04-01', 'status': 'Present'},
+        ]})
+        assert response.status_code == 200
+
+    conn = app.get_db_connection()
+    rows = conn.execute(
+        "SELECT student_id, status FROM daily_attendance WHERE date = '2026-04-01' ORDER BY student_id"
+    ).fetchall()
+    rollup = conn.execute(
+        "SELECT present, absent, late, total FROM student_monthly_attendance WHERE student_id = 2 AND month = '2026-04'"
+    ).fetchone()
+    conn.close()
+
+    assert [tuple(row) for row in rows] == [(2, 'late'), (3, 'present')]
+    assert tuple(rollup) == (0, 0, 1, 1)
+    app.email_outbox.stop()
+
+def test_teacher_upsert_updates_in_place(client):
+    """Teacher attendance saves share the same upsert path"""
+    for status, remarks in (('present', ''), ('leave', 'Medical')):
+        response = client.post('/api/teacher-attendance', json={'records': [
+            {'teacher_id': 1, 'date': '2026-04-01', 'status': status, 'remarks': remarks},
+        ]})
+        assert response.status_code == 200
+
+    response = client.post('/api/teacher-attendance', json={'records': [
+        {'teacher_id': 1, 'date': '2026-04-01', 'status': 'holiday'},
+    ]})
+    assert response.status_code == 400
+
+    attendance = client.get('/api/teacher-attendance?date=2026-04-01').get_json()['attendance']
+    print(f"  Teacher 1 on 2026-04-01: {attendance['1']}")
+    assert (attendance['1']['status'], attendance['1']['remarks']) == ('leave', 'Medical')
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING BULK ATTENDANCE WRITES")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
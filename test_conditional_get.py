@@ -0,0 +1,48 @@
+"""
+Test ETag / If-None-Match handling on the read-only JSON APIs
+Run with: python test_conditional_get.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def test_matching_etag_returns_304_without_database(client):
+    """A current ETag is answered with an empty 304 and no connection checkout"""
+    for url in ['/api/classes', '/api/departments', '/api/exams', '/api/teachers', '/api/fees']:
+        first = client.get(url)
+        etag = first.headers['ETag']
+        assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+
+        acquires = app.db_pool.get_metrics()['acquires']
+        second = client.get(url, headers={'If-None-Match': etag})
+        print(f"  {url}: {second.status_code} {etag}")
+
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+        assert app.db_pool.get_metrics()['acquires'] == acquires
+
+def test_writes_change_only_affected_etags(client):
+    """Deleting an exam changes the exams ETag but not the fees ETag"""
+    exams_etag = client.get('/api/exams').headers['ETag']
+    fees_etag = client.get('/api/fees').headers['ETag']
+
+    assert client.delete('/api/exams/1').status_code == 200
+
+    exams = client.get('/api/exams', headers={'If-None-Match': exams_etag})
+    fees = client.get('/api/fees', headers={'If-None-Match': fees_etag})
+
+    assert exams.status_code == 200 and exams.headers['ETag'] != exams_etag
+    assert fees.status_code == 304
+
+def test_query_string_is_part_of_the_etag(client):
+    """Different parameters on the same path must not share an ETag"""
+    assert client.get('/api/exams').headers['ETag'] != client.get('/api/exams?x=1').headers['ETag']
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING CONDITIONAL GET")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,73 @@
+"""
+Test the pooled database connections: release after a request, reuse and metrics
+Run with: python test_connection_pool.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+@pytest.fixture
+def pool(database, monkeypatch):
+    """A fresh pool so the metrics start from zero"""
+    pool = app.ConnectionPool(2)
+    monkeypatch.setattr(app, 'db_pool', pool)
+    return pool
+
+def test_requests_return_and_reuse_connections(client, pool):
+    acquired = []
+    acquire = pool.acquire
+
+    def record_acquire(database):
+        conn = acquire(database)
+        acquired.append(conn)
+        return conn
+
+    pool.acquire = record_acquire
+
+    assert client.get('/api/students').status_code == 200
+    metrics = pool.get_metrics()
+    print(f"  After one request: {metrics}")
+    assert (metrics['acquires'], metrics['opens'], metrics['hits'], metrics['idle']) == (1, 1, 0, 1)
+    assert not acquired[0].checked_out
+
+    assert client.get('/api/students/count').status_code == 200
+    metrics = pool.get_metrics()
+    print(f"  After two requests: {metrics}")
+    assert (metrics['acquires'], metrics['opens'], metrics['hits'], metrics['idle']) == (2, 1, 1, 1)
+    assert acquired[1] is acquired[0]
+    assert client.get('/api/system/db-pool').get_json()['pool']['hit_rate'] == 50.0
+
+def test_one_connection_per_request(pool):
+    with app.app.test_request_context('/'):
+        conn = app.get_db_connection()
+        conn.close()
+        assert app.get_db_connection() is conn
+        assert conn.checked_out
+    assert not conn.checked_out
+
+    metrics = pool.get_metrics()
+    assert (metrics['acquires'], metrics['request_reuses'], metrics['idle']) == (1, 1, 1)
+
+def test_release_rolls_back_uncommitted_work(pool):
+    conn = app.get_db_connection()
+    conn.execute("UPDATE students SET name = 'Changed' WHERE student_id = 1")
+    conn.close()
+
+    again = app.get_db_connection()
+    assert again is conn
+    assert again.execute('SELECT name FROM students WHERE student_id = 1').fetchone()[0] != 'Changed'
+    again.close()
+
+    # Connections to another database file are discarded rather than handed out
+    other = pool.acquire(app.DATABASE + '-other')
+    assert other is not conn
+    other.close()
+    assert pool.get_metrics()['opens'] == 2
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING DATABASE CONNECTION POOL")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,79 @@
+"""
+Test the dashboard Server-Sent Events stream: initial payloads, deltas on writes and idle keepalives
+Run with: python test_dashboard_stream.py (or pytest)
+"""
+import json
+import sys
+import time
+
+import pytest
+
+import app
+
+def open_stream(client, stream):
+    response = client.get(f'/api/stream/{stream}', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    return response, iter(response.response)
+
+def parse_message(chunk):
+    """Return (event, data) for an SSE message, or (None, raw text) for comments/retry"""
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(': ', 1) for line in text.strip().splitlines() if not line.startswith(':'))
+    if 'event' not in fields:
+        return None, text
+    return fields['event'], json.loads(fields['data'])
+
+def feed_metrics(client):
+    return client.get('/api/system/change-feed').get_json()['feed']
+
+def test_stream_sends_full_payloads_then_deltas(client):
+    """Connecting sends every event in full; a write pushes only the changed keys"""
+    response, messages = open_stream(client, 'dashboard')
+
+    assert next(messages).startswith(b'retry:')
+    initial = dict(parse_message(next(messages)) for _ in range(4))
+    assert set(initial) == {'stats', 'attendance-data', 'performance-data', 'alerts'}
+    assert feed_metrics(client)['subscribers'] == 1
+
+    tomorrow = time.strftime('%Y-%m-%d', time.localtime(time.time() + 86400))
+    client.post('/api/exams', json={
+        'exam_name': 'Stream Test', 'class': 'Class 10', 'subject': 'Math',
+        'exam_date': tomorrow, 'start_time': '09:00', 'end_time': '11:00', 'max_marks': 100
+    })
+
+    event, delta = parse_message(next(messages))
+    print(f"  Delta after adding an exam: {event} {delta}")
+    assert event == 'stats'
+    assert delta == {'upcoming_exams': initial['stats']['upcoming_exams'] + 1}
+
+    response.close()
+    assert feed_metrics(client)['subscribers'] == 0
+
+def test_idle_stream_and_extra_clients_run_no_queries(client, monkeypatch):
+    """Keepalives and additional subscribers reuse the shared snapshots"""
+    monkeypatch.setattr(app, 'DASHBOARD_STREAM_HEARTBEAT_SECONDS', 0.05)
+
+    first, first_messages = open_stream(client, 'teacher-dashboard')
+    next(first_messages)
+    next(first_messages)
+    computed = feed_metrics(client)['snapshot_computations']
+
+    second, second_messages = open_stream(client, 'teacher-dashboard')
+    next(second_messages)
+    assert parse_message(next(second_messages))[0] == 'stats'
+
+    assert next(first_messages) == b': keepalive\n\n'
+    assert next(second_messages) == b': keepalive\n\n'
+    assert feed_metrics(client)['snapshot_computations'] == computed
+    first.close()
+    second.close()
+
+def test_unknown_stream(client):
+    assert client.get('/api/stream/nope').status_code == 404
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING DASHBOARD STREAM")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,119 @@
+"""
+Test the email outbox against the local stand-in SMTP server
+Run with: python test_email_outbox.py (or pytest)
+"""
+import sys
+import time
+
+import pytest
+
+import app
+from local_smtp_server import LocalSMTPServer
+
+@pytest.fixture
+def smtp_server(database, monkeypatch):
+    """Local stand-in SMTP server the app sends through, stopped with its workers afterwards"""
+    server = LocalSMTPServer().start()
+    monkeypatch.setattr(app, 'MAIL_SERVER', '127.0.0.1')
+    monkeypatch.setattr(app, 'MAIL_PORT', server.port)
+    monkeypatch.setattr(app, 'MAIL_USE_TLS', False)
+    monkeypatch.setattr(app, 'MAIL_PASSWORD', '')
+    monkeypatch.setattr(app, 'EMAIL_RETRY_BASE_SECONDS', 0.1)
+    yield server
+    app.email_outbox.stop()
+    app.smtp_pool.close_all()
+    server.stop()
+
+def wait_for_outbox(client, timeout=10):
+    """Wait until the outbox has no queued or sending rows"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        outbox = client.get('/api/teacher/email-outbox').get_json()['outbox']
+        if outbox['queue_depth'] == 0:
+            return outbox
+        time.sleep(0.05)
+    raise AssertionError('Outbox did not drain in time')
+
+def test_save_attendance_queues_absence_email(client, smtp_server):
+    """Saving attendance should return before the email is delivered"""
+    # Student 1 (Rahul Sharma) has a parent email in the sample data
+    response = client.post('/api/teacher/attendance/save', json={
+        'attendance': [{'student_id': 1, 'date': '2026-02-04', 'status': 'Absent'}]
+    })
+    data = response.get_json()
+    print(f"  Save response: {data['message']}")
+
+    assert data['success']
+    assert data['emails_queued'] == 1
+
+    outbox = wait_for_outbox(client)
+    print(f"  Outbox: {outbox}")
+
+    assert outbox['counts']['sent'] == 1
+    assert len(smtp_server.messages) == 1
+    assert 'Rahul Sharma' in smtp_server.messages[0]['data']
+
+    conn = app.get_db_connection()
+    log = conn.execute('SELECT status FROM alert_logs WHERE student_id = 1').fetchone()
+    conn.close()
+    assert log['status'] == 'sent'
+
+def test_failed_delivery_is_retried(client, smtp_server):
+    """A temporary SMTP failure should be retried with backoff"""
+    smtp_server.fail_next = 1
+
+    response = client.post('/api/teacher/attendance/low/notify', json={
+        'students': [{'student_id': 1, 'total_days': 10, 'present': 6, 'absent': 4, 'percentage': 60.0}]
+    })
+    assert response.get_json()['emails_queued'] == 1
+
+    outbox = wait_for_outbox(client)
+    print(f"  Outbox after retry: {outbox}")
+
+    assert outbox['counts']['sent'] == 1
+    assert len(smtp_server.messages) == 1
+
+    conn = app.get_db_connection()
+    row = conn.execute('SELECT attempts FROM email_outbox').fetchone()
+    conn.close()
+    assert row['attempts'] == 2
+
+def test_smtp_pool_reuses_and_reconnects_sessions(smtp_server):
+    """Batches should share one SMTP session and survive a dropped connection"""
+    messages = [
+        app.build_absence_notification('Rahul Sharma', '10A001', 'Class 10', 'A', '2026-02-04', f'parent{i}@example.com')
+        for i in range(5)
+    ]
+
+    assert app.smtp_pool.send_batch(messages) == [None] * 5
+    assert app.smtp_pool.send_batch(messages) == [None] * 5
+    assert smtp_server.sessions == 1
+
+    # Drop the idle session behind the pool's back
+    app.smtp_pool._idle[-1].close()
+    assert app.smtp_pool.send_batch(messages[:1]) == [None]
+    print(f"  SMTP pool: {app.smtp_pool.get_metrics()}")
+
+    assert smtp_server.sessions == 2
+    assert len(smtp_server.messages) == 11
+
+def test_workers_start_only_in_serving_process(database, monkeypatch):
+    """Under the debug reloader only the child (WERKZEUG_RUN_MAIN=true) runs the workers"""
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+    assert not app.start_background_workers(debug=True)
+    assert not app.email_outbox.is_running()
+
+    monkeypatch.setenv('WERKZEUG_RUN_MAIN', 'true')
+    assert app.start_background_workers(debug=True)
+    assert app.email_outbox.is_running()
+    app.email_outbox.stop()
+
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN')
+    assert app.start_background_workers(debug=False)
+    app.email_outbox.stop()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING EMAIL OUTBOX")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
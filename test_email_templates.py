@@ -0,0 +1,79 @@
+"""
+Test the compiled email templates and the messages built from them
+Run with: python test_email_templates.py (or pytest)
+"""
+import sys
+from email.mime.text import MIMEText
+
+import pytest
+
+import app
+
+def bodies(msg):
+    """{content type: decoded body} for the parts of a multipart/alternative message"""
+    return {part.get_content_type(): part.get_payload(decode=True).decode('utf-8') for part in msg.get_payload()}
+
+@pytest.mark.parametrize('builder, args, subject, expected', [
+    (app.build_absence_notification,
+     ('Rähul Sharma', '10A001', 'Class 10', 'A', '2026-02-04'),
+     '🔔 Absence Notification',
+     ['Rähul Sharma', '10A001', 'Class 10-A', '04/02/2026']),
+    (app.build_absence_streak_alert,
+     ('Priya Patel', '10A002', 'Class 10', 'A', 4, '2026-02-02'),
+     '⚠️ Consecutive Absence Alert - Priya Patel',
+     ['Priya Patel', '4 consecutive', '02/02/2026']),
+    (app.build_low_attendance_alert,
+     ('Amit <Kumar>', '9B001', 'Class 9', 'B', 20, 12, 8, 60.0),
+     '🚨 Low Attendance Alert - Amit <Kumar>',
+     ['12', '8', '60.0%']),
+])
+def test_alert_templates(builder, args, subject, expected):
+    msg = builder(*args, 'parent@example.com')
+    assert msg['Subject'] == subject
+    assert (msg['From'], msg['To']) == (app.MAIL_DEFAULT_SENDER, 'parent@example.com')
+    assert msg.get_content_type() == 'multipart/alternative'
+
+    text, html = bodies(msg)['text/plain'], bodies(msg)['text/html']
+    for value in expected:
+        assert value in text, value
+    assert args[0] in text
+    # Only the HTML body is escaped
+    assert str(app.Markup.escape(args[0])) in html
+
+    # The shared part headers match what MIMEText would have produced
+    for part in msg.get_payload():
+        reference = MIMEText(part.get_payload(decode=True).decode('utf-8'), part.get_content_subtype(), 'utf-8')
+        assert part.items() == reference.items()
+        assert part.as_bytes() == reference.as_bytes()
+
+def test_every_template_pair_is_compiled():
+    for name in ('absence', 'absence_streak', 'low_attendance', 'teacher_message'):
+        assert isinstance(app.email_templates.pair(name), app.EmailTemplate)
+
+def test_teacher_message(client, monkeypatch):
+    sent = []
+    monkeypatch.setattr(app.smtp_pool, 'send', sent.append)
+
+    response = client.post('/api/teacher/messages/send', json={
+        'recipient_type': 'parent', 'recipient': 1, 'subject': 'Trip', 'priority': 'high',
+        'body': 'Bring <lunch>\nand water'
+    })
+    assert response.status_code == 200
+    conn = app.get_db_connection()
+    student = conn.execute('SELECT name, parent_email FROM students WHERE student_id = 1').fetchone()
+    conn.close()
+
+    msg = sent[0]
+    print(f"  {msg['Subject']} -> {msg['To']}")
+    assert msg['Subject'] == '[HIGH PRIORITY] Trip'
+    assert (msg['From'], msg['To']) == (app.MAIL_DEFAULT_SENDER, student['parent_email'])
+    text, html = bodies(msg)['text/plain'], bodies(msg)['text/html']
+    assert f"Dear Parent of {student['name']}," in text
+    assert 'HIGH PRIORITY' in text and 'Bring <lunch>\nand water' in text
+    assert 'Bring &lt;lunch&gt;<br>and water' in html
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING EMAIL TEMPLATES")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,138 @@
+"""
+Test bulk fee generation and the bank payment CSV import
+Run with: python test_fee_import.py (or pytest)
+"""
+import io
+import sys
+import time
+
+import pytest
+
+import app
+
+def balance_rows(conn):
+    students = [tuple(row) for row in conn.execute('SELECT * FROM student_fee_balances ORDER BY student_id')]
+    classes = [tuple(row) for row in conn.execute('SELECT * FROM class_fee_balances ORDER BY class')]
+    return students, classes
+
+def assert_balances_match_rebuild(conn):
+    incremental = balance_rows(conn)
+    app.rebuild_fee_balances(conn)
+    assert balance_rows(conn) == incremental
+
+def test_generate_fees_for_classes(client):
+    """One fee per active student of the scheduled classes; retries bill nobody twice"""
+    conn = app.get_db_connection()
+    conn.execute("UPDATE students SET status = 'inactive' WHERE roll_no = '10A001'")
+    conn.commit()
+    expected = conn.execute(
+        "SELECT COUNT(*) FROM students WHERE class IN ('Class 10', 'Class 9') AND status = 'active'"
+    ).fetchone()[0]
+    fees_before = conn.execute('SELECT COUNT(*) FROM fees').fetchone()[0]
+    conn.close()
+
+    request = {'due_date': '2099-04-30', 'schedule': {'Class 10': 15000, 'Class 9': 12000}}
+    preview = client.post('/api/fees/generate', json={**request, 'dry_run': True}).get_json()
+    assert preview['total_created'] == expected
+
+    response = client.post('/api/fees/generate', json=request).get_json()
+    print(f"  Created: {response['created']}")
+    assert response['total_created'] == expected
+    assert client.post('/api/fees/generate', json=request).get_json()['total_created'] == 0
+
+    conn = app.get_db_connection()
+    assert conn.execute('SELECT COUNT(*) FROM fees').fetchone()[0] == fees_before + expected
+    fee = conn.execute(
+        "SELECT f.* FROM fees f JOIN students s ON s.student_id = f.student_id "
+        "WHERE s.class = 'Class 9' AND f.due_date = '2099-04-30'"
+    ).fetchone()
+    assert (fee['total_amount'], fee['pending_amount'], fee['status']) == (12000, 12000, 'pending')
+    assert_balances_match_rebuild(conn)
+    conn.close()
+
+    # Python's json accepts NaN and Infinity literals
+    for amount in ('-5', 'NaN', 'Infinity', '-Infinity', '1e999'):
+        bad = client.post('/api/fees/generate', content_type='application/json',
+                          data='{"due_date": "2099-04-30", "schedule": {"Class 9": %s}}' % amount)
+        assert bad.status_code == 400, amount
+
+def test_import_matches_rows_and_reports_errors(client):
+    """Rows match by roll_no or student_id; bad rows are reported and skipped"""
+    csv_text = (
+        'roll_no,student_id,amount,reference\n'
+        '10A002,,2000,TX-1\n'        # fee 2: 5000 pending
+        ',3,15000,TX-2\n'            # fee 3 paid off
+        'NOPE,,10,TX-3\n'
+        '10A002,,99999,TX-4\n'
+        '10A002,,abc,TX-5\n'
+        '10A002,,nan,TX-6\n'
+        '10A002,,100,TX-1\n'         # duplicate reference
+    )
+
+    preview = client.post('/api/fees/import?dry_run=1', data=csv_text).get_json()
+    assert (preview['applied'], preview['error_count']) == (2, 5)
+    conn = app.get_db_connection()
+    assert conn.execute('SELECT paid_amount FROM fees WHERE fee_id = 2').fetchone()[0] == 10000
+    conn.close()
+
+    result = client.post('/api/fees/import', data={
+        'file': (io.BytesIO(csv_text.encode('utf-8-sig')), 'payments.csv')
+    }).get_json()
+    print(f"  Errors: {result['errors']}")
+    assert (result['rows'], result['applied'], result['payments']) == (7, 2, 2)
+    assert result['total_amount'] == 17000
+    assert [error.split(':')[0] for error in result['errors']] == ['Line 4', 'Line 5', 'Line 6', 'Line 7', 'Line 8']
+
+    conn = app.get_db_connection()
+    fees = dict(conn.execute('SELECT fee_id, status FROM fees WHERE fee_id IN (2, 3)').fetchall())
+    assert fees == {2: 'pending', 3: 'paid'}
+    assert conn.execute("SELECT COUNT(*) FROM fee_payments WHERE method = 'bank_transfer'").fetchone()[0] == 2
+    assert_balances_match_rebuild(conn)
+    conn.close()
+
+    # Importing the same file again pays nothing twice
+    again = client.post('/api/fees/import', data=csv_text).get_json()
+    assert again['applied'] == 0
+    assert client.post('/api/fees/import', data='name,total\nx,1\n').status_code == 400
+
+def test_import_spreads_payment_over_open_fees(database):
+    """Without a fee_id, a payment pays the student's oldest open fee first"""
+    conn = app.get_db_connection()
+    app.generate_fees(conn, {'Class 10': 1000}, '2099-01-31')
+
+    # Student 2 owes 5000 on fee 2 (due sooner) and 1000 on the new fee
+    result = app.import_fee_payments(conn, ['roll_no,amount\n', '10A002,5500\n'])
+    assert (result['applied'], result['payments']) == (1, 2)
+    rows = conn.execute(
+        'SELECT pending_amount, status FROM fees WHERE student_id = 2 ORDER BY due_date'
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [(0, 'paid'), (500, 'pending')]
+    conn.close()
+
+def test_import_50k_rows(database):
+    """A 50k-row bank file is applied in a few seconds"""
+    conn = app.get_db_connection()
+    classes = [row[0] for row in conn.execute('SELECT DISTINCT class FROM students')]
+    app.generate_fees(conn, {class_name: 100000 for class_name in classes}, '2099-06-30')
+    roll_numbers = [row[0] for row in conn.execute("SELECT roll_no FROM students WHERE status = 'active'")]
+
+    lines = ['roll_no,amount,reference\n'] + [
+        f'{roll_numbers[i % len(roll_numbers)]},1.25,BANK-{i}\n' for i in range(50000)
+    ]
+    started = time.time()
+    result = app.import_fee_payments(conn, lines)
+    elapsed = time.time() - started
+    print(f"  50k rows in {elapsed:.2f}s: {result['payments']} payment(s)")
+
+    assert (result['applied'], result['error_count']) == (50000, 0)
+    assert result['total_amount'] == 62500
+    assert elapsed < 10
+    assert conn.execute("SELECT COUNT(*) FROM fee_payments WHERE method = 'bank_transfer'").fetchone()[0] == 50000
+    assert_balances_match_rebuild(conn)
+    conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING FEE GENERATION AND PAYMENT IMPORT")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
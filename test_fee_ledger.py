@@ -0,0 +1,121 @@
+"""
+Test the fee payments ledger and the outstanding balance summaries kept in step with fees
+Run with: python test_fee_ledger.py (or pytest)
+"""
+import sqlite3
+import sys
+
+import pytest
+
+import app
+
+def balance_rows(conn):
+    students = [tuple(row) for row in conn.execute('SELECT * FROM student_fee_balances ORDER BY student_id')]
+    classes = [tuple(row) for row in conn.execute('SELECT * FROM class_fee_balances ORDER BY class')]
+    return students, classes
+
+def ledger_mismatches(conn):
+    """Fees whose paid_amount differs from the sum of their ledger entries"""
+    return conn.execute(
+        '''SELECT f.fee_id, f.paid_amount, COALESCE(SUM(p.amount), 0) AS ledger
+           FROM fees f
+           LEFT JOIN fee_payments p ON p.fee_id = f.fee_id
+           GROUP BY f.fee_id
+           HAVING ABS(f.paid_amount - ledger) > 0.001'''
+    ).fetchall()
+
+def test_payments_append_to_ledger_and_move_balances(client):
+    """Partial and final payments are ledger entries; balances equal a full rebuild"""
+    # Fee 2: 15000 total, 10000 paid
+    first = client.post('/api/fees/2/payment', json={'payment_amount': 2000, 'method': 'card', 'reference': 'R-1'})
+    assert first.status_code == 200
+    assert first.get_json()['new_status'] == 'pending'
+    final = client.post('/api/fees/2/payment', json={'payment_amount': 3000})
+    assert final.get_json()['new_status'] == 'paid'
+
+    history = client.get('/api/fees/2/payments').get_json()
+    print(f"  Fee 2 ledger: {[(p['amount'], p['method']) for p in history['payments']]}")
+    assert [p['method'] for p in history['payments']] == ['opening_balance', 'card', 'cash']
+    assert history['total_paid'] == 15000
+
+    conn = app.get_db_connection()
+    assert ledger_mismatches(conn) == []
+    incremental = balance_rows(conn)
+    student = conn.execute('SELECT * FROM student_fee_balances WHERE student_id = 2').fetchone()
+    assert (student['pending_amount'], student['open_fees']) == (0, 0)
+
+    app.rebuild_fee_balances(conn)
+    assert balance_rows(conn) == incremental
+    conn.close()
+
+def test_overpayment_is_rejected(client):
+    """A payment above the pending amount changes nothing"""
+    conn = app.get_db_connection()
+    before = balance_rows(conn)
+    payments = conn.execute('SELECT COUNT(*) FROM fee_payments').fetchone()[0]
+    conn.close()
+
+    response = client.post('/api/fees/2/payment', json={'payment_amount': 5000.01})
+    assert response.status_code == 400
+    assert client.post('/api/fees/999/payment', json={'payment_amount': 10}).status_code == 404
+    assert client.post('/api/fees/2/payment', json={'payment_amount': 'abc'}).status_code == 400
+    assert client.post('/api/fees/2/payment', json={'payment_amount': 'NaN'}).status_code == 400
+    for field, value in (('method', ['cash']), ('reference', {'id': 1}), ('received_by', 7), ('reference', 'R' * 101)):
+        response = client.post('/api/fees/2/payment', json={'payment_amount': 10, field: value})
+        assert response.status_code == 400, (field, value)
+
+    conn = app.get_db_connection()
+    assert balance_rows(conn) == before
+    assert conn.execute('SELECT COUNT(*) FROM fee_payments').fetchone()[0] == payments
+    conn.close()
+
+def test_ledger_is_append_only(database):
+    """Ledger entries cannot be edited or deleted"""
+    conn = app.get_db_connection()
+    for statement in ('UPDATE fee_payments SET amount = 1', 'DELETE FROM fee_payments'):
+        try:
+            conn.execute(statement)
+        except sqlite3.DatabaseError as e:
+            assert 'append-only' in str(e)
+        else:
+            raise AssertionError(f'{statement} was allowed')
+    conn.rollback()
+    conn.close()
+
+def test_summary_and_stats_read_balances(client):
+    """The fees summary and dashboard counts come from class_fee_balances"""
+    conn = app.get_db_connection()
+    open_fees = conn.execute("SELECT COUNT(*) FROM fees WHERE status IN ('pending', 'overdue')").fetchone()[0]
+    pending = conn.execute('SELECT SUM(pending_amount) FROM fees').fetchone()[0]
+    conn.close()
+
+    summary = client.get('/api/fees/summary').get_json()
+    print(f"  Totals: {summary['totals']}")
+    assert summary['totals']['open_fees'] == open_fees
+    assert summary['totals']['pending_amount'] == pending
+    assert client.get('/api/stats').get_json()['pending_fees_count'] == open_fees
+
+    # Paying off fee 2 invalidates the cached summary
+    client.post('/api/fees/2/payment', json={'payment_amount': 5000})
+    summary = client.get('/api/fees/summary').get_json()
+    assert summary['totals']['open_fees'] == open_fees - 1
+    assert summary['totals']['pending_amount'] == pending - 5000
+
+def test_migration_backfills_older_databases(database):
+    """An older database without the ledger gets opening entries and balances"""
+    conn = app.get_db_connection()
+    expected = balance_rows(conn)
+    for table in ('fee_payments', 'student_fee_balances', 'class_fee_balances'):
+        conn.execute(f'DROP TABLE {table}')
+    conn.commit()
+
+    app.migrate_database(conn)
+    assert balance_rows(conn) == expected
+    assert ledger_mismatches(conn) == []
+    conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING FEE LEDGER")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
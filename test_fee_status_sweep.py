@@ -0,0 +1,102 @@
+"""
+Test the daily sweep that marks pending fees past their due date as overdue
+Run with: python test_fee_status_sweep.py (or pytest)
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+
+def days_from_today(days):
+    return (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+
+def test_sweep_marks_past_due_fees_overdue(client):
+    """Only pending fees due before today flip; balances equal a full rebuild"""
+    conn = app.get_db_connection()
+    # Fee 2 (due in 5 days) is pending; fee 9 is due today and stays pending
+    conn.execute('UPDATE fees SET due_date = ? WHERE fee_id = 2', (days_from_today(-1),))
+    conn.execute('UPDATE fees SET due_date = ? WHERE fee_id = 9', (days_from_today(0),))
+    conn.commit()
+    overdue_before = conn.execute("SELECT COUNT(*) FROM fees WHERE status = 'overdue'").fetchone()[0]
+
+    fee_ids = app.sweep_overdue_fees(conn)
+    print(f"  Marked overdue: {fee_ids}")
+    assert fee_ids == [2]
+    statuses = dict(conn.execute('SELECT fee_id, status FROM fees WHERE fee_id IN (2, 9)').fetchall())
+    assert statuses == {2: 'overdue', 9: 'pending'}
+
+    sweep = conn.execute('SELECT * FROM fee_status_sweeps ORDER BY sweep_id DESC').fetchone()
+    assert (sweep['fees_updated'], json.loads(sweep['fee_ids'])) == (1, [2])
+
+    incremental = [tuple(row) for row in conn.execute('SELECT * FROM class_fee_balances ORDER BY class')]
+    app.rebuild_fee_balances(conn)
+    assert [tuple(row) for row in conn.execute('SELECT * FROM class_fee_balances ORDER BY class')] == incremental
+
+    # A second run the same day changes nothing
+    assert app.sweep_overdue_fees(conn) == []
+    conn.close()
+
+    summary = client.get('/api/fees/summary').get_json()
+    assert summary['totals']['overdue_fees'] == overdue_before + 1
+
+def test_sweep_invalidates_cached_fees(client):
+    """Cached fee responses show the new status after a sweep"""
+    before = client.get('/api/fees/summary').get_json()['totals']['overdue_fees']
+
+    conn = app.get_db_connection()
+    conn.execute('UPDATE fees SET due_date = ? WHERE fee_id = 5', (days_from_today(-3),))
+    conn.commit()
+    app.sweep_overdue_fees(conn)
+    conn.close()
+
+    assert client.get('/api/fees/summary').get_json()['totals']['overdue_fees'] == before + 1
+    fees = client.get('/api/fees').get_json()['fees']
+    assert next(fee for fee in fees if fee['fee_id'] == 5)['status'] == 'overdue'
+
+def test_sweep_uses_status_due_index(database):
+    """The sweep predicate is a range search on idx_fees_status_due"""
+    conn = app.get_db_connection()
+    plan = [row['detail'] for row in conn.execute(
+        "EXPLAIN QUERY PLAN UPDATE fees SET status = 'overdue' WHERE status = 'pending' AND due_date < ?",
+        (days_from_today(0),)
+    )]
+    print(f"  Plan: {plan}")
+    assert any('idx_fees_status_due' in detail for detail in plan), plan
+    conn.close()
+
+def test_daily_job_schedule():
+    """The job waits until the configured time, tomorrow once it has passed"""
+    job = app.DailyJob('test-job', lambda: None, at=(0, 5))
+    assert job.seconds_until_next_run(datetime(2026, 3, 2, 0, 0)) == 300
+    assert job.seconds_until_next_run(datetime(2026, 3, 2, 0, 5)) == 24 * 3600
+    assert job.seconds_until_next_run(datetime(2026, 3, 2, 12, 0)) == 12 * 3600 + 300
+
+def test_daily_job_runs_on_start():
+    """Starting the job runs it once right away and stop() ends the thread"""
+    runs = []
+    job = app.DailyJob('test-job', lambda: runs.append(1))
+    job.start()
+    job.stop()
+    assert runs == [1]
+    assert not job.is_running()
+
+def test_sweeper_starts_only_in_serving_process(database, monkeypatch):
+    """The reloader's watcher process must not run the sweep (its invalidations never reach the server)"""
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+    app.start_background_workers(debug=True)
+    assert not app.fee_status_sweeper.is_running()
+
+    monkeypatch.setenv('WERKZEUG_RUN_MAIN', 'true')
+    app.start_background_workers(debug=True)
+    assert app.fee_status_sweeper.is_running()
+    app.fee_status_sweeper.stop()
+    app.email_outbox.stop()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING FEE STATUS SWEEP")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
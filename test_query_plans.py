@@ -0,0 +1,148 @@
+"""
+Test that attendance report queries keep using indexes
+Run with: python test_query_plans.py (or pytest)
+"""
+import sqlite3
+
+from app import (build_monthly_attendance_query, build_student_filters, fetch_student_page,
+                 migrate_database, month_date_range, STUDENT_DETAIL_FIELDS)
+
+def create_test_database():
+    """Create an in-memory database from schema.sql with migrations applied"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    with open('schema.sql', 'r') as f:
+        conn.executescript(f.read())
+    migrate_database(conn)
+    return conn
+
+def query_plan(conn, query, params):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    return [row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params)]
+
+def assert_no_scan(plan, table_alias):
+    """Fail if the plan contains a full scan of the given table"""
+    for detail in plan:
+        words = detail.split()
+        assert words[:2] != ['SCAN', table_alias], f'Full table scan: {detail}'
+
+def test_monthly_report_uses_rollup_key():
+    """Monthly report should look up the rollup by primary key, one row per student"""
+    conn = create_test_database()
+
+    for class_name, section in [('', ''), ('Class 10', ''), ('Class 10', 'A')]:
+        query, params = build_monthly_attendance_query('2026-02', class_name, section)
+        plan = query_plan(conn, query, params)
+        print(f"  {class_name or 'All'} {section}: {plan}")
+
+        assert_no_scan(plan, 'r')
+        assert any('PRIMARY KEY' in d and d.startswith('SEARCH r') for d in plan), plan
+
+    conn.close()
+
+def test_month_range_is_sargable():
+    """Month filters on daily_attendance must be plain date ranges using an index"""
+    assert month_date_range('2026-12') == ('2026-12-01', '2027-01-01')
+    assert month_date_range('2026-02') == ('2026-02-01', '2026-03-01')
+
+    conn = create_test_database()
+    plan = query_plan(
+        conn,
+        '''SELECT student_id, status FROM daily_attendance
+           WHERE date >= ? AND date < ?''',
+        list(month_date_range('2026-02'))
+    )
+    print(f"  Month range: {plan}")
+
+    assert_no_scan(plan, 'daily_attendance')
+    assert any('idx_daily_attendance_date_student' in d for d in plan), plan
+    conn.close()
+
+def test_daily_report_uses_date_index():
+    """Daily attendance lookups by date should not scan daily_attendance"""
+    conn = create_test_database()
+
+    plan = query_plan(
+        conn,
+        '''SELECT a.*, s.name, s.class, s.section
+           FROM daily_attendance a
+           JOIN students s ON a.student_id = s.student_id
+           WHERE a.date = ?''',
+        ['2026-02-04']
+    )
+    print(f"  Daily: {plan}")
+
+    assert_no_scan(plan, 'a')
+    assert any('idx_daily_attendance_date_student' in d for d in plan), plan
+
+    conn.close()
+
+def test_teacher_report_uses_date_index():
+    """Teacher attendance date-range lookups should use the date index"""
+    conn = create_test_database()
+
+    plan = query_plan(
+        conn,
+        '''SELECT teacher_id, date, status, remarks
+           FROM teacher_attendance
+           WHERE date BETWEEN ? AND ?''',
+        ['2026-02-01', '2026-02-28']
+    )
+    print(f"  Teacher: {plan}")
+
+    assert_no_scan(plan, 'teacher_attendance')
+
+    conn.close()
+
+def traced_statement(conn, call, marker):
+    """Run call() and return the first SQL statement it issued containing marker"""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    call()
+    conn.set_trace_callback(None)
+    return next(statement for statement in statements if marker in statement)
+
+def test_student_pages_use_keyset_index():
+    """Later student pages should seek into the (class, section, roll_no) index"""
+    conn = create_test_database()
+    statement = traced_statement(conn, lambda: fetch_student_page(
+        conn, STUDENT_DETAIL_FIELDS, ['student_id', 'name'], [], [], 5,
+        ['Class 10', 'A', '10A003']
+    ), 'FROM students s')
+
+    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + statement)]
+    print(f"  Student page: {plan}")
+
+    assert_no_scan(plan, 's')
+    assert any('idx_students_class_section_roll' in d for d in plan), plan
+    assert not any('TEMP B-TREE' in d for d in plan), plan
+
+    conn.close()
+
+def test_student_search_uses_fts_index():
+    """Searches should be driven by students_fts, not a scan of students"""
+    conn = create_test_database()
+    clauses, params = build_student_filters({'search': 'rah'})
+    statement = traced_statement(conn, lambda: fetch_student_page(
+        conn, STUDENT_DETAIL_FIELDS, ['student_id', 'name'], clauses, params, 5, None
+    ), 'FROM students s')
+
+    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + statement)]
+    print(f"  Student search: {plan}")
+
+    assert_no_scan(plan, 's')
+    assert any('students_fts VIRTUAL TABLE' in d for d in plan), plan
+
+    conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING ATTENDANCE QUERY PLANS")
+    print("=" * 60)
+    test_month_range_is_sargable()
+    test_monthly_report_uses_rollup_key()
+    test_daily_report_uses_date_index()
+    test_teacher_report_uses_date_index()
+    test_student_pages_use_keyset_index()
+    test_student_search_uses_fts_index()
+    print("\n✅ All query plan checks passed!")
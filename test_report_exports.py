@@ -0,0 +1,91 @@
+"""
+Test the streaming CSV/XLSX report exports
+Run with: python test_report_exports.py (or pytest)
+"""
+import csv
+import io
+import re
+import sys
+import zipfile
+
+import pytest
+
+import app
+import report_exports
+
+def read_csv(response):
+    return list(csv.reader(io.StringIO(response.get_data().decode('utf-8-sig'))))
+
+def test_monthly_csv_matches_report(client):
+    month = app.datetime.now().strftime('%Y-%m')
+
+    response = client.get(f'/api/export/monthly-attendance?month={month}&class=Class 10')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert f'attendance_{month}.csv' in response.headers['Content-Disposition']
+
+    rows = read_csv(response)
+    report = client.get(f'/api/teacher/attendance/monthly?month={month}&class=Class 10').get_json()
+    print(f"  {len(rows) - 1} rows, first: {rows[1]}")
+    assert rows[0][0] == 'Roll No'
+    assert [(r[0], float(r[-1])) for r in rows[1:]] == [
+        (s['roll_no'], s['percentage']) for s in report['students']
+    ]
+
+def test_teacher_export_matches_report(client):
+    month = app.datetime.now().strftime('%Y-%m')
+
+    rows = read_csv(client.get(f'/api/export/teacher-attendance?month={month}'))
+    report = client.get(f'/api/teacher-attendance-report?month={month}').get_json()
+    expected = [[str(t[key]) for key in ('teacher_id', 'present', 'absent', 'leave', 'not_marked', 'total_days')]
+                for t in report['teachers']]
+    assert [[r[0]] + r[4:9] for r in rows[1:]] == expected
+    assert [float(r[9]) for r in rows[1:]] == [round(t['attendance_percentage'], 1) for t in report['teachers']]
+
+def test_xlsx_is_a_valid_workbook(client):
+    response = client.get('/api/export/exam-performance?format=xlsx')
+    assert response.status_code == 200
+    assert response.mimetype == report_exports.XLSX_MIMETYPE
+
+    workbook = zipfile.ZipFile(io.BytesIO(response.get_data()))
+    assert workbook.testzip() is None
+    sheet = workbook.read('xl/worksheets/sheet1.xml').decode('utf-8')
+
+    conn = app.get_db_connection()
+    results = conn.execute('SELECT COUNT(*) FROM performance').fetchone()[0]
+    conn.close()
+    assert len(re.findall('<row>', sheet)) == results + 1
+    assert '<t xml:space="preserve">Marks Obtained</t>' in sheet
+
+def test_writers_yield_before_the_last_row():
+    """Output arrives in chunks while rows are still being produced"""
+    produced = []
+
+    def rows():
+        for i in range(report_exports.CHUNK_ROWS * 3):
+            produced.append(i)
+            yield (i, f'name <{i}> & co')
+
+    for writer in (report_exports.csv_chunks, report_exports.xlsx_chunks):
+        produced.clear()
+        chunks = writer(['id', 'name'], rows())
+        next(chunks)
+        first_rows = len(produced)
+        remaining = list(chunks)
+        print(f"  {writer.__name__}: first chunk after {first_rows} rows, {len(remaining) + 1} chunks")
+        assert first_rows <= report_exports.CHUNK_ROWS
+        assert len(remaining) >= 3
+
+def test_bad_requests(client):
+    assert client.get('/api/export/payroll').status_code == 404
+    assert client.get('/api/export/fees?format=pdf').status_code == 400
+    assert client.get('/api/export/monthly-attendance').status_code == 400
+    assert client.get('/api/export/teacher-attendance?start_date=2026-02-10&end_date=2026-02-01').status_code == 400
+    assert client.get('/api/export/exam-performance?exam_id=x').status_code == 400
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING REPORT EXPORTS")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
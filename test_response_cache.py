@@ -0,0 +1,89 @@
+"""
+Test the dashboard response cache: hits, write-driven invalidation and LRU eviction
+Run with: python test_response_cache.py (or pytest)
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+import app
+
+def cache_metrics(client):
+    return client.get('/api/system/response-cache').get_json()['cache']
+
+def test_repeated_polls_hit_the_cache(client):
+    """A second poll of a dashboard endpoint should not recompute it"""
+    before = cache_metrics(client)
+
+    first = client.get('/api/stats').get_json()
+    second = client.get('/api/stats').get_json()
+    after = cache_metrics(client)
+
+    assert first == second
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+def test_writes_invalidate_affected_endpoints(client):
+    """Adding an exam refreshes stats/alerts but leaves the performance chart cached"""
+    client.get('/api/performance-data')
+    upcoming = client.get('/api/stats').get_json()['upcoming_exams']
+
+    tomorrow = time.strftime('%Y-%m-%d', time.localtime(time.time() + 86400))
+    response = client.post('/api/exams', json={
+        'exam_name': 'Cache Test', 'class': 'Class 10', 'subject': 'Math',
+        'exam_date': tomorrow, 'start_time': '09:00', 'end_time': '11:00', 'max_marks': 100
+    })
+    assert response.status_code in (200, 201), response.get_json()
+
+    before = cache_metrics(client)
+    assert client.get('/api/stats').get_json()['upcoming_exams'] == upcoming + 1
+    client.get('/api/performance-data')
+    after = cache_metrics(client)
+
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+def test_lru_eviction_and_ttl():
+    """The oldest entry is evicted past max_entries and entries expire after their TTL"""
+    cache = app.ResponseCache(max_entries=2)
+    compute = lambda: (200, b'{}')
+
+    cache.get_or_compute('a', frozenset(), 60, compute)
+    cache.get_or_compute('b', frozenset(), 60, compute)
+    cache.get_or_compute('a', frozenset(), 60, compute)   # 'a' is now most recent
+    cache.get_or_compute('c', frozenset(), 60, compute)   # evicts 'b'
+    cache.get_or_compute('d', frozenset(), 0.01, compute)  # evicts 'a'
+    time.sleep(0.02)
+    cache.get_or_compute('d', frozenset(), 0.01, compute)
+
+    metrics = cache.get_metrics()
+    print(f"  LRU cache: {metrics}")
+    assert (metrics['hits'], metrics['evictions'], metrics['expirations']) == (1, 2, 1)
+
+def test_concurrent_misses_compute_once():
+    """Requests arriving while a key is being computed share the one result"""
+    cache = app.ResponseCache(max_entries=4)
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 200, b'{}'
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=('k', frozenset(), 60, slow_compute))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache.get_metrics()['waits'] == 9
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING RESPONSE CACHE")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,132 @@
+"""
+Test the school calendar (terms, holidays, half-days) and its working-day index
+Run with: python test_school_calendar.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+import school_calendar
+
+def test_index_lookups():
+    calendar = school_calendar.SchoolCalendar.from_rules(
+        '2027-01-01', '2027-12-31',
+        terms=[(1, '2027-01-11', '2027-03-31'), (2, '2027-04-19', '2027-06-30')],
+        special_days=[('2027-03-03', 'holiday'), ('2027-03-05', 'half_day')]
+    )
+
+    # Weekend, holiday and the Easter break between terms are skipped; the half-day counts
+    assert calendar.working_days_between('2027-03-01', '2027-03-07') == 4
+    assert calendar.working_days_between('2027-04-01', '2027-04-18') == 0
+    assert not calendar.is_school_day('2027-03-03')
+    assert calendar.is_school_day('2027-03-05')
+    # Before the first term and after the last one every weekday counts
+    assert calendar.working_days_between('2027-01-01', '2027-01-10') == 6
+    assert calendar.working_days_between('2027-12-27', '2027-12-31') == 5
+
+    assert calendar.nth_school_day(1, after='2027-04-01') == '2027-04-19'
+    assert calendar.nth_school_day(3, after='2027-03-01') == '2027-03-04'
+    assert calendar.ordinal(calendar.nth_school_day(40)) == 40
+    assert calendar.ordinal('2027-03-06') is None
+
+    rows = calendar.rows()
+    assert [row[1] for row in rows] == list(range(1, len(rows) + 1))
+    assert dict((row[0], row[2:]) for row in rows)['2027-03-05'] == (1, 1)
+
+def test_calendar_api_and_working_days(client):
+    response = client.post('/api/calendar/terms', json={
+        'name': 'Spring 2027', 'start_date': '2027-01-11', 'end_date': '2027-03-31'
+    })
+    assert response.status_code == 201
+    assert client.post('/api/calendar/terms', json={
+        'name': 'Overlap', 'start_date': '2027-03-01', 'end_date': '2027-04-30'
+    }).status_code == 400
+    client.post('/api/calendar/holidays', json={'holidays': [
+        {'date': '2027-03-03', 'name': 'Founders Day'},
+        {'date': '2027-03-05', 'name': 'Sports Day', 'kind': 'half_day'},
+    ]})
+
+    data = client.get('/api/calendar/working-days?start_date=2027-03-01&end_date=2027-03-07&nth=3').get_json()
+    print(f"  {data}")
+    assert (data['working_days'], data['first_school_day'], data['last_school_day']) == (4, '2027-03-01', '2027-03-05')
+    assert data['nth_school_day'] == '2027-03-04'
+
+    terms = client.get('/api/calendar/terms').get_json()['terms']
+    assert terms[0]['school_days'] == 57
+
+    assert client.post('/api/calendar/holidays', json={'date': '2027-03-08', 'kind': 'strike'}).status_code == 400
+    for body in ({'holidays': [1]}, {'holidays': 'x'}, {'date': '2027-03-08', 'name': 5},
+                 {'date': '2027-03-08', 'kind': ['holiday']}, [1]):
+        response = client.post('/api/calendar/holidays', json=body)
+        assert response.status_code == 400, body
+    assert client.post('/api/calendar/holidays', json={'holidays': [1]}).get_json()['error'] == 'Holiday 0: must be an object'
+    assert client.get('/api/calendar/working-days?month=2027-13').status_code == 400
+
+def test_monthly_report_counts_school_days(client):
+    client.post('/api/calendar/holidays', json={'date': '2025-02-14', 'name': 'Holiday'})
+
+    data = client.get('/api/teacher/attendance/monthly?month=2025-02').get_json()
+    assert data['working_days'] == 19
+    assert all(s['unmarked_days'] == 19 - s['total_days'] for s in data['students'])
+
+def test_low_attendance_streaks_skip_non_school_days(client):
+    """Rates match the monthly report (every record); streaks only run over school days"""
+    client.post('/api/calendar/holidays', json={'date': '2027-03-03', 'name': 'Founders Day'})
+    client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': 1, 'date': '2027-03-01', 'status': 'Present'},
+        {'student_id': 1, 'date': '2027-03-03', 'status': 'Absent'},
+        {'student_id': 1, 'date': '2027-03-06', 'status': 'Absent'},
+        {'student_id': 2, 'date': '2027-03-01', 'status': 'Absent'},
+    ]})
+    app.email_outbox.stop()
+
+    students = client.get('/api/teacher/attendance/low?month=2027-03').get_json()['students']
+    students = {s['student_id']: s for s in students if s['student_id'] in (1, 2)}
+    assert (students[1]['total_days'], students[1]['percentage']) == (3, 33.3)
+    assert students[1]['current_absence_streak'] == 0
+    assert students[2]['current_absence_streak'] == 1
+
+def test_reads_never_widen_the_stored_index(client):
+    """Ranges outside the stored index are computed in memory; ranges past the cap are rejected"""
+    conn = app.get_db_connection()
+    stored = conn.execute('SELECT COUNT(*), MIN(date) FROM school_days').fetchone()
+    conn.close()
+    year = int(stored[1][:4]) - 1
+    assert year >= app.datetime.now().year - app.CALENDAR_RANGE_YEARS
+
+    data = client.get(f'/api/calendar/working-days?start_date={year}-03-01&end_date={year}-03-07').get_json()
+    assert data['working_days'] == 5
+    report = client.get(f'/api/teacher-attendance-report?start_date={year}-03-01&end_date={year}-03-07')
+    assert report.get_json()['teachers'][0]['total_days'] == 5
+
+    for query in ('start_date=1000-01-01&end_date=2999-12-31', 'month=1999-01',
+                  f'start_date={year}-01-01&end_date={year}-01-31&after=1900-01-01'):
+        assert client.get(f'/api/calendar/working-days?{query}').status_code == 400, query
+    assert client.get('/api/teacher-attendance-report?start_date=1000-01-01&end_date=2999-12-31').status_code == 400
+    assert client.get('/api/teacher/attendance/monthly?month=1000-01').status_code == 400
+    assert client.get('/api/teacher/attendance/low?month=2999-01').status_code == 400
+
+    conn = app.get_db_connection()
+    assert tuple(conn.execute('SELECT COUNT(*), MIN(date) FROM school_days').fetchone()) == tuple(stored)
+    conn.close()
+
+def test_migration_builds_index_for_older_databases(database):
+    conn = app.get_db_connection()
+    conn.execute('DROP TABLE school_days')
+    conn.execute('DROP TABLE school_terms')
+    conn.execute('DROP TABLE school_holidays')
+    conn.execute('CREATE TABLE school_holidays (date DATE PRIMARY KEY, name TEXT NOT NULL)')
+    conn.execute("INSERT INTO school_holidays VALUES ('2027-03-03', 'Founders Day')")
+    conn.commit()
+
+    app.migrate_database(conn)
+    calendar = school_calendar.load_school_calendar(conn)
+    conn.close()
+    assert calendar.working_days_between('2027-03-01', '2027-03-07') == 4
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING SCHOOL CALENDAR")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
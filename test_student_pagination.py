@@ -0,0 +1,70 @@
+"""
+Test keyset pagination, field projection and counts for the student list APIs
+Run with: python test_student_pagination.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def fetch_all_pages(client, url):
+    """Follow next_cursor until the last page; returns every student and the page count"""
+    students = []
+    pages = 0
+    cursor = ''
+    while True:
+        data = client.get(f'{url}&cursor={cursor}').get_json()
+        students.extend(data['students'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return students, pages
+
+def test_pages_cover_every_student_in_order(client):
+    """Walking the cursor should return each student once, in (class, section, roll_no) order"""
+    students, pages = fetch_all_pages(client, '/api/teacher/students/all?limit=4')
+    print(f"  {len(students)} students over {pages} pages")
+
+    conn = app.get_db_connection()
+    expected = [row['student_id'] for row in conn.execute(
+        'SELECT student_id FROM students ORDER BY class, section, roll_no'
+    )]
+    conn.close()
+
+    assert [s['student_id'] for s in students] == expected
+    assert pages == -(-len(expected) // 4)
+
+    count = client.get('/api/students/count').get_json()
+    assert count['total'] == len(expected)
+
+    # Every page still reports the total across all pages
+    page = client.get('/api/teacher/students/all?limit=4').get_json()
+    assert (page['count'], page['total']) == (4, len(expected))
+    page = client.get(f"/api/teacher/students/all?limit=4&cursor={page['next_cursor']}&search=a").get_json()
+    assert page['total'] == client.get('/api/students/count?search=a').get_json()['total']
+
+def test_fields_projection_and_filters(client):
+    """fields= should limit the columns returned; filters apply to pages and counts alike"""
+    data = client.get('/api/students?class=Class 10&section=A&fields=id,name').get_json()
+    count = client.get('/api/students/count?class=Class 10&section=A&status=active').get_json()
+
+    assert data['students'] and all(set(s) == {'id', 'name'} for s in data['students'])
+    assert data['next_cursor'] is None
+    assert len(data['students']) == count['total'] == data['total']
+
+def test_invalid_paging_arguments(client):
+    """Bad cursors, limits and field names are rejected"""
+    assert client.get('/api/students?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/students?limit=0').status_code == 400
+    assert client.get('/api/teacher/students/all?fields=password').status_code == 400
+
+    # Oversized pages are capped rather than rejected
+    data = client.get('/api/teacher/students/all?limit=100000').get_json()
+    assert len(data['students']) <= app.STUDENT_PAGE_SIZE_MAX
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING STUDENT PAGINATION")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
@@ -0,0 +1,68 @@
+"""
+Test the full-text student search index and the typeahead mode
+Run with: python test_student_search.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+def search_ids(client, query, extra=''):
+    data = client.get(f'/api/teacher/students/all?search={query}&fields=student_id{extra}').get_json()
+    return [s['student_id'] for s in data['students']]
+
+def test_prefix_search_across_columns(client):
+    """Word prefixes should match names, roll numbers and emails"""
+    assert search_ids(client, 'rah') == [1]
+    assert search_ids(client, 'priya pat') == [2]
+    assert 1 in search_ids(client, '10A0')
+    assert search_ids(client, 'rahul.sharma') == [1]
+    # Numeric searches still find a student by id
+    assert 3 in search_ids(client, '3')
+    # Punctuation alone is not a search
+    assert len(search_ids(client, '*"', '&limit=500')) == client.get('/api/students/count').get_json()['total']
+
+def test_index_follows_student_changes(client):
+    """Triggers keep students_fts in step with inserts, updates and deletes"""
+    response = client.post('/api/students', json={
+        'name': 'Zara Quinlan', 'roll_no': '9Z001', 'class': 'Class 9', 'email': 'zara@school.edu'
+    })
+    student_id = response.get_json()['student']['id']
+    assert search_ids(client, 'quinl') == [student_id]
+
+    conn = app.get_db_connection()
+    conn.execute("UPDATE students SET name = 'Zara Whitfield' WHERE student_id = ?", (student_id,))
+    conn.commit()
+    assert search_ids(client, 'quinl') == []
+    assert search_ids(client, 'whitf') == [student_id]
+
+    conn.execute('DELETE FROM daily_attendance WHERE student_id = ?', (student_id,))
+    conn.execute('DELETE FROM student_monthly_attendance WHERE student_id = ?', (student_id,))
+    conn.execute('DELETE FROM students WHERE student_id = ?', (student_id,))
+    conn.commit()
+    conn.close()
+    assert search_ids(client, 'whitf') == []
+
+def test_typeahead_is_ranked_and_limited(client):
+    """Typeahead returns at most `limit` matches, name hits before email-only hits"""
+    conn = app.get_db_connection()
+    # Only the parent email mentions "sharma" for this student
+    conn.execute("UPDATE students SET parent_email = 'sharma.family@mail.com' WHERE student_id = 2")
+    conn.commit()
+    conn.close()
+
+    data = client.get('/api/teacher/students/all?mode=typeahead&search=sharma&fields=student_id,name').get_json()
+    print(f"  Typeahead 'sharma': {data['students']}")
+    ids = [s['student_id'] for s in data['students']]
+    assert ids[-1] == 2 and 1 in ids
+
+    data = client.get('/api/teacher/students/all?mode=typeahead&search=s&limit=3').get_json()
+    assert data['count'] == 3
+    assert 'next_cursor' not in data
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING STUDENT SEARCH")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
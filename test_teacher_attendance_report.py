@@ -0,0 +1,79 @@
+"""
+Test the teacher attendance report: working-day calendar, grouped counts,
+compressed daily records and caching per (range, calendar version)
+Run with: python test_teacher_attendance_report.py (or pytest)
+"""
+import sys
+
+import pytest
+
+import app
+
+# Monday 2027-03-01 to Sunday 2027-03-07, with Wednesday a holiday
+RANGE = 'start_date=2027-03-01&end_date=2027-03-07'
+
+@pytest.fixture
+def teacher_id(client):
+    """Record one week for the first active teacher, with Wednesday a holiday"""
+    conn = app.get_db_connection()
+    teacher_id = conn.execute("SELECT MIN(teacher_id) FROM teachers WHERE status = 'active'").fetchone()[0]
+    conn.close()
+
+    client.post('/api/calendar/holidays', json={'date': '2027-03-03', 'name': 'Founders Day'})
+    client.post('/api/teacher-attendance', json={'records': [
+        {'teacher_id': teacher_id, 'date': date, 'status': status}
+        for date, status in [('2027-03-01', 'present'), ('2027-03-02', 'absent'), ('2027-03-03', 'present'),
+                             ('2027-03-04', 'leave'), ('2027-03-06', 'present')]
+    ]})
+    return teacher_id
+
+def report(client, query=''):
+    response = client.get(f'/api/teacher-attendance-report?{RANGE}{query}')
+    assert response.status_code == 200
+    data = response.get_json()
+    return data, {t['teacher_id']: t for t in data['teachers']}
+
+def test_weekends_and_holidays_are_not_working_days(client, teacher_id):
+    data, teachers = report(client)
+    teacher = teachers[teacher_id]
+    print(f"  {teacher['name']}: {teacher}")
+
+    assert (data['total_days'], data['calendar_days']) == (4, 7)
+    assert (teacher['present'], teacher['absent'], teacher['leave'], teacher['not_marked']) == (1, 1, 1, 1)
+    assert teacher['attendance_percentage'] == 33.33
+    assert 'daily_records' not in teacher
+    assert all(t['not_marked'] == 4 for tid, t in teachers.items() if tid != teacher_id)
+
+def test_daily_records_are_compressed(client, teacher_id):
+    data, teachers = report(client, '&daily=rle')
+    assert data['working_days'] == ['2027-03-01', '2027-03-02', '2027-03-04', '2027-03-05']
+    assert teachers[teacher_id]['daily_records'] == 'P1A1L1N1'
+    assert {t['daily_records'] for tid, t in teachers.items() if tid != teacher_id} == {'N4'}
+
+    _, teachers = report(client, '&daily=bitmap')
+    assert teachers[teacher_id]['daily_records'] == {'present': 'gA==', 'absent': 'QA==', 'leave': 'IA=='}
+
+    assert client.get(f'/api/teacher-attendance-report?{RANGE}&daily=csv').status_code == 400
+
+def test_report_is_cached_until_attendance_or_calendar_changes(client, teacher_id):
+    report(client)
+    hits = app.response_cache.get_metrics()['hits']
+    report(client)
+    assert app.response_cache.get_metrics()['hits'] == hits + 1
+
+    client.delete('/api/calendar/holidays/2027-03-03')
+    data, teachers = report(client)
+    assert data['total_days'] == 5
+    assert teachers[teacher_id]['present'] == 2
+
+    client.post('/api/teacher-attendance', json={'records': [
+        {'teacher_id': teacher_id, 'date': '2027-03-05', 'status': 'present'}
+    ]})
+    _, teachers = report(client)
+    assert teachers[teacher_id]['not_marked'] == 0
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING TEACHER ATTENDANCE REPORT")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))
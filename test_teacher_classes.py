@@ -0,0 +1,87 @@
+"""
+Test the teacher classes overview: real per-class aggregates and per-day caching
+Run with: python test_teacher_classes.py (or pytest)
+"""
+import sys
+from datetime import datetime
+
+import pytest
+
+import app
+
+def classes_by_name(client):
+    data = client.get('/api/teacher/classes').get_json()
+    assert data['success']
+    return {row['class_name']: row for row in data['classes']}
+
+def test_aggregates_come_from_attendance_and_results(client):
+    """Attendance rate uses today's daily_attendance and avg_grade the class's results"""
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    conn = app.get_db_connection()
+    student = conn.execute('SELECT student_id, class FROM students ORDER BY student_id LIMIT 1').fetchone()
+    class_name = student['class']
+    roster = conn.execute('SELECT COUNT(*) FROM students WHERE class = ?', (class_name,)).fetchone()[0]
+    expected_grade = app.grade_for_percentage(conn.execute(
+        'SELECT AVG(percentage) FROM performance WHERE class = ?', (class_name,)
+    ).fetchone()[0])
+    conn.close()
+
+    before = classes_by_name(client)
+    assert before[class_name]['total_students'] == roster
+    assert before[class_name]['avg_grade'] == expected_grade
+
+    response = client.post('/api/teacher/attendance/save', json={'attendance': [
+        {'student_id': student['student_id'], 'date': today, 'status': 'Present'},
+    ]})
+    assert response.status_code == 200
+    app.email_outbox.stop()
+
+    conn = app.get_db_connection()
+    present, marked = conn.execute(
+        '''SELECT SUM(d.status = 'present'), COUNT(*) FROM daily_attendance d
+           JOIN students s ON s.student_id = d.student_id
+           WHERE s.class = ? AND d.date = ?''', (class_name, today)
+    ).fetchone()
+    conn.close()
+
+    after = classes_by_name(client)
+    print(f"  {class_name}: {after[class_name]}")
+    assert after[class_name]['attendance_rate'] == round(present / marked * 100)
+    assert after[class_name]['attendance_rate'] > 0
+
+def test_subject_comes_from_each_class_exams(client):
+    """Each class lists the subjects it is examined in, not one teacher's subject for every class"""
+    conn = app.get_db_connection()
+    expected = {row[0]: row[1] for row in conn.execute(
+        'SELECT class, GROUP_CONCAT(subject, \', \') FROM (SELECT DISTINCT class, subject FROM exams ORDER BY subject) GROUP BY class'
+    )}
+    conn.close()
+
+    classes = classes_by_name(client)
+    print(f"  Subjects: { {name: row['subject'] for name, row in classes.items()} }")
+    assert len(set(expected.values())) > 1
+    for class_name, row in classes.items():
+        assert row['subject'] == expected.get(class_name, 'General')
+
+def test_overview_is_cached_until_a_write(client):
+    """Repeated loads hit the cache; saving attendance invalidates it"""
+    classes_by_name(client)
+    hits = app.response_cache.get_metrics()['hits']
+    classes_by_name(client)
+    assert app.response_cache.get_metrics()['hits'] == hits + 1
+
+    app.record_data_change('attendance')
+    misses = app.response_cache.get_metrics()['misses']
+    classes_by_name(client)
+    assert app.response_cache.get_metrics()['misses'] == misses + 1
+
+def test_grade_bands():
+    assert app.grade_for_percentage(None) is None
+    assert [app.grade_for_percentage(p) for p in (95, 85, 80, 70, 10)] == ['A+', 'A', 'B+', 'B', 'C']
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING TEACHER CLASSES OVERVIEW")
+    print("=" * 60)
+    sys.exit(pytest.main([__file__, '-v', '-s']))